@@ -51,8 +51,9 @@ if "auto_load" in locals():
 
 
 # These need to be here, not at the top of the file, to handle reload
-from . import sollumz_tool  # noqa: E402, F811
 from . import sollumz_debug  # noqa: E402, F811
+with sollumz_debug.startup_profiler.measure("import", "sollumz_tool"):
+    from . import sollumz_tool  # noqa: E402, F811
 from . import auto_load  # noqa: E402, F811
 import bpy  # noqa: E402, F811
 
@@ -71,6 +72,8 @@ def register():
     # detect the registed operators
     sollumz_tool.register_tools()
 
+    sollumz_debug.startup_profiler.report()
+
 
 def unregister():
     sollumz_tool.unregister_tools()
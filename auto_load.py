@@ -4,15 +4,44 @@ import inspect
 import pkgutil
 import importlib
 from pathlib import Path
+from bpy.app.handlers import persistent
+from .sollumz_debug import startup_profiler
 
 __all__ = (
     "init",
     "register",
     "unregister",
+    "register_deferred",
+    "request_register_deferred",
+    "is_deferred_registered",
 )
 
+DEFERRED_MODULES = (
+    "ydr.gizmos.lights",
+    "ydr.cable_overlays",
+    "ytyp.gizmos.mlo",
+    # "ytyp.gizmos.extensions" and "ydr.gizmos.light_manipulators" are not deferred, they contain the gizmo group and
+    # operators used by the workspace tools, which need to exist when the tools are registered
+)
+"""Modules only used in the 3D Viewport. They are imported and registered the first time Sollumz is used in the
+session, in ``register_deferred``, and never in background mode.
+"""
+
+DEFERRED_CLASS_PREFIXES = (
+    "SOLLUMZ_OT_debug_",
+)
+"""Prefixes of rarely used classes, also registered in ``register_deferred``."""
+
+ON_DEMAND_MODULES = (
+    "versioning.versioning_230",
+    "versioning.versioning_240",
+)
+"""Modules not imported at startup. Whoever needs them imports them when required."""
+
 modules = None
 ordered_classes = None
+deferred_modules = None
+deferred_classes = None
 
 
 def init():
@@ -20,33 +49,140 @@ def init():
     global ordered_classes
 
     modules = get_all_submodules(Path(__file__).parent, __package__)
-    ordered_classes = get_ordered_classes_to_register(modules)
+    ordered_classes = [cls for cls in get_ordered_classes_to_register(modules) if not is_deferred_class(cls)]
 
 
 def register():
     for cls in ordered_classes:
-        bpy.utils.register_class(cls)
+        with startup_profiler.measure("register", cls.__name__):
+            bpy.utils.register_class(cls)
 
     for module in modules:
         if module.__name__ == __name__:
             continue
         if hasattr(module, "register"):
-            module.register()
+            with startup_profiler.measure("register", module.__name__):
+                module.register()
+
+    if not bpy.app.background:
+        # Wait until Sollumz is used. In background mode there is no 3D Viewport, so the deferred classes are not
+        # needed unless a script calls `register_deferred` explicitly
+        bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update_post)
+        bpy.app.handlers.load_post.append(on_load_post)
+
+
+def is_deferred_registered() -> bool:
+    return deferred_modules is not None
+
+
+def request_register_deferred():
+    """Schedules ``register_deferred`` to run on a timer. Use from draw functions and handlers, where classes cannot be
+    registered.
+    """
+    if not is_deferred_registered() and not bpy.app.timers.is_registered(register_deferred):
+        bpy.app.timers.register(register_deferred, first_interval=0.0, persistent=True)
+
+
+@persistent
+def on_depsgraph_update_post(scene, depsgraph):
+    from .sollumz_properties import SollumType
+
+    # A Sollumz object was created or modified, e.g. by an import operator
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object) and update.id.sollum_type != SollumType.NONE:
+            request_register_deferred()
+            return
+
+
+@persistent
+def on_load_post(_):
+    from .sollumz_properties import SollumType
+
+    if any(obj.sollum_type != SollumType.NONE for obj in bpy.data.objects):
+        request_register_deferred()
+
+
+def remove_deferred_handlers():
+    if on_depsgraph_update_post in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update_post)
+    if on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_post)
+
+
+def register_deferred():
+    """Imports and registers the modules and classes excluded from the add-on startup. Does nothing if already
+    registered.
+    """
+    global deferred_modules
+    global deferred_classes
+
+    if is_deferred_registered():
+        return None
+
+    remove_deferred_handlers()
+
+    deferred_modules = get_deferred_submodules(Path(__file__).parent, __package__)
+    deferred_classes = [
+        cls for cls in get_ordered_classes_to_register(modules + deferred_modules) if is_deferred_class(cls)
+    ]
+
+    for cls in deferred_classes:
+        with startup_profiler.measure("register (deferred)", cls.__name__):
+            bpy.utils.register_class(cls)
+
+    for module in deferred_modules:
+        if hasattr(module, "register"):
+            with startup_profiler.measure("register (deferred)", module.__name__):
+                module.register()
+
+    if not bpy.app.background:
+        from .tools.blenderhelper import tag_redraw
+        tag_redraw(bpy.context, space_type="VIEW_3D", region_type="UI")
+
+    startup_profiler.report()
+    return None  # don't repeat the timer
 
 
 def unregister():
+    global deferred_modules
+    global deferred_classes
+
+    remove_deferred_handlers()
+    if bpy.app.timers.is_registered(register_deferred):
+        bpy.app.timers.unregister(register_deferred)
+
+    if deferred_modules is not None:
+        unregister_modules(deferred_modules)
+
+        for cls in reversed(deferred_classes):
+            bpy.utils.unregister_class(cls)
+
+        deferred_modules = None
+        deferred_classes = None
+
+    unregister_modules(module for module in modules if module.__name__ != __name__)
+
+    for cls in reversed(ordered_classes):
+        bpy.utils.unregister_class(cls)
+
+
+def unregister_modules(modules_to_unregister):
     called = set()
-    for module in modules:
-        if module.__name__ == __name__:
-            continue
+    for module in modules_to_unregister:
         if hasattr(module, "unregister"):
             # Check if unregister method has already been called
             if module.unregister not in called:
                 module.unregister()
                 called.add(module.unregister)
 
-    for cls in reversed(ordered_classes):
-        bpy.utils.unregister_class(cls)
+
+def is_deferred_class(cls):
+    return is_module_name_in(cls.__module__, DEFERRED_MODULES) or cls.__name__.startswith(DEFERRED_CLASS_PREFIXES)
+
+
+def is_module_name_in(module_name, relative_names):
+    name = module_name.removeprefix(f"{__package__}.")
+    return any(name == relative_name or name.startswith(relative_name + ".") for relative_name in relative_names)
 
 
 # Import modules
@@ -56,9 +192,22 @@ def get_all_submodules(directory, package_name):
     return list(iter_submodules(directory, package_name))
 
 
+def get_deferred_submodules(directory, package_name):
+    return [
+        importlib.import_module("." + name, package_name)
+        for name in sorted(iter_submodule_names(directory))
+        if is_module_name_in(name, DEFERRED_MODULES)
+    ]
+
+
 def iter_submodules(path, package_name):
     for name in sorted(iter_submodule_names(path)):
-        yield importlib.import_module("." + name, package_name)
+        if is_module_name_in(name, DEFERRED_MODULES) or is_module_name_in(name, ON_DEMAND_MODULES):
+            continue
+
+        with startup_profiler.measure("import", name):
+            module = importlib.import_module("." + name, package_name)
+        yield module
 
 
 def iter_submodule_names(path, root=""):
@@ -15,6 +15,8 @@ from .element import (
 from xml.etree import ElementTree as ET
 from inspect import isclass
 from math import sqrt
+import numpy as np
+from numpy.typing import NDArray
 
 
 class YCD:
@@ -195,6 +197,74 @@ class FramesBuffer(ElementProperty):
         return element
 
 
+class PackedDataBuffer(FramesBuffer):
+    """Buffer of unsigned 32-bit integers with bit-packed channel data."""
+
+    def __init__(self):
+        super().__init__()
+        self.tag_name = "Data"
+
+
+# Number of frames in each chunk of a LinearFloat channel
+LINEAR_FLOAT_CHUNK_SIZE = 64
+
+
+def _read_bits(bits: list[int], position: int, num_bits: int) -> int:
+    value = 0
+    for i in range(num_bits):
+        value |= bits[position + i] << i
+    return value
+
+
+def decode_linear_float_data(data: list[int], counts: int, num_frames: int) -> NDArray[np.int64]:
+    """Decodes the quantized values of the first ``num_frames`` frames of a LinearFloat channel.
+
+    ``data`` is a bit stream, least significant bit first, split in chunks of ``LINEAR_FLOAT_CHUNK_SIZE`` frames. It
+    starts with the bit offset of each chunk in the delta stream and the value of the first frame of each chunk,
+    followed by the delta stream. For each remaining frame of the chunk, the delta stream has the change of the
+    increment between frames: the low bits of its magnitude, the rest of the magnitude in unary terminated by a 0,
+    and a sign bit if it is not zero. The increment is 0 at the start of each chunk.
+
+    ``counts`` has the number of bits of the chunk offsets in bits 0-7, of the chunk values in bits 8-15 and of the
+    low bits of the deltas in bits 16-23.
+    """
+    offset_bits = counts & 0xFF
+    value_bits = (counts >> 8) & 0xFF
+    delta_low_bits = (counts >> 16) & 0xFF
+    bits = np.unpackbits(np.asarray(data, dtype="<u4").view(np.uint8), bitorder="little").tolist()
+
+    num_chunks = (num_frames + LINEAR_FLOAT_CHUNK_SIZE - 1) // LINEAR_FLOAT_CHUNK_SIZE
+    values_start = num_chunks * offset_bits
+    deltas_start = values_start + num_chunks * value_bits
+    quantized = np.empty(num_frames, dtype=np.int64)
+    for chunk_index in range(num_chunks):
+        position = deltas_start + _read_bits(bits, chunk_index * offset_bits, offset_bits)
+        value = _read_bits(bits, values_start + chunk_index * value_bits, value_bits)
+        increment = 0
+
+        chunk_start = chunk_index * LINEAR_FLOAT_CHUNK_SIZE
+        quantized[chunk_start] = value
+        for frame_id in range(chunk_start + 1, min(chunk_start + LINEAR_FLOAT_CHUNK_SIZE, num_frames)):
+            delta = _read_bits(bits, position, delta_low_bits)
+            position += delta_low_bits
+            high = 0
+            while bits[position]:
+                high += 1
+                position += 1
+            position += 1
+            delta |= high << delta_low_bits
+            if delta != 0:
+                if bits[position]:
+                    delta = -delta
+                position += 1
+
+            increment += delta
+            value += increment
+            quantized[frame_id] = value
+
+    return quantized
+
+
 class ChannelsList(ItemTypeList):
     class Channel(ItemTypeList.Item, AbstractClass):
         tag_name = "Item"
@@ -211,6 +281,10 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             raise NotImplementedError
 
+        def get_values(self, frame_ids: NDArray[np.int64], channel_values: list[NDArray]) -> NDArray:
+            """Gets the channel value at each frame in ``frame_ids``. Same as ``get_value`` but for multiple frames."""
+            raise NotImplementedError
+
     class StaticQuaternion(Channel):
         type = "StaticQuaternion"
 
@@ -222,6 +296,10 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.value
 
+        def get_values(self, frame_ids, channel_values):
+            q = self.value
+            return np.tile(np.array((q.w, q.x, q.y, q.z), dtype=np.float64), (len(frame_ids), 1))
+
     class StaticVector3(Channel):
         type = "StaticVector3"
 
@@ -233,6 +311,9 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.value
 
+        def get_values(self, frame_ids, channel_values):
+            return np.tile(np.array(self.value, dtype=np.float64), (len(frame_ids), 1))
+
     class StaticFloat(Channel):
         type = "StaticFloat"
 
@@ -244,6 +325,9 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.value
 
+        def get_values(self, frame_ids, channel_values):
+            return np.full(len(frame_ids), self.value, dtype=np.float64)
+
     class RawFloat(Channel):
         type = "RawFloat"
 
@@ -255,6 +339,10 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.values[frame_id % len(self.values)]
 
+        def get_values(self, frame_ids, channel_values):
+            values = np.array(self.values, dtype=np.float64)
+            return values[frame_ids % len(values)]
+
     class QuantizeFloat(Channel):
         type = "QuantizeFloat"
 
@@ -268,6 +356,10 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.values[frame_id % len(self.values)]
 
+        def get_values(self, frame_ids, channel_values):
+            values = np.array(self.values, dtype=np.float64)
+            return values[frame_ids % len(values)]
+
     class IndirectQuantizeFloat(QuantizeFloat):
         type = "IndirectQuantizeFloat"
 
@@ -279,6 +371,11 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.values[(self.frames[frame_id % len(self.frames)]) % len(self.values)]
 
+        def get_values(self, frame_ids, channel_values):
+            values = np.array(self.values, dtype=np.float64)
+            frames = np.array(self.frames, dtype=np.int64)
+            return values[frames[frame_ids % len(frames)] % len(values)]
+
     class LinearFloat(QuantizeFloat):
         type = "LinearFloat"
 
@@ -286,8 +383,17 @@ class ChannelsList(ItemTypeList):
             super().__init__()
             self.numints = ValueProperty("NumInts", 0)
             self.counts = ValueProperty("Counts", 0)
+            self.data = PackedDataBuffer()
             self.type = "LinearFloat"
 
+        def get_values(self, frame_ids, channel_values):
+            if not self.data:
+                # no packed data, only the decoded values
+                return super().get_values(frame_ids, channel_values)
+
+            quantized = decode_linear_float_data(self.data, self.counts, len(self.values))
+            return (self.offset + quantized * self.quantum)[frame_ids % len(quantized)]
+
     class CachedQuaternion1(Channel):
         type = "CachedQuaternion1"
 
@@ -302,6 +408,10 @@ class ChannelsList(ItemTypeList):
 
             return sqrt(max(1.0 - vec_len * vec_len, 0))
 
+        def get_values(self, frame_ids, channel_values):
+            vecs = np.stack(channel_values[:3], axis=-1)
+            return np.sqrt(np.maximum(1.0 - np.einsum("ij,ij->i", vecs, vecs), 0.0))
+
     class CachedQuaternion2(CachedQuaternion1):
         type = "CachedQuaternion2"
 
@@ -782,6 +782,7 @@ class BonePropertiesManager:
     dictionary_xml = os.path.join(
         os.path.dirname(__file__), "BoneProperties.xml")
     bones = {}
+    _bones_loaded = False
 
     @staticmethod
     def load_bones():
@@ -790,5 +791,11 @@ class BonePropertiesManager:
             bone = Bone.from_xml(node)
             BonePropertiesManager.bones[bone.name] = bone
 
+    @staticmethod
+    def get_bone(name: str) -> Optional[Bone]:
+        """Gets the recommended properties of the bone named ``name``. The bones are loaded on first use."""
+        if not BonePropertiesManager._bones_loaded:
+            BonePropertiesManager.load_bones()
+            BonePropertiesManager._bones_loaded = True
 
-BonePropertiesManager.load_bones()
+        return BonePropertiesManager.bones.get(name, None)
@@ -3,6 +3,7 @@ from mathutils import Vector, Quaternion, Matrix
 from abc import abstractmethod, ABC as AbstractClass, abstractclassmethod
 from dataclasses import dataclass
 from typing import Any
+from copy import deepcopy
 from xml.etree import ElementTree as ET
 from numpy import float32
 
@@ -148,6 +149,22 @@ class ElementTree(Element):
         else:
             super().__setattr__(name, value)
 
+    def __copy__(self):
+        # Same issue as __deepcopy__. Note, the properties objects are shared with the copy
+        new = type(self).__new__(type(self))
+        for name, value in vars(self).items():
+            object.__setattr__(new, name, value)
+        return new
+
+    def __deepcopy__(self, memo):
+        # Default deepcopy doesn't work because __getattribute__ returns None for missing attributes such as
+        # __setstate__, so copy the properties directly
+        new = type(self).__new__(type(self))
+        memo[id(self)] = new
+        for name, value in vars(self).items():
+            object.__setattr__(new, name, deepcopy(value, memo))
+        return new
+
     def get_element(self, key):
         obj = self.__getattribute__(key, False)
 
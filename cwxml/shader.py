@@ -1,6 +1,8 @@
 import xml.etree.ElementTree as ET
 import os
 from abc import ABC, abstractmethod
+from copy import copy
+from threading import Lock
 from .element import (
     ElementTree,
     ListProperty,
@@ -241,6 +243,15 @@ class ShaderDef(ElementTree):
         new.parameter_ui_order = {p.name: i for i, p in enumerate(new.parameters)}
         return new
 
+    def copy_for_variant(self, filename: str, render_bucket: int) -> "ShaderDef":
+        """Creates a shader definition for a filename variant of this shader. The parsed layouts and parameters are
+        shared with this shader, so they should not be modified.
+        """
+        new = copy(self)
+        new.filename = TextProperty("Name", filename)
+        new.render_bucket = render_bucket
+        return new
+
 
 class ShaderManager:
     shaderxml = os.path.join(os.path.dirname(__file__), "Shaders.xml")
@@ -248,6 +259,8 @@ class ShaderManager:
     _shaders_base_names: dict[ShaderDef, str] = {}
     _shaders: dict[str, ShaderDef] = {}
     _shaders_by_hash: dict[int, ShaderDef] = {}
+    _shaders_loaded = False
+    _shaders_lock = Lock()
 
     terrains = ["terrain_cb_w_4lyr.sps", "terrain_cb_w_4lyr_lod.sps", "terrain_cb_w_4lyr_spec.sps", "terrain_cb_w_4lyr_spec_pxm.sps", "terrain_cb_w_4lyr_pxm_spm.sps",
                 "terrain_cb_w_4lyr_pxm.sps", "terrain_cb_w_4lyr_cm_pxm.sps", "terrain_cb_w_4lyr_cm_tnt.sps", "terrain_cb_w_4lyr_cm_pxm_tnt.sps", "terrain_cb_w_4lyr_cm.sps",
@@ -302,24 +315,45 @@ class ShaderManager:
 
         for node in tree.getroot():
             base_name = node.find("Name").text
+            base_shader = None
             for filename_elem in node.findall("./FileName//*"):
                 filename = filename_elem.text
 
                 if filename is None:
                     continue
 
+                if base_shader is None:
+                    # parse the shader only once, all filename variants share the same definition
+                    base_shader = ShaderDef.from_xml(node)
+
                 filename_hash = jenkhash.Generate(filename)
                 render_bucket = int(filename_elem.attrib["bucket"])
 
-                shader = ShaderDef.from_xml(node)
-                shader.filename = filename
-                shader.render_bucket = render_bucket
+                shader = base_shader.copy_for_variant(filename, render_bucket)
                 ShaderManager._shaders[filename] = shader
                 ShaderManager._shaders_by_hash[filename_hash] = shader
                 ShaderManager._shaders_base_names[shader] = base_name
 
+    @staticmethod
+    def ensure_shaders_loaded():
+        """Loads the shaders the first time they are needed, instead of when the add-on is loaded."""
+        if ShaderManager._shaders_loaded:
+            return
+
+        with ShaderManager._shaders_lock:
+            if not ShaderManager._shaders_loaded:
+                ShaderManager.load_shaders()
+                ShaderManager._shaders_loaded = True
+
+    @staticmethod
+    def get_shaders() -> dict[str, ShaderDef]:
+        """Gets all shaders, mapped by filename."""
+        ShaderManager.ensure_shaders_loaded()
+        return ShaderManager._shaders
+
     @staticmethod
     def find_shader(filename: str) -> Optional[ShaderDef]:
+        ShaderManager.ensure_shaders_loaded()
         shader = ShaderManager._shaders.get(filename, None)
         if shader is None and filename.startswith("hash_"):
             filename_hash = int(filename[5:], 16)
@@ -332,6 +366,3 @@ class ShaderManager:
         if shader is None:
             return None
         return ShaderManager._shaders_base_names[shader]
-
-
-ShaderManager.load_shaders()
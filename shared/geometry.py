@@ -150,19 +150,124 @@ def get_mass_properties_of_box(box_min: Vector, box_max: Vector) -> MassProperti
 
 
 def get_centroid_of_mesh(mesh_vertices) -> Centroid:
-    from . import miniball
-
-    while True:
-        try:  # ugly, miniball can sometimes fail, so try again...
-            C, r2 = miniball.get_bounding_ball(mesh_vertices)
-            break
-        except np.linalg.LinAlgError:
-            continue
+    C, r2 = get_bounding_ball(mesh_vertices)
     centroid = Vector(C)
     radius_around_centroid = np.sqrt(r2)
     return Centroid(centroid, radius_around_centroid)
 
 
+def get_bounding_ball(points, epsilon: float = 1e-7, seed: int = 0) -> tuple[np.ndarray, float]:
+    """Computes the smallest bounding ball of a set of 3D points.
+
+    Uses the move-to-front variant of Welzl's algorithm, without recursion. Welzl's algorithm only runs on a small
+    support set of points, the point furthest away from the current ball is moved into it until all points are
+    contained. Results are deterministic for a given ``seed``.
+
+    Returns a tuple with the center and the squared radius of the ball.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+    if len(points) == 0:
+        return np.zeros(3), 0.0
+
+    # Start from the points extreme along each axis, in random order
+    rng = np.random.default_rng(seed)
+    support = list(np.unique(np.concatenate((points.argmin(axis=0), points.argmax(axis=0)))))
+    rng.shuffle(support)
+
+    for _ in range(len(points)):
+        center, r2 = _get_bounding_ball_mtf(points[support], epsilon)
+        if not np.isfinite(r2):
+            break
+
+        dist2 = np.square(points - center).sum(axis=1)
+        furthest = np.argmax(dist2)
+        if dist2[furthest] <= r2 + epsilon * max(r2, 1.0):
+            return center, r2
+
+        if furthest in support:
+            # Numerical issues, cannot make progress
+            break
+
+        support.insert(0, furthest)
+
+    # Fallback for degenerate point sets, not as tight but it always contains all points
+    return _get_bounding_ball_ritter(points)
+
+
+def _get_bounding_ball_mtf(points: np.ndarray, epsilon: float) -> tuple[np.ndarray, float]:
+    """Move-to-front Welzl's algorithm. The recursion is replaced by an explicit stack, which depth is bounded by
+    the max number of points in the boundary (4 in 3D).
+    """
+    order = list(range(len(points)))
+    root_boundary = []
+    # Each frame holds: [end of the prefix of ``order`` to process, boundary point indices, current index, ball]
+    stack = [[len(order), root_boundary, 0, _get_circumsphere(points, root_boundary)]]
+    result = None
+    while stack:
+        frame = stack[-1]
+        end, boundary, i, (center, r2) = frame
+
+        if i >= end or len(boundary) == 4:
+            stack.pop()
+            result = frame[3]
+            if stack:
+                parent = stack[-1]
+                parent[3] = result
+                # Move the point that caused the recursion to the front of the list
+                order.insert(0, order.pop(parent[2]))
+                parent[2] += 1
+            continue
+
+        p = order[i]
+        if np.square(points[p] - center).sum() <= r2 + epsilon * max(r2, 1.0):
+            frame[2] += 1
+            continue
+
+        child_boundary = boundary + [p]
+        stack.append([i, child_boundary, 0, _get_circumsphere(points, child_boundary)])
+
+    return result
+
+
+def _get_circumsphere(points: np.ndarray, boundary: list[int]) -> tuple[np.ndarray, float]:
+    """Computes the smallest sphere with all the ``boundary`` points in its surface."""
+    if len(boundary) == 0:
+        return np.zeros(3), -1.0
+
+    S = points[boundary]
+    if len(boundary) == 1:
+        return S[0].copy(), 0.0
+
+    U = S[1:] - S[0]
+    B = np.square(U).sum(axis=1) * 0.5
+    A = U @ U.T
+    try:
+        C = np.linalg.solve(A, B) @ U
+    except np.linalg.LinAlgError:
+        # Degenerate boundary (repeated, collinear or coplanar points), use the least-squares solution instead
+        C = np.linalg.lstsq(A, B, rcond=None)[0] @ U
+
+    C += S[0]
+    r2 = np.square(S - C).sum(axis=1).max()
+    return C, r2
+
+
+def _get_bounding_ball_ritter(points: np.ndarray) -> tuple[np.ndarray, float]:
+    """Ritter's bounding sphere. Approximate, but it never fails."""
+    p0 = points[0]
+    p1 = points[np.argmax(np.square(points - p0).sum(axis=1))]
+    p2 = points[np.argmax(np.square(points - p1).sum(axis=1))]
+    center = (p1 + p2) * 0.5
+    radius = np.linalg.norm(p2 - p1) * 0.5
+    for point in points:
+        dist = np.linalg.norm(point - center)
+        if dist > radius:
+            radius = (radius + dist) * 0.5
+            center += (point - center) * ((dist - radius) / dist)
+
+    return center, radius * radius
+
+
 def get_mass_properties_of_mesh(mesh_vertices, mesh_faces):
     triangles = mesh_vertices[mesh_faces]
 
@@ -185,86 +290,41 @@ def get_mass_properties_of_mesh(mesh_vertices, mesh_faces):
         tri_cgs *= tri_areas[:, np.newaxis]
         cg = tri_cgs.sum(axis=0) / tri_areas.sum()
 
-    cg = Vector(cg)
+    # Based on https://github.com/bulletphysics/bullet3/blob/e9c461b0ace140d5c73972760781d94b7b5eee53/src/BulletCollision/CollisionShapes/btConvexTriangleMeshShape.cpp#L236
+    a = v0 - cg
+    b = v1 - cg
+    c = v2 - cg
+    i = tri_tetrahedron_volumes[:, np.newaxis] * (
+        0.1 * (a * a + b * b + c * c) +
+        0.1 * (a * b + a * c + b * c)
+    )
+    i00, i11, i22 = i.sum(axis=0)
 
-    ixx = 0.0
-    iyy = 0.0
-    izz = 0.0
-    for tri_idx, (v0, v1, v2) in enumerate(triangles):
-        # Based on https://github.com/bulletphysics/bullet3/blob/e9c461b0ace140d5c73972760781d94b7b5eee53/src/BulletCollision/CollisionShapes/btConvexTriangleMeshShape.cpp#L236
-        # TODO: vectorize with numpy
-        a = Vector(v0) - cg
-        b = Vector(v1) - cg
-        c = Vector(v2) - cg
-
-        i = [0.0, 0.0, 0.0]
-        vol_neg = -tri_tetrahedron_volumes[tri_idx]
-        for j in range(3):
-            i[j] = vol_neg * (
-                0.1 * (a[j] * a[j] + b[j] * b[j] + c[j] * c[j]) +
-                0.05 * (a[j] * b[j] + a[j] * b[j] + a[j] * c[j] + a[j] * c[j] + b[j] * c[j] + b[j] * c[j])
-            )
-
-        i00 = -i[0]
-        i11 = -i[1]
-        i22 = -i[2]
-
-        ixx += i11 + i22
-        iyy += i22 + i00
-        izz += i00 + i11
+    ixx = i11 + i22
+    iyy = i22 + i00
+    izz = i00 + i11
 
     ixx /= volume
     iyy /= volume
     izz /= volume
 
+    cg = Vector(cg)
     inertia = Vector((ixx, iyy, izz))
     return MassProperties(volume, cg, inertia)
 
 
 def is_mesh_solid(mesh_vertices, mesh_faces) -> bool:
     """Gets whether the mesh is a closed oriented manifold."""
-
-    # TODO: this can be optimized, we're doing a lot of unnecesary work for easier debugging
-
-    def _get_edge_to_neighbour_faces_map():
-        """Returns an array indexed by edge indices, with a list of faces connected to each edge."""
-        from collections import defaultdict
-        edge_to_neighbour_faces = defaultdict(list)
-        for face_index, (v0, v1, v2) in enumerate(mesh_faces):
-            e0 = (v0, v1)
-            e1 = (v1, v2)
-            e2 = (v2, v0)
-            for edge in (e0, e1, e2):
-                edge_reversed = (edge[1], edge[0])
-                if edge_reversed in edge_to_neighbour_faces:
-                    edge_to_neighbour_faces[edge_reversed].append(face_index)
-                else:
-                    edge_to_neighbour_faces[edge].append(face_index)
-
-        return edge_to_neighbour_faces
-
-    def _classify_edges_by_manifold():
-        edge_to_neighbour_faces = _get_edge_to_neighbour_faces_map()
-
-        # Boundary edges: Edges that are connected to only one face.
-        # Manifold edges: Edges that are connected to exactly two faces.
-        # Non-manifold edges: Edges that are connected to more than two faces, or no faces at all.
-        boundary_edges = []
-        manifold_edges = []
-        non_manifold_edges = []
-        for edge, neighbour_faces in edge_to_neighbour_faces.items():
-            num_faces = len(neighbour_faces)
-            if num_faces == 1:
-                boundary_edges.append(edge)
-            elif num_faces == 2:
-                manifold_edges.append(edge)
-            else:
-                non_manifold_edges.append(edge)
-
-        return boundary_edges, manifold_edges, non_manifold_edges
-
-    boundary_edges, manifold_edges, non_manifold_edges = _classify_edges_by_manifold()
-    return len(boundary_edges) == 0 and len(non_manifold_edges) == 0
+    mesh_faces = np.asarray(mesh_faces).reshape((-1, 3))
+
+    # Boundary edges: Edges that are connected to only one face.
+    # Manifold edges: Edges that are connected to exactly two faces.
+    # Non-manifold edges: Edges that are connected to more than two faces, or no faces at all.
+    # The mesh is solid if all edges are manifold edges.
+    edges = np.concatenate((mesh_faces[:, [0, 1]], mesh_faces[:, [1, 2]], mesh_faces[:, [2, 0]]))
+    edges.sort(axis=1)
+    _, num_faces_per_edge = np.unique(edges, axis=0, return_counts=True)
+    return bool(np.all(num_faces_per_edge == 2))
 
 
 def calculate_composite_inertia(
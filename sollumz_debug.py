@@ -1,4 +1,7 @@
 import os
+import time
+from contextlib import contextmanager
+from . import logger
 
 
 def init_debug():
@@ -24,3 +27,55 @@ def init_debug():
     debugpy.listen((host, port))
     if wait:
         debugpy.wait_for_client()
+
+
+def is_startup_profiling_enabled() -> bool:
+    """Checks whether the add-on startup should be profiled, requested by the user through environment variables.
+
+    Environment Variables:
+    - `SOLLUMZ_PROFILE_STARTUP`: if `true`, log how long it takes to import and register each module.
+    """
+    return os.environ.get("SOLLUMZ_PROFILE_STARTUP", "false") == "true"
+
+
+class StartupProfiler:
+    """Records how long each step of the add-on startup takes. Does nothing unless startup profiling is enabled.
+
+    Note, the time of a module import includes the time to import any other module imported by it for the first time.
+    """
+
+    def __init__(self):
+        self.enabled = is_startup_profiling_enabled()
+        self.timings: list[tuple[str, str, float]] = []
+
+    @contextmanager
+    def measure(self, category: str, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((category, name, time.perf_counter() - start))
+
+    def report(self):
+        """Logs the timings recorded since the last report, slowest first."""
+        if not self.enabled or not self.timings:
+            return
+
+        totals = {}
+        for category, _, duration in self.timings:
+            totals[category] = totals.get(category, 0.0) + duration
+
+        for category, total in totals.items():
+            logger.info(f"Startup {category}: {total * 1000.0:.2f} ms")
+
+        for category, name, duration in sorted(self.timings, key=lambda t: t[2], reverse=True):
+            logger.info(f"Startup   {category} {name}: {duration * 1000.0:.2f} ms")
+
+        self.timings.clear()
+
+
+startup_profiler = StartupProfiler()
@@ -63,10 +63,13 @@ def set_object_collection(obj):
     target = bpy.context.view_layer.active_layer_collection.collection
     objs = get_object_with_children(obj)
     for obj in objs:
-        if len(obj.users_collection) > 0:
-            collection = obj.users_collection[0]
-            collection.objects.unlink(obj)
-        target.objects.link(obj)
+        for collection in obj.users_collection:
+            # Keep the objects in the collections used by collection instances, otherwise the instances become empty
+            if not is_instance_collection(collection):
+                collection.objects.unlink(obj)
+                break
+        if target not in obj.users_collection:
+            target.objects.link(obj)
 
 
 def get_sollumz_objects_from_objects(objs, sollum_type):
@@ -115,6 +118,51 @@ def duplicate_object_with_children(obj):
     return new_objs[0]
 
 
+# Custom property of an object with the name of its instance collection
+INSTANCE_COLLECTION_PROP = "sollumz_instance_collection"
+# Custom property that marks a collection as created by ``get_object_instance_collection``
+IS_INSTANCE_COLLECTION_PROP = "sollumz_is_instance_collection"
+# Max length of data-block names, longer names are truncated by Blender
+MAX_NAME_LENGTH = 63
+
+
+def is_instance_collection(collection: bpy.types.Collection) -> bool:
+    """Gets whether ``collection`` was created by ``get_object_instance_collection``."""
+    return bool(collection.get(IS_INSTANCE_COLLECTION_PROP, False))
+
+
+def get_object_instance_collection(obj: bpy.types.Object) -> bpy.types.Collection:
+    """Gets the collection used to instance ``obj`` and its children with collection instances. It is created the first
+    time and shared by all the instances of ``obj``. The instances are placed relative to the location of ``obj``.
+    """
+    collection_name = obj.get(INSTANCE_COLLECTION_PROP, None)
+    collection = bpy.data.collections.get(collection_name, None) if collection_name else None
+    if collection is not None and obj.name in collection.objects:
+        return collection
+
+    suffix = ".instance"
+    collection = bpy.data.collections.new(f"{obj.name[:MAX_NAME_LENGTH - len(suffix)]}{suffix}")
+    collection[IS_INSTANCE_COLLECTION_PROP] = True
+    for o in get_object_with_children(obj):
+        collection.objects.link(o)
+    collection.instance_offset = obj.matrix_world.translation
+    # Blender may have truncated the name or added a .00# suffix, store the final name
+    obj[INSTANCE_COLLECTION_PROP] = collection.name
+    return collection
+
+
+def instance_object_with_children(obj: bpy.types.Object) -> bpy.types.Object:
+    """Creates an empty that instances ``obj`` and its children through a collection instance. Unlike
+    ``duplicate_object_with_children``, no objects are copied, all the instances share the same collection.
+    """
+    new_obj = bpy.data.objects.new(obj.name, None)
+    new_obj.sollum_type = obj.sollum_type
+    new_obj.instance_type = "COLLECTION"
+    new_obj.instance_collection = get_object_instance_collection(obj)
+    bpy.context.scene.collection.objects.link(new_obj)
+    return new_obj
+
+
 def find_sollumz_parent(obj: bpy.types.Object, parent_type: Optional[SollumType] = None) -> bpy.types.Object | None:
     """Find parent Fragment or Drawable if one exists. Returns None otherwise."""
     parent_types = [SollumType.FRAGMENT, SollumType.DRAWABLE, SollumType.DRAWABLE_DICTIONARY,
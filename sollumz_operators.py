@@ -25,6 +25,7 @@ from .yft.yftimport import import_yft
 from .yft.yftexport import export_yft
 from .ybn.ybnimport import import_ybn
 from .ybn.ybnexport import export_ybn
+from .ybn.boundcache import bound_export_cache, get_bound_cache_filepath
 from .ynv.ynvimport import import_ynv
 from .ycd.ycdimport import import_ycd
 from .ycd.ycdexport import export_ycd
@@ -197,6 +198,12 @@ class SOLLUMZ_OT_export(bpy.types.Operator, TimedOperator):
                     logger.info("No Sollumz objects in the scene to export!")
                 return {"CANCELLED"}
 
+            bound_cache_filepath = None
+            if export_settings.use_bound_cache and export_settings.save_bound_cache:
+                bound_cache_filepath = get_bound_cache_filepath(bpy.data.filepath)
+                if bound_cache_filepath is not None:
+                    bound_export_cache.load(bound_cache_filepath)
+
             any_warnings_or_errors = False
             for obj in objs:
                 op_log.clear_log_counts()
@@ -235,6 +242,9 @@ class SOLLUMZ_OT_export(bpy.types.Operator, TimedOperator):
                     any_warnings_or_errors = True
                     return {"CANCELLED"}
 
+            if bound_cache_filepath is not None:
+                bound_export_cache.save(bound_cache_filepath)
+
             if export_settings.export_with_ytyp:
                 ytyp = ytyp_from_objects(objs)
                 filepath = os.path.join(
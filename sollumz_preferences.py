@@ -111,6 +111,71 @@ class SollumzExportSettings(bpy.types.PropertyGroup):
         update=_save_preferences
     )
 
+    use_bound_cache: bpy.props.BoolProperty(
+        name="Cache Collisions",
+        description="Reuse the collision bounds calculated in previous exports if their mesh data, transforms and "
+                    "collision materials didn't change",
+        default=True,
+        update=_save_preferences
+    )
+
+    save_bound_cache: bpy.props.BoolProperty(
+        name="Save Collision Cache",
+        description="Store the collision bounds cache in a file next to the .blend file, so it can be reused "
+                    "after restarting Blender",
+        default=False,
+        update=_save_preferences
+    )
+
+    ycd_sequence_frame_limit: bpy.props.IntProperty(
+        name="Sequence Frame Limit",
+        description="Split long animations in sequences of this many frames, each one compressed independently. "
+                    "If 0, all frames are stored in a single sequence",
+        default=0,
+        min=0,
+        update=_save_preferences
+    )
+
+    ycd_compress_channels: bpy.props.BoolProperty(
+        name="Compress Channels",
+        description="Store each animation channel with the smallest encoding that keeps the values within the max "
+                    "errors",
+        default=False,
+        update=_save_preferences
+    )
+
+    ycd_max_error_vector: bpy.props.FloatProperty(
+        name="Max Vector Error",
+        description="Max difference allowed between the exported and the original values of position, scale and "
+                    "other vector tracks",
+        default=0.0005,
+        min=0.0,
+        precision=5,
+        step=0.01,
+        update=_save_preferences
+    )
+
+    ycd_max_error_quaternion: bpy.props.FloatProperty(
+        name="Max Rotation Error",
+        description="Max difference allowed between the exported and the original quaternion components of rotation "
+                    "tracks",
+        default=0.0005,
+        min=0.0,
+        precision=5,
+        step=0.01,
+        update=_save_preferences
+    )
+
+    ycd_max_error_float: bpy.props.FloatProperty(
+        name="Max Float Error",
+        description="Max difference allowed between the exported and the original values of float tracks",
+        default=0.0005,
+        min=0.0,
+        precision=5,
+        step=0.01,
+        update=_save_preferences
+    )
+
     @property
     def export_hi(self):
         return "sollumz_export_very_high" in self.export_lods
@@ -142,6 +207,16 @@ class SollumzImportSettings(bpy.types.PropertyGroup):
         update=_save_preferences
     )
 
+    ybn_batch_bvh_primitives: bpy.props.BoolProperty(
+        name="Batch Primitives",
+        description=(
+            "If enabled, BVH primitives (boxes, spheres, capsules and cylinders) are imported as one object per "
+            "primitive type instead of one object per primitive. Much faster to import large BVHs"
+        ),
+        default=False,
+        update=_save_preferences
+    )
+
     ymap_skip_missing_entities: bpy.props.BoolProperty(
         name="Skip Missing Entities",
         description="If enabled, missing entities wont be created as an empty object",
@@ -192,6 +267,16 @@ class SollumzImportSettings(bpy.types.PropertyGroup):
         default=True,
     )
 
+    instance_entities_as_collections: bpy.props.BoolProperty(
+        name="Use Collection Instances",
+        description=(
+            "If enabled, instanced entities are empties instancing a collection created once per archetype, instead of "
+            "copies of the archetype object and its children. Much lighter when the same archetype is placed many times"
+        ),
+        default=False,
+        update=_save_preferences
+    )
+
 
 class SzSharedTexturesDirectory(bpy.types.PropertyGroup):
     path: StringProperty(
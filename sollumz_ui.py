@@ -6,6 +6,7 @@ from .sollumz_properties import SollumType, MaterialType
 from .lods import (SOLLUMZ_OT_SET_LOD_HIGH, SOLLUMZ_OT_SET_LOD_MED, SOLLUMZ_OT_SET_LOD_LOW, SOLLUMZ_OT_SET_LOD_VLOW,
                    SOLLUMZ_OT_SET_LOD_VERY_HIGH, SOLLUMZ_OT_HIDE_COLLISIONS, SOLLUMZ_OT_HIDE_SHATTERMAPS, SOLLUMZ_OT_HIDE_OBJECT, SOLLUMZ_OT_SHOW_COLLISIONS, SOLLUMZ_OT_SHOW_SHATTERMAPS)
 from .icons import icon_manager
+from . import auto_load
 
 
 def draw_list_with_add_remove(layout: bpy.types.UILayout, add_operator: str, remove_operator: str, *temp_list_args, **temp_list_kwargs):
@@ -151,6 +152,14 @@ class SOLLUMZ_PT_import_ydd(bpy.types.Panel, SollumzImportSettingsPanel):
         layout.prop(settings, "import_ext_skeleton")
 
 
+class SOLLUMZ_PT_import_ybn(bpy.types.Panel, SollumzImportSettingsPanel):
+    bl_label = "Collisions"
+    bl_order = 4
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
+        layout.prop(settings, "ybn_batch_bvh_primitives")
+
+
 class SOLLUMZ_UL_armature_list(bpy.types.UIList):
     bl_idname = "SOLLUMZ_UL_armature_list"
 
@@ -181,6 +190,9 @@ class SOLLUMZ_PT_import_ymap(bpy.types.Panel, SollumzImportSettingsPanel):
         layout.prop(settings, "ymap_skip_missing_entities")
         layout.prop(settings, "ymap_exclude_entities")
         layout.prop(settings, "ymap_instance_entities")
+        row = layout.row()
+        row.active = settings.ymap_instance_entities
+        row.prop(settings, "instance_entities_as_collections")
         layout.prop(settings, "ymap_box_occluders")
         layout.prop(settings, "ymap_model_occluders")
         layout.prop(settings, "ymap_car_generators")
@@ -212,13 +224,15 @@ class SOLLUMZ_PT_export_fragment(bpy.types.Panel, SollumzExportSettingsPanel):
         layout.column().prop(settings, "export_lods")
 
 
-# Empty for now
-# class SOLLUMZ_PT_export_collision(bpy.types.Panel, SollumzExportSettingsPanel):
-#     bl_label = "Collisions"
-#     bl_order = 3
-#
-#     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
-#         pass
+class SOLLUMZ_PT_export_collision(bpy.types.Panel, SollumzExportSettingsPanel):
+    bl_label = "Collisions"
+    bl_order = 3
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
+        layout.prop(settings, "use_bound_cache")
+        row = layout.row()
+        row.active = settings.use_bound_cache
+        row.prop(settings, "save_bound_cache")
 
 
 class SOLLUMZ_PT_export_ydd(bpy.types.Panel, SollumzExportSettingsPanel):
@@ -240,6 +254,20 @@ class SOLLUMZ_PT_export_ymap(bpy.types.Panel, SollumzExportSettingsPanel):
         layout.prop(settings, "ymap_car_generators")
 
 
+class SOLLUMZ_PT_export_ycd(bpy.types.Panel, SollumzExportSettingsPanel):
+    bl_label = "Clip Dictionary"
+    bl_order = 6
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
+        layout.prop(settings, "ycd_sequence_frame_limit")
+        layout.prop(settings, "ycd_compress_channels")
+        col = layout.column()
+        col.active = settings.ycd_compress_channels
+        col.prop(settings, "ycd_max_error_vector")
+        col.prop(settings, "ycd_max_error_quaternion")
+        col.prop(settings, "ycd_max_error_float")
+
+
 class SOLLUMZ_PT_TOOL_PANEL(bpy.types.Panel):
     bl_label = "General"
     bl_idname = "SOLLUMZ_PT_TOOL_PANEL"
@@ -425,6 +453,12 @@ class SOLLUMZ_PT_DEBUG_PANEL(GeneralToolChildPanel, bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
 
+        if not auto_load.is_deferred_registered():
+            # The debug operators are registered the first time they are needed
+            auto_load.request_register_deferred()
+            layout.label(text="Loading...")
+            return
+
         row = layout.row()
         row.operator("sollumz.debug_hierarchy")
         row.prop(context.scene, "debug_sollum_type")
@@ -20,10 +20,32 @@ SOLLUMZ_TEST_TMP_DIR = get_env_path("SOLLUMZ_TEST_TMP_DIR")
 SOLLUMZ_TEST_GAME_ASSETS_DIR = get_env_path("SOLLUMZ_TEST_GAME_ASSETS_DIR")
 SOLLUMZ_TEST_ASSETS_DIR = Path(__file__).parent.joinpath("assets/")
 SOLLUMZ_TEST_VERSIONING_DATA_DIR = Path(__file__).parent.joinpath("versioning/data/")
+SOLLUMZ_TEST_BENCHMARKS = os.getenv("SOLLUMZ_TEST_BENCHMARKS", default="0") == "1"
+SOLLUMZ_TEST_BENCHMARKS_OUTPUT = os.getenv("SOLLUMZ_TEST_BENCHMARKS_OUTPUT", default=None)
+SOLLUMZ_TEST_BENCHMARKS_SCALE = float(os.getenv("SOLLUMZ_TEST_BENCHMARKS_SCALE", default="1.0"))
 
 def is_tmp_dir_available() -> bool:
     return SOLLUMZ_TEST_TMP_DIR is not None
 
+def is_benchmark_enabled() -> bool:
+    return SOLLUMZ_TEST_BENCHMARKS
+
+def benchmark_size(size: int) -> int:
+    """Scales the size of a synthetic benchmark asset by ``SOLLUMZ_TEST_BENCHMARKS_SCALE``."""
+    return max(int(size * SOLLUMZ_TEST_BENCHMARKS_SCALE), 1)
+
+def benchmark_output_path() -> Optional[Path]:
+    """Gets the path of the JSON file where benchmark results are written. Uses ``SOLLUMZ_TEST_BENCHMARKS_OUTPUT`` if
+    set, otherwise a file in the temporary directory. Returns ``None`` if neither is available.
+    """
+    if SOLLUMZ_TEST_BENCHMARKS_OUTPUT is not None:
+        return Path(SOLLUMZ_TEST_BENCHMARKS_OUTPUT)
+
+    if is_tmp_dir_available():
+        return tmp_path("results.json", "benchmarks")
+
+    return None
+
 def tmp_path(file_name: str, subdirectory: Optional[str] = None) -> Path:
     if not is_tmp_dir_available():
         raise Exception("SOLLUMZ_TEST_TMP_DIR environment variable is required.")
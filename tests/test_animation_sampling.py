@@ -0,0 +1,84 @@
+import bpy
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+from ..tools.animationhelper import (
+    sample_fcurve,
+    can_sample_fcurve_keyframes,
+    quaternion_multiply_array,
+    make_quaternions_continuous,
+)
+from mathutils import Quaternion
+
+
+@pytest.fixture
+def fcurve():
+    action = bpy.data.actions.new("test_animation_sampling")
+    fcurve = action.fcurves.new("location", index=0)
+    yield fcurve
+    bpy.data.actions.remove(action)
+
+
+def insert_keyframes(fcurve, keyframes, interpolation):
+    for frame, value in keyframes:
+        kp = fcurve.keyframe_points.insert(frame, value)
+        kp.interpolation = interpolation
+    fcurve.update()
+
+
+@pytest.mark.parametrize("interpolation", ("BEZIER", "LINEAR", "CONSTANT"))
+@pytest.mark.parametrize("keyframes", (
+    ((1.0, 0.0),),
+    ((1.0, 0.0), (10.0, 5.0)),
+    ((1.0, 0.0), (10.0, 5.0), (12.5, -3.0), (40.0, 2.0), (41.0, 2.0)),
+))
+def test_sample_fcurve_matches_evaluate(fcurve, keyframes, interpolation):
+    insert_keyframes(fcurve, keyframes, interpolation)
+    assert can_sample_fcurve_keyframes(fcurve)
+
+    frames = np.linspace(-5.0, 45.0, 601)
+    expected = np.array([fcurve.evaluate(frame) for frame in frames])
+    assert_allclose(sample_fcurve(fcurve, frames), expected, rtol=0.0, atol=1e-4)
+
+
+def test_sample_fcurve_matches_evaluate_with_overlapping_handles(fcurve):
+    insert_keyframes(fcurve, ((0.0, 0.0), (5.0, 1.0), (6.0, -1.0)), "BEZIER")
+    for kp in fcurve.keyframe_points:
+        kp.handle_left_type = "FREE"
+        kp.handle_right_type = "FREE"
+        kp.handle_left = (kp.co[0] - 8.0, kp.co[1] + 2.0)
+        kp.handle_right = (kp.co[0] + 8.0, kp.co[1] - 2.0)
+
+    frames = np.linspace(-1.0, 7.0, 161)
+    expected = np.array([fcurve.evaluate(frame) for frame in frames])
+    assert_allclose(sample_fcurve(fcurve, frames), expected, rtol=0.0, atol=1e-4)
+
+
+def test_sample_fcurve_falls_back_to_evaluate(fcurve):
+    insert_keyframes(fcurve, ((0.0, 0.0), (10.0, 5.0)), "ELASTIC")
+    fcurve.modifiers.new("NOISE")
+    assert not can_sample_fcurve_keyframes(fcurve)
+
+    frames = np.linspace(0.0, 10.0, 21)
+    expected = np.array([fcurve.evaluate(frame) for frame in frames])
+    assert_allclose(sample_fcurve(fcurve, frames), expected)
+
+
+def test_quaternion_multiply_array():
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=(16, 4))
+    b = rng.normal(size=(16, 4))
+
+    expected = np.array([Quaternion(qa) @ Quaternion(qb) for qa, qb in zip(a, b)])
+    assert_allclose(quaternion_multiply_array(a, b), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_make_quaternions_continuous():
+    rng = np.random.default_rng(0)
+    quats = rng.normal(size=(64, 4))
+
+    result = make_quaternions_continuous(quats)
+
+    assert np.all(np.einsum("ij,ij->i", result[:-1], result[1:]) >= 0.0)
+    assert_allclose(np.abs(result), np.abs(quats))
+    assert_allclose(result[0], quats[0])
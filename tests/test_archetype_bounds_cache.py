@@ -0,0 +1,67 @@
+import bpy
+from numpy.testing import assert_allclose
+from ..ytyp.boundcache import ArchetypeBoundsCache, archetype_bounds_cache, on_depsgraph_update_post, on_undo_redo
+from .test_fixtures import context, plane_object
+
+
+def test_archetype_bounds_cache_get_bounds(plane_object):
+    plane_object.location = (5.0, 0.0, 0.0)
+    bpy.context.view_layer.update()
+    cache = ArchetypeBoundsCache()
+
+    bbmin, bbmax = cache.get_bounds(plane_object)
+    assert_allclose(bbmin, (-1.0, -1.0, 0.0))
+    assert_allclose(bbmax, (1.0, 1.0, 0.0))
+
+    bbmin, bbmax = cache.get_bounds(plane_object, apply_transforms=True)
+    assert_allclose(bbmin, (-1.0, -1.0, 0.0))
+    assert_allclose(bbmax, (1.0, 1.0, 0.0))
+    assert len(cache) == 2
+
+
+def test_archetype_bounds_cache_invalidate(plane_object):
+    cache = ArchetypeBoundsCache()
+    cache.get_bounds(plane_object)
+
+    plane_object.data.vertices[0].co.x = -3.0
+    plane_object.data.update()
+    bpy.context.view_layer.update()
+
+    bbmin, _ = cache.get_bounds(plane_object)
+    assert_allclose(bbmin, (-1.0, -1.0, 0.0))
+
+    cache.invalidate(plane_object)
+    bbmin, _ = cache.get_bounds(plane_object)
+    assert_allclose(bbmin, (-3.0, -1.0, 0.0))
+
+
+def test_archetype_bounds_cache_invalidated_by_depsgraph_update(plane_object):
+    assert on_depsgraph_update_post in bpy.app.handlers.depsgraph_update_post
+    archetype_bounds_cache.clear()
+    bpy.context.view_layer.update()
+    archetype_bounds_cache.get_bounds(plane_object)
+    assert len(archetype_bounds_cache) == 1
+
+    plane_object.data.vertices[0].co.x = -3.0
+    plane_object.data.update()
+    bpy.context.view_layer.update()
+
+    assert len(archetype_bounds_cache) == 0
+    bbmin, _ = archetype_bounds_cache.get_bounds(plane_object)
+    assert_allclose(bbmin, (-3.0, -1.0, 0.0))
+
+    plane_object.location = (5.0, 0.0, 0.0)
+    bpy.context.view_layer.update()
+
+    assert len(archetype_bounds_cache) == 0
+    archetype_bounds_cache.clear()
+
+
+def test_archetype_bounds_cache_cleared_on_undo_redo(plane_object):
+    assert on_undo_redo in bpy.app.handlers.undo_post
+    assert on_undo_redo in bpy.app.handlers.redo_post
+    archetype_bounds_cache.get_bounds(plane_object)
+
+    on_undo_redo(bpy.context.scene)
+
+    assert len(archetype_bounds_cache) == 0
@@ -0,0 +1,332 @@
+"""
+Benchmarks of the import/export hot paths, using synthetic assets of configurable size.
+
+Disabled by default. Enable them with the environment variable ``SOLLUMZ_TEST_BENCHMARKS=1``. The asset sizes can be
+scaled with ``SOLLUMZ_TEST_BENCHMARKS_SCALE`` (e.g. ``0.1`` or ``10``). The time of each stage is written as JSON to
+``SOLLUMZ_TEST_BENCHMARKS_OUTPUT`` or to ``benchmarks/results.json`` in ``SOLLUMZ_TEST_TMP_DIR``, so results can be
+compared across commits.
+"""
+import bpy
+import json
+import math
+import platform
+import subprocess
+import time
+import pytest
+import numpy as np
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from xml.etree import ElementTree as ET
+from .shared import is_benchmark_enabled, benchmark_size, benchmark_output_path
+from ..cwxml.element import indent
+from ..cwxml.drawable import Drawable
+from ..cwxml.bound import BoundFile
+from ..cwxml.clipdictionary import ClipDictionary
+from ..cwxml.ymap import CMapData
+from ..sollumz_properties import SollumType
+from ..tools.animationhelper import Track
+from ..tools import jenkhash
+from ..tools.blenderhelper import create_blender_object, create_empty_object
+from ..tools.drawablehelper import convert_obj_to_drawable
+from ..tools.meshhelper import get_uv_map_name
+from ..tools.ymaphelper import create_ymap
+from ..ydr.shader_materials import create_shader
+from ..ydr.vertex_buffer_builder import VertexBufferBuilder, dedupe_and_get_indices
+from ..ydr.ydrexport import create_drawable_xml
+from ..ydr.ydrimport import create_drawable_obj
+from ..ybn.boundcache import bound_export_cache
+from ..ybn.collision_materials import create_collision_material_from_index
+from ..ybn.ybnexport import create_composite_xml
+from ..ybn.ybnimport import create_bound_composite
+from ..ycd.ycdexport import clip_dictionary_from_object, sequence_data_from_frames_data
+from ..ycd.ycdimport import create_anim_obj, create_clip_dictionary_template, clip_dictionary_to_obj
+from ..ymap.ymapexport import ymap_from_object
+from ..ymap.ymapimport import ymap_to_obj
+from .test_jenkhash import generate_data_reference, random_names
+
+pytestmark = pytest.mark.skipif(not is_benchmark_enabled(), reason="SOLLUMZ_TEST_BENCHMARKS is not enabled")
+
+BENCHMARK_RESULTS = []
+
+BLEND_DATA_COLLECTIONS = ("objects", "meshes", "materials", "actions", "images")
+
+
+class StageTimer:
+    """Measures the time of each stage of a benchmark."""
+
+    def __init__(self, name: str, params: dict):
+        self.name = name
+        self.params = params
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, stage_name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage_name] = self.stages.get(stage_name, 0.0) + (time.perf_counter() - start)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "params": self.params,
+            "stages": self.stages,
+            "total": sum(self.stages.values()),
+        }
+
+
+def get_git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@pytest.fixture(scope="module", autouse=True)
+def benchmark_report():
+    yield
+
+    if not BENCHMARK_RESULTS:
+        return
+
+    output_path = benchmark_output_path()
+    if output_path is None:
+        return
+
+    report = {
+        "commit": get_git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "blender_version": bpy.app.version_string,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "results": BENCHMARK_RESULTS,
+    }
+    output_path.write_text(json.dumps(report, indent=2))
+
+
+@pytest.fixture
+def timer(request):
+    """Creates the ``StageTimer`` of the benchmark and stores its results. Removes any data block created by the
+    benchmark afterwards.
+    """
+    existing_ids = {name: set(getattr(bpy.data, name)) for name in BLEND_DATA_COLLECTIONS}
+
+    timer = StageTimer(request.node.originalname.removeprefix("test_benchmark_"), dict(request.node.callspec.params))
+    yield timer
+
+    BENCHMARK_RESULTS.append(timer.to_dict())
+
+    for name in BLEND_DATA_COLLECTIONS:
+        new_ids = [data_block for data_block in getattr(bpy.data, name) if data_block not in existing_ids[name]]
+        bpy.data.batch_remove(new_ids)
+
+
+def write_and_read_xml(timer: StageTimer, xml, file_path: Path, xml_cls):
+    """Runs the serialize, write, parse and build stages. Returns the XML object read back from ``file_path``."""
+    with timer.stage("serialize"):
+        element = xml.to_xml()
+        indent(element)
+
+    with timer.stage("write"):
+        ET.ElementTree(element).write(file_path, encoding="UTF-8", xml_declaration=True)
+
+    with timer.stage("parse"):
+        element_tree = ET.ElementTree()
+        element_tree.parse(file_path)
+
+    with timer.stage("build"):
+        return xml_cls.from_xml(element_tree.getroot())
+
+
+def create_grid_mesh(name: str, num_verts: int, triangulate: bool = False) -> bpy.types.Mesh:
+    """Creates a grid mesh with approximately ``num_verts`` vertices."""
+    size = max(int(math.sqrt(num_verts)), 2)
+    xs, ys = np.meshgrid(np.arange(size, dtype=np.float32), np.arange(size, dtype=np.float32))
+    rng = np.random.default_rng(0)
+    zs = rng.uniform(-0.5, 0.5, size=xs.shape).astype(np.float32)
+    verts = np.stack((xs.ravel(), ys.ravel(), zs.ravel()), axis=1)
+
+    cells = np.arange(size * size).reshape(size, size)[:-1, :-1].ravel()
+    quads = np.stack((cells, cells + 1, cells + size + 1, cells + size), axis=1)
+    if triangulate:
+        faces = np.concatenate((quads[:, (0, 1, 2)], quads[:, (0, 2, 3)]))
+    else:
+        faces = quads
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces.tolist())
+    mesh.update()
+    return mesh
+
+
+@pytest.mark.parametrize("num_verts, num_shaders", (
+    (benchmark_size(10_000), 1),
+    (benchmark_size(100_000), 8),
+))
+def test_benchmark_ydr(timer, tmp_path, num_verts, num_shaders):
+    mesh = create_grid_mesh("benchmark_ydr", num_verts)
+    mesh.uv_layers.new(name=get_uv_map_name(0))
+    for _ in range(num_shaders):
+        mesh.materials.append(create_shader("default.sps"))
+
+    material_indices = np.arange(len(mesh.polygons), dtype=np.int32) % num_shaders
+    mesh.polygons.foreach_set("material_index", material_indices)
+
+    model_obj = bpy.data.objects.new("benchmark_ydr", mesh)
+    bpy.context.collection.objects.link(model_obj)
+    drawable_obj = convert_obj_to_drawable(model_obj)
+
+    with timer.stage("vertex buffer"):
+        vertex_arr = VertexBufferBuilder(mesh).build()
+
+    with timer.stage("dedupe"):
+        dedupe_and_get_indices(vertex_arr)
+
+    with timer.stage("gather"):
+        drawable_xml = create_drawable_xml(drawable_obj)
+
+    drawable_xml = write_and_read_xml(timer, drawable_xml, tmp_path / "benchmark.ydr.xml", Drawable)
+
+    with timer.stage("mesh creation"):
+        create_drawable_obj(drawable_xml, str(tmp_path / "benchmark.ydr.xml"), "benchmark_ydr_imported")
+
+
+@pytest.mark.parametrize("num_triangles", (
+    benchmark_size(10_000),
+    benchmark_size(100_000),
+))
+def test_benchmark_ybn_bvh(timer, tmp_path, num_triangles):
+    mesh = create_grid_mesh("benchmark_ybn", num_triangles // 2, triangulate=True)
+    mesh.materials.append(create_collision_material_from_index(0))
+
+    composite_obj = create_empty_object(SollumType.BOUND_COMPOSITE, "benchmark_ybn")
+    bvh_obj = create_empty_object(SollumType.BOUND_GEOMETRYBVH)
+    bvh_obj.parent = composite_obj
+    poly_obj = create_blender_object(SollumType.BOUND_POLY_TRIANGLE, object_data=mesh)
+    poly_obj.parent = bvh_obj
+
+    bound_export_cache.clear()
+    with timer.stage("gather"):
+        bound_file = BoundFile()
+        bound_file.composite = create_composite_xml(composite_obj)
+
+    bound_file = write_and_read_xml(timer, bound_file, tmp_path / "benchmark.ybn.xml", BoundFile)
+
+    with timer.stage("mesh creation"):
+        create_bound_composite(bound_file.composite, "benchmark_ybn_imported")
+
+
+@pytest.mark.parametrize("num_frames, num_bones", (
+    (benchmark_size(300), 50),
+    (benchmark_size(3_000), 100),
+))
+def test_benchmark_ycd(timer, tmp_path, num_frames, num_bones):
+    clip_dict_obj, _, animations_obj = create_clip_dictionary_template("benchmark_ycd")
+    animation_obj = create_anim_obj(SollumType.ANIMATION)
+    animation_obj.parent = animations_obj
+    animation_obj.animation_properties.hash = "benchmark_ycd_anim"
+
+    action = bpy.data.actions.new("benchmark_ycd_anim")
+    animation_obj.animation_properties.action = action
+
+    rng = np.random.default_rng(0)
+    frames = np.arange(num_frames, dtype=np.float32)
+    for bone_id in range(num_bones):
+        for data_path, num_components in (("location", 3), ("rotation_quaternion", 4)):
+            values = np.cumsum(rng.normal(scale=0.01, size=(num_frames, num_components)), axis=0)
+            if num_components == 4:
+                values[:, 0] += 1.0
+                values /= np.linalg.norm(values, axis=1, keepdims=True)
+
+            for index in range(num_components):
+                fcurve = action.fcurves.new(f'pose.bones["#{bone_id}"].{data_path}', index=index)
+                fcurve.keyframe_points.add(num_frames)
+                co = np.stack((frames, values[:, index].astype(np.float32)), axis=1)
+                fcurve.keyframe_points.foreach_set("co", co.ravel())
+                fcurve.keyframe_points.foreach_set("interpolation", np.ones(num_frames, dtype=np.int32))  # LINEAR
+                fcurve.update()
+
+    with timer.stage("gather"):
+        clip_dictionary = clip_dictionary_from_object(clip_dict_obj)
+
+    clip_dictionary = write_and_read_xml(timer, clip_dictionary, tmp_path / "benchmark.ycd.xml", ClipDictionary)
+
+    with timer.stage("action creation"):
+        clip_dictionary_to_obj(clip_dictionary, "benchmark_ycd_imported")
+
+
+@pytest.mark.parametrize("num_entities", (
+    benchmark_size(100),
+    benchmark_size(1_000),
+))
+def test_benchmark_ymap(timer, tmp_path, num_entities):
+    ymap_obj = create_ymap("benchmark_ymap")
+    group_obj = create_empty_object(SollumType.YMAP_ENTITY_GROUP)
+    group_obj.parent = ymap_obj
+
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-2000.0, 2000.0, size=(num_entities, 3))
+    for i in range(num_entities):
+        entity_obj = create_empty_object(SollumType.DRAWABLE, f"benchmark_archetype_{i}")
+        entity_obj.location = positions[i]
+        entity_obj.parent = group_obj
+
+    with timer.stage("gather"):
+        ymap_xml = ymap_from_object(ymap_obj)
+
+    ymap_xml = write_and_read_xml(timer, ymap_xml, tmp_path / "benchmark.ymap.xml", CMapData)
+
+    with timer.stage("object creation"):
+        ymap_to_obj(ymap_xml)
+
+
+@pytest.mark.parametrize("num_names", (
+    benchmark_size(1_000),
+    benchmark_size(100_000),
+))
+def test_benchmark_jenkhash(timer, num_names):
+    names = random_names(num_names)
+    names_bytes = [name.lower().encode() for name in names]
+
+    jenkhash.Generate.cache_clear()
+    with timer.stage("reference"):
+        [generate_data_reference(bts) for bts in names_bytes]
+
+    with timer.stage("GenerateData"):
+        [jenkhash.GenerateData(bts) for bts in names_bytes]
+
+    with timer.stage("Generate (cold)"):
+        [jenkhash.Generate(name) for name in names]
+
+    with timer.stage("Generate (warm)"):
+        [jenkhash.Generate(name) for name in names]
+
+    with timer.stage("GenerateBatch"):
+        jenkhash.GenerateBatch(names)
+
+
+@pytest.mark.parametrize("num_frames", (
+    benchmark_size(1_000),
+    benchmark_size(10_000),
+    benchmark_size(100_000),
+))
+def test_benchmark_ycd_sequence_data(timer, num_frames):
+    # roughly the tracks of a long clip dictionary: many animated bones with a mix of smooth, stepped and
+    # constant components
+    rng = np.random.default_rng(0)
+    tracks = []
+    for i in range(200):
+        frames_data = np.cumsum(rng.normal(scale=0.01, size=(num_frames, 4)), axis=0).astype(np.float32)
+        if i % 3 == 0:
+            frames_data = np.round(frames_data, 1)
+        elif i % 3 == 1:
+            frames_data[:, 1:] = 0.0
+        tracks.append(frames_data)
+
+    with timer.stage("encode"):
+        for frames_data in tracks:
+            sequence_data_from_frames_data(Track.BoneRotation, frames_data)
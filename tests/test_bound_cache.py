@@ -0,0 +1,175 @@
+import bpy
+import pytest
+from mathutils import Vector
+from .shared import is_tmp_dir_available, tmp_path
+from .test_fixtures import context, plane_object
+from ..cwxml.bound import BoundBox, BoundGeometry, PolyTriangle
+from ..sollumz_properties import SollumType
+from ..sollumz_preferences import get_export_settings
+from ..tools.blenderhelper import create_empty_object
+from ..ybn import ybnexport
+from ..ybn.boundcache import BoundExportCache, bound_export_cache
+from ..ybn.collision_materials import create_collision_material_from_index
+
+
+def create_test_bound() -> BoundGeometry:
+    bound = BoundGeometry()
+    bound.box_min = Vector((-1.0, -1.0, -1.0))
+    bound.box_max = Vector((1.0, 1.0, 1.0))
+    bound.volume = 8.0
+    bound.vertices = [Vector((0.0, 0.0, 0.0)), Vector((1.0, 0.0, 0.0)), Vector((0.0, 1.0, 0.0))]
+    tri = PolyTriangle()
+    tri.v1, tri.v2, tri.v3 = 0, 1, 2
+    bound.polygons = [tri]
+    return bound
+
+
+def test_bound_cache_returns_copies():
+    cache = BoundExportCache()
+    bound = create_test_bound()
+
+    cache.set("key", bound)
+    bound.volume = 1.0
+
+    cached = cache.get("key")
+    assert isinstance(cached, BoundGeometry)
+    assert cached.volume == 8.0
+
+    cached.unk_type = 2
+    cached.vertices[0].x = 5.0
+    cached_again = cache.get("key")
+    assert cached_again.unk_type == 1
+    assert cached_again.vertices[0].x == 0.0
+
+
+def test_bound_cache_evicts_least_recently_used():
+    cache = BoundExportCache(max_entries=2)
+    cache.set("a", BoundBox())
+    cache.set("b", BoundBox())
+    cache.get("a")
+    cache.set("c", BoundBox())
+
+    assert len(cache) == 2
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+if is_tmp_dir_available():
+    def test_bound_cache_save_and_load():
+        filepath = str(tmp_path("test.sollumz_bounds_cache.xml", "bound_cache"))
+        cache = BoundExportCache()
+        cache.set("key", create_test_bound())
+        cache.save(filepath)
+
+        loaded_cache = BoundExportCache()
+        loaded_cache.load(filepath)
+
+        loaded = loaded_cache.get("key")
+        assert isinstance(loaded, BoundGeometry)
+        assert loaded.volume == 8.0
+        assert len(loaded.vertices) == 3
+        assert len(loaded.polygons) == 1
+
+
+@pytest.fixture()
+def bvh_object(plane_object):
+    bvh_obj = create_empty_object(SollumType.BOUND_GEOMETRYBVH)
+    plane_object.sollum_type = SollumType.BOUND_POLY_TRIANGLE
+    plane_object.data.materials.append(create_collision_material_from_index(0))
+    plane_object.parent = bvh_obj
+    bpy.context.view_layer.update()
+
+    yield bvh_obj
+
+    bpy.data.materials.remove(plane_object.data.materials[0])
+    bpy.data.objects.remove(bvh_obj)
+
+
+@pytest.fixture()
+def use_bound_cache():
+    settings = get_export_settings()
+    prev_use_bound_cache = settings.use_bound_cache
+    settings.use_bound_cache = True
+    bound_export_cache.clear()
+
+    yield
+
+    settings.use_bound_cache = prev_use_bound_cache
+    bound_export_cache.clear()
+
+
+def test_bound_cache_key_unchanged(bvh_object):
+    assert ybnexport.get_bound_cache_key(bvh_object) == ybnexport.get_bound_cache_key(bvh_object)
+
+
+def _move_vertex(bvh_obj):
+    bvh_obj.children[0].data.vertices[0].co.x = -3.0
+
+
+def _set_procedural_id(bvh_obj):
+    bvh_obj.children[0].data.materials[0].collision_properties.procedural_id = 5
+
+
+def _set_collision_flag(bvh_obj):
+    bvh_obj.children[0].data.materials[0].collision_flags.stairs = True
+
+
+def _move_child(bvh_obj):
+    bvh_obj.children[0].location.x = 2.0
+
+
+def _rotate_child(bvh_obj):
+    bvh_obj.children[0].rotation_euler.z = 0.5
+
+
+def _set_composite_flags1(bvh_obj):
+    bvh_obj.composite_flags1.map_weapon = True
+
+
+def _set_composite_flags2(bvh_obj):
+    bvh_obj.composite_flags2.map_vehicle = True
+
+
+@pytest.mark.parametrize("edit", (
+    _move_vertex,
+    _set_procedural_id,
+    _set_collision_flag,
+    _move_child,
+    _rotate_child,
+    _set_composite_flags1,
+    _set_composite_flags2,
+))
+def test_bound_cache_key_changes_on_edit(bvh_object, edit):
+    key = ybnexport.get_bound_cache_key(bvh_object)
+
+    edit(bvh_object)
+    bpy.context.view_layer.update()
+
+    assert ybnexport.get_bound_cache_key(bvh_object) != key
+
+
+def test_bound_cache_hit_for_unchanged_object(bvh_object, use_bound_cache, monkeypatch):
+    bound_xml = ybnexport.create_bound_xml(bvh_object)
+    assert len(bound_export_cache) == 1
+
+    def _gather_bound_xml_uncached(obj, is_root=False):
+        raise AssertionError(f"'{obj.name}' should have been found in the cache")
+
+    monkeypatch.setattr(ybnexport, "gather_bound_xml_uncached", _gather_bound_xml_uncached)
+    cached_bound_xml = ybnexport.create_bound_xml(bvh_object)
+
+    assert cached_bound_xml is not bound_xml
+    assert cached_bound_xml.volume == bound_xml.volume
+    assert len(cached_bound_xml.vertices) == len(bound_xml.vertices)
+
+
+def test_bound_cache_miss_after_edit(bvh_object, use_bound_cache):
+    bound_xml = ybnexport.create_bound_xml(bvh_object)
+
+    _move_vertex(bvh_object)
+    bpy.context.view_layer.update()
+    edited_bound_xml = ybnexport.create_bound_xml(bvh_object)
+
+    assert len(bound_export_cache) == 2
+    assert edited_bound_xml.box_min.x < bound_xml.box_min.x
@@ -1,9 +1,9 @@
 import pytest
 import bpy
-from ..ydr.shader_materials import shadermats
+from ..ydr.shader_materials import get_shader_materials
 from ..ybn.collision_materials import collisionmats
 
-SOLLUMZ_SHADERS = list(map(lambda s: s.value, shadermats))
+SOLLUMZ_SHADERS = list(map(lambda s: s.value, get_shader_materials()))
 SOLLUMZ_COLLISION_MATERIALS = list(collisionmats)
 BLENDER_LANGUAGES = ("en_US", "es")  # bpy.app.translations.locales
 
@@ -1,6 +1,6 @@
 import pytest
 import numpy as np
-from ..shared.geometry import shrink_mesh
+from ..shared.geometry import shrink_mesh, get_bounding_ball
 from .shared import SOLLUMZ_TEST_ASSETS_DIR
 
 def read_shrink_mesh_test_data(file_path):
@@ -41,3 +41,28 @@ def test_geometry_shrink_mesh(test_data_file_name):
                   f"   diff={output_vertex - expected_vertex}\n")
 
     assert n == 0, f"{n} / {len(output_vertices)}{s}"
+
+
+@pytest.mark.parametrize("points, expected_center, expected_radius", (
+    ([(1.0, 2.0, 3.0)], (1.0, 2.0, 3.0), 0.0),
+    ([(1.0, 0.0, 0.0)] * 5, (1.0, 0.0, 0.0), 0.0),
+    ([(-1.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 0.0, 0.0), (0.5, 0.0, 0.0)], (0.0, 0.0, 0.0), 1.0),
+    ([(-1.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, -1.0, 0.0), (0.2, 0.3, 0.0)], (0.0, 0.0, 0.0), 1.0),
+    ([(x, y, z) for x in (0.0, 2.0) for y in (0.0, 2.0) for z in (0.0, 2.0)], (1.0, 1.0, 1.0), np.sqrt(3.0)),
+))
+def test_geometry_get_bounding_ball(points, expected_center, expected_radius):
+    center, r2 = get_bounding_ball(np.array(points))
+
+    assert np.allclose(center, expected_center, atol=1e-6)
+    assert np.sqrt(r2) == pytest.approx(expected_radius, abs=1e-6)
+
+
+def test_geometry_get_bounding_ball_contains_all_points():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(5000, 3))
+
+    center, r2 = get_bounding_ball(points)
+    center2, r22 = get_bounding_ball(points)
+
+    assert np.square(points - center).sum(axis=1).max() <= r2 + 1e-6
+    assert np.array_equal(center, center2) and r2 == r22
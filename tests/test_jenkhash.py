@@ -0,0 +1,61 @@
+import random
+import string
+import pytest
+from ..tools import jenkhash
+
+
+def generate_data_reference(bts: bytes, seed=0):
+    """Original per-byte implementation, kept to verify and benchmark the current one."""
+    h = seed
+
+    for b in bts:
+        h += b
+        h &= 0xFFFFFFFF
+        h += (h << 10) & 0xFFFFFFFF
+        h &= 0xFFFFFFFF
+        h ^= (h >> 6) & 0xFFFFFFFF
+        h &= 0xFFFFFFFF
+
+    h += (h << 3) & 0xFFFFFFFF
+    h &= 0xFFFFFFFF
+    h ^= (h >> 11) & 0xFFFFFFFF
+    h &= 0xFFFFFFFF
+    h += (h << 15) & 0xFFFFFFFF
+    h &= 0xFFFFFFFF
+
+    return h
+
+
+def random_names(num_names: int, max_length: int = 40) -> list[str]:
+    rnd = random.Random(0)
+    chars = string.ascii_letters + string.digits + "_"
+    return ["".join(rnd.choice(chars) for _ in range(rnd.randint(0, max_length))) for _ in range(num_names)]
+
+
+@pytest.mark.parametrize("name, expected", (
+    ("adder", 0xB779A091),
+    ("ADDER", 0xB779A091),
+    ("hash_B779A091", 0xB779A091),
+    ("", 0),
+))
+def test_name_to_hash(name, expected):
+    assert jenkhash.name_to_hash(name) == expected
+
+
+@pytest.mark.parametrize("seed", (0, 12345, 0xFFFFFFFF))
+def test_generate_matches_reference(seed):
+    for name in random_names(500):
+        assert jenkhash.Generate(name, seed=seed) == generate_data_reference(name.lower().encode(), seed)
+
+
+@pytest.mark.parametrize("seed", (0, 12345, 0xFFFFFFFF))
+def test_generate_batch_matches_reference(seed):
+    names = random_names(500)
+    expected = [generate_data_reference(name.lower().encode(), seed) for name in names]
+    assert jenkhash.GenerateBatch(names, seed=seed).tolist() == expected
+
+
+def test_names_to_hashes():
+    names = ["adder", "hash_DEADBEEF", "", "prop_tree_01"]
+    assert jenkhash.names_to_hashes(names).tolist() == [jenkhash.name_to_hash(name) for name in names]
+    assert len(jenkhash.names_to_hashes([])) == 0
@@ -0,0 +1,33 @@
+import pytest
+import numpy as np
+from mathutils import Vector, Matrix
+from ..tools.obb import get_obb, get_obb_extents, OBBMethod
+
+
+def get_rotated_box_verts(size: Vector, rotation: Matrix) -> list[Vector]:
+    return [rotation @ Vector((x * size.x, y * size.y, z * size.z)) for x in (0, 1) for y in (0, 1) for z in (0, 1)]
+
+
+@pytest.mark.parametrize("method", (OBBMethod.EXACT, OBBMethod.SAMPLED))
+def test_obb_of_axis_aligned_box(method: OBBMethod):
+    size = Vector((1.0, 2.0, 3.0))
+    verts = get_rotated_box_verts(size, Matrix.Identity(3))
+
+    obb, _ = get_obb(verts, 100, 2, method)
+    bbmin, bbmax = get_obb_extents(obb)
+
+    assert np.prod(bbmax - bbmin) == pytest.approx(size.x * size.y * size.z, rel=1e-3)
+
+
+def test_obb_exact_of_rotated_box():
+    size = Vector((1.0, 2.0, 3.0))
+    rotation = Matrix.Rotation(0.3, 3, Vector((1.0, 2.0, 0.5)).normalized())
+    verts = get_rotated_box_verts(size, rotation)
+
+    obb, world_matrix = get_obb(verts, 100, 2, OBBMethod.EXACT)
+    bbmin, bbmax = get_obb_extents(obb)
+
+    assert np.prod(bbmax - bbmin) == pytest.approx(size.x * size.y * size.z, rel=1e-3)
+    for vert in verts:
+        local_vert = world_matrix.inverted() @ vert
+        assert all(bbmin[i] - 1e-4 <= local_vert[i] <= bbmax[i] + 1e-4 for i in range(3))
@@ -0,0 +1,114 @@
+import bpy
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+from mathutils import Vector
+from ..cwxml.bound import BoundGeometryBVH, Material, PolyBox, PolySphere, PolyCapsule, PolyCylinder
+from ..sollumz_preferences import get_import_settings
+from ..sollumz_properties import SollumType
+from ..ybn.ybnimport import create_bvh_obj
+from ..ybn.ybnexport import create_bvh_xml
+from ..ybn.primitivebatch import PRIMITIVE_INDEX_ATTR, is_batched_primitives_object
+
+
+def create_test_bvh() -> BoundGeometryBVH:
+    bvh = BoundGeometryBVH()
+    bvh.geometry_center = Vector((5.0, -2.0, 1.0))
+    bvh.vertices = [
+        # box corners
+        Vector((0.0, 0.0, 0.0)), Vector((2.0, 0.0, 3.0)), Vector((0.0, 1.0, 3.0)), Vector((2.0, 1.0, 0.0)),
+        # sphere centers
+        Vector((4.0, 4.0, 4.0)), Vector((-3.0, 1.0, 0.5)),
+        # capsule and cylinder ends
+        Vector((1.0, 1.0, 1.0)), Vector((2.0, 3.0, 1.5)),
+        Vector((-1.0, 0.0, 0.0)), Vector((-1.0, 0.0, 4.0)),
+    ]
+    for material_type in (1, 5):
+        mat_xml = Material()
+        mat_xml.type = material_type
+        bvh.materials.append(mat_xml)
+
+    def _add_poly(poly_type, material_index, **attrs):
+        poly = poly_type()
+        poly.material_index = material_index
+        for name, value in attrs.items():
+            setattr(poly, name, value)
+        bvh.polygons.append(poly)
+
+    _add_poly(PolyBox, 0, v1=0, v2=1, v3=2, v4=3)
+    _add_poly(PolySphere, 1, v=4, radius=0.5)
+    _add_poly(PolySphere, 0, v=5, radius=2.0)
+    _add_poly(PolyCapsule, 1, v1=6, v2=7, radius=0.25)
+    _add_poly(PolyCapsule, 0, v1=8, v2=9, radius=1.0)
+    _add_poly(PolyCylinder, 1, v1=8, v2=9, radius=0.75)
+    return bvh
+
+
+@pytest.fixture(params=(False, True), ids=("objects", "batched"))
+def batch_bvh_primitives(request):
+    settings = get_import_settings()
+    prev_batch_bvh_primitives = settings.ybn_batch_bvh_primitives
+    settings.ybn_batch_bvh_primitives = request.param
+
+    yield request.param
+
+    settings.ybn_batch_bvh_primitives = prev_batch_bvh_primitives
+
+
+def get_poly_shapes(bvh: BoundGeometryBVH) -> list[tuple[str, int, float, np.ndarray]]:
+    """Get the type, material type, radius and vertex positions of each polygon in ``bvh``."""
+    vertices = np.array(bvh.vertices, dtype=np.float64).reshape((-1, 3)) + np.array(bvh.geometry_center)
+    shapes = []
+    for poly in bvh.polygons:
+        vertex_names = {PolyBox: ("v1", "v2", "v3", "v4"), PolySphere: ("v",)}.get(type(poly), ("v1", "v2"))
+        positions = vertices[[getattr(poly, name) for name in vertex_names]]
+        # the exporter can start from a different box corner or end
+        positions = positions[np.lexsort(positions.T[::-1])]
+        shapes.append((poly.tag_name, bvh.materials[poly.material_index].type, getattr(poly, "radius", 0.0),
+                       positions))
+
+    return sorted(shapes, key=lambda shape: shape[0])
+
+
+def test_bvh_primitives_import_export(batch_bvh_primitives):
+    bvh = create_test_bvh()
+    bvh_obj = create_bvh_obj(bvh)
+
+    child_objs = list(bvh_obj.children)
+    assert len(child_objs) == (4 if batch_bvh_primitives else 6)
+    assert all(is_batched_primitives_object(obj) == batch_bvh_primitives for obj in child_objs)
+
+    exported_bvh = create_bvh_xml(bvh_obj)
+
+    expected_shapes = get_poly_shapes(bvh)
+    shapes = get_poly_shapes(exported_bvh)
+    assert [shape[:2] for shape in shapes] == [shape[:2] for shape in expected_shapes]
+    for (_, _, radius, positions), (_, _, expected_radius, expected_positions) in zip(shapes, expected_shapes):
+        assert radius == pytest.approx(expected_radius, abs=1e-4)
+        assert_allclose(positions, expected_positions, atol=1e-4)
+
+    bpy.data.batch_remove([bvh_obj, *child_objs])
+
+
+@pytest.mark.parametrize("batch_bvh_primitives", (True,), indirect=True)
+def test_batched_bvh_primitives_edited(batch_bvh_primitives):
+    bvh = create_test_bvh()
+    bvh_obj = create_bvh_obj(bvh)
+    spheres_obj = next(obj for obj in bvh_obj.children if obj.sollum_type == SollumType.BOUND_POLY_SPHERE)
+
+    # move the first sphere and take a vertex out of the second one
+    mesh = spheres_obj.data
+    num_sphere_vertices = len(mesh.vertices) // 2
+    for vertex in mesh.vertices[:num_sphere_vertices]:
+        vertex.co.z += 10.0
+    mesh.attributes[PRIMITIVE_INDEX_ATTR].data[num_sphere_vertices].value = 2
+
+    exported_bvh = create_bvh_xml(bvh_obj)
+
+    spheres = [shape for shape in get_poly_shapes(exported_bvh) if shape[0] == "Sphere"]
+    assert len(spheres) == 1
+    expected_center = np.array(bvh.vertices[4]) + np.array(bvh.geometry_center) + (0.0, 0.0, 10.0)
+    assert_allclose(spheres[0][3][0], expected_center, atol=1e-4)
+    assert spheres[0][2] == pytest.approx(0.5, abs=1e-4)
+
+    bpy.data.batch_remove([bvh_obj, *bvh_obj.children])
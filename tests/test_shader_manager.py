@@ -47,3 +47,13 @@ def test_find_shader_base_name(filename: str, expected: str):
 def test_find_shader_base_name_unknown_returns_none(filename: str):
     shader = ShaderManager.find_shader_base_name(filename)
     assert shader is None
+
+
+def test_shader_variants_share_definition():
+    default = ShaderManager.find_shader("default.sps")
+    cutout = ShaderManager.find_shader("cutout.sps")
+    assert default is not cutout
+    assert default.filename == "default.sps"
+    assert cutout.filename == "cutout.sps"
+    assert default.parameters is cutout.parameters
+    assert default.parameter_map is cutout.parameter_map
@@ -0,0 +1,55 @@
+import bpy
+from ..sollumz_helper import instance_object_with_children, set_object_collection
+from ..sollumz_properties import SollumType
+from .test_fixtures import context, plane_object
+
+
+def test_instance_object_with_children_shares_collection(plane_object):
+    plane_object.sollum_type = SollumType.DRAWABLE
+    num_objects = len(bpy.data.objects)
+
+    instance_a = instance_object_with_children(plane_object)
+    instance_b = instance_object_with_children(plane_object)
+
+    assert len(bpy.data.objects) == num_objects + 2
+    assert instance_a.instance_type == "COLLECTION"
+    assert instance_a.instance_collection is not None
+    assert instance_a.instance_collection == instance_b.instance_collection
+    assert plane_object.name in instance_a.instance_collection.objects
+    assert instance_a.sollum_type == SollumType.DRAWABLE
+
+    collection = instance_a.instance_collection
+    bpy.data.objects.remove(instance_a)
+    bpy.data.objects.remove(instance_b)
+    bpy.data.collections.remove(collection)
+
+
+def test_instance_object_with_children_long_name(plane_object):
+    plane_object.name = "x" * 63
+    plane_object.sollum_type = SollumType.DRAWABLE
+
+    instance_a = instance_object_with_children(plane_object)
+    instance_b = instance_object_with_children(plane_object)
+
+    collection = instance_a.instance_collection
+    assert collection == instance_b.instance_collection
+    assert collection.name.endswith(".instance")
+
+    bpy.data.objects.remove(instance_a)
+    bpy.data.objects.remove(instance_b)
+    bpy.data.collections.remove(collection)
+
+
+def test_set_object_collection_keeps_instance_collection(plane_object):
+    plane_object.sollum_type = SollumType.DRAWABLE
+    instance = instance_object_with_children(plane_object)
+    collection = instance.instance_collection
+
+    set_object_collection(plane_object)
+
+    assert plane_object.name in collection.objects
+    assert instance_object_with_children(plane_object).instance_collection == collection
+
+    for obj in list(collection.users_dupli_group):
+        bpy.data.objects.remove(obj)
+    bpy.data.collections.remove(collection)
@@ -0,0 +1,188 @@
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+from ..cwxml import clipdictionary as ycdxml
+from ..tools.animationhelper import Track, TrackFormat, get_quantum_and_min_val
+from ..ycd.ycdexport import build_values_channel, sequence_data_from_frames_data, get_sequence_frame_ranges
+from ..ycd.channelcompression import (
+    build_linear_float_channel,
+    compress_values_channel,
+    compress_track_channels,
+    encode_linear_float_data,
+    fit_piecewise_linear,
+    get_channel_size,
+)
+
+
+def test_get_quantum_and_min_val():
+    min_val, quantum = get_quantum_and_min_val([2.0, 2.5, 4.0, 3.75])
+    assert min_val == 2.0
+    assert quantum == 0.25
+
+
+def test_get_quantum_and_min_val_constant():
+    min_val, quantum = get_quantum_and_min_val([0.0, 0.0, 0.0])
+    assert min_val == 0.0
+    assert quantum == 0.0
+
+
+def test_build_values_channel_static():
+    channel = build_values_channel(np.full(30, 1.5, dtype=np.float32))
+    assert isinstance(channel, ycdxml.ChannelsList.StaticFloat)
+    assert channel.value == 1.5
+
+
+def test_build_values_channel_indirect_quantize():
+    values = np.tile(np.array([0.5, -1.0, 0.25], dtype=np.float32), 20)
+    channel = build_values_channel(values)
+    assert isinstance(channel, ycdxml.ChannelsList.IndirectQuantizeFloat)
+    assert len(channel.values) == 3
+    assert len(channel.frames) == len(values)
+    assert_allclose(np.array(channel.values)[channel.frames], values)
+
+
+def test_build_values_channel_quantize():
+    values = np.linspace(0.0, 1.0, 30, dtype=np.float32)
+    channel = build_values_channel(values)
+    assert isinstance(channel, ycdxml.ChannelsList.QuantizeFloat)
+    assert_allclose(channel.values, values)
+    assert channel.offset == 0.0
+
+
+def test_sequence_data_from_frames_data_quaternion_channels_order():
+    frames_data = np.zeros((10, 4), dtype=np.float32)
+    frames_data[:, 0] = 1.0  # W
+    frames_data[:, 1] = np.linspace(0.0, 1.0, 10)  # X
+    sequence_data = sequence_data_from_frames_data(Track.BoneRotation, frames_data)
+
+    channels = sequence_data.channels
+    assert len(channels) == 4
+    assert isinstance(channels[0], ycdxml.ChannelsList.QuantizeFloat)
+    assert all(isinstance(c, ycdxml.ChannelsList.StaticFloat) for c in channels[1:])
+    assert [c.value for c in channels[1:]] == [0.0, 0.0, 1.0]
+
+
+def test_sequence_data_from_frames_data_static_vector():
+    frames_data = np.tile(np.array([1.0, 2.0, 3.0], dtype=np.float32), (10, 1))
+    sequence_data = sequence_data_from_frames_data(Track.BonePosition, frames_data)
+
+    channels = sequence_data.channels
+    assert len(channels) == 1
+    assert isinstance(channels[0], ycdxml.ChannelsList.StaticVector3)
+    assert tuple(channels[0].value) == (1.0, 2.0, 3.0)
+
+
+@pytest.mark.parametrize("frame_count, sequence_frame_limit, expected_ranges", (
+    (709, 0, [(0, 709)]),
+    (501, 511, [(0, 501)]),
+    # same split as the vanilla sequences in roundtrip_anim_clip_anim_list.ycd.xml
+    (709, 191, [(0, 192), (191, 383), (382, 574), (573, 709)]),
+    (574, 191, [(0, 192), (191, 383), (382, 574), (573, 574)]),
+))
+def test_get_sequence_frame_ranges(frame_count, sequence_frame_limit, expected_ranges):
+    assert get_sequence_frame_ranges(frame_count, sequence_frame_limit) == expected_ranges
+
+
+def decode_channel(channel, num_frames):
+    return np.array([channel.get_value(frame_id, []) for frame_id in range(num_frames)])
+
+
+COMPRESSION_TEST_VALUES = {
+    "linear": np.linspace(0.0, 6.0, 600),
+    "piecewise_linear": np.interp(np.arange(600), (0, 100, 350, 599), (0.0, 2.0, -1.0, 3.0)),
+    "sine": np.sin(np.arange(600) / 40.0),
+    "noise": np.random.default_rng(0).normal(size=600),
+    "steps": np.repeat(np.random.default_rng(0).integers(0, 4, 20), 30) * 0.5,
+    "constant": np.full(600, 0.3),
+}
+
+
+@pytest.mark.parametrize("max_error", (0.0, 0.0005, 0.01))
+@pytest.mark.parametrize("values_name", COMPRESSION_TEST_VALUES.keys())
+def test_compress_values_channel_within_max_error(values_name, max_error):
+    values = COMPRESSION_TEST_VALUES[values_name].astype(np.float32)
+    channel, decoded = compress_values_channel(values, max_error)
+
+    assert_allclose(decode_channel(channel, len(values)), decoded)
+    assert np.abs(decoded - values).max() <= max_error + 1e-6
+
+
+def test_compress_values_channel_falls_back_to_raw_float():
+    values = COMPRESSION_TEST_VALUES["sine"].astype(np.float32)
+    channel, decoded = compress_values_channel(values, 0.0)
+
+    assert isinstance(channel, ycdxml.ChannelsList.RawFloat)
+    assert_allclose(decoded, values, rtol=0, atol=0)
+
+
+def test_compress_values_channel_prefers_linear_float_for_smooth_values():
+    values = COMPRESSION_TEST_VALUES["piecewise_linear"].astype(np.float32)
+    channel, _ = compress_values_channel(values, 0.0005)
+
+    assert isinstance(channel, ycdxml.ChannelsList.LinearFloat)
+    quantize_channel = build_values_channel(values)
+    assert get_channel_size(channel) < get_channel_size(quantize_channel)
+
+
+@pytest.mark.parametrize("num_frames", (1, 2, 64, 65, 600))
+def test_encode_linear_float_data_round_trip(num_frames):
+    quantized = np.random.default_rng(0).integers(0, 5000, num_frames)
+    data, counts = encode_linear_float_data(quantized)
+
+    assert_array_equal(ycdxml.decode_linear_float_data(data, counts, num_frames), quantized)
+
+
+@pytest.mark.parametrize("max_error", (0.0005, 0.01))
+@pytest.mark.parametrize("values_name", COMPRESSION_TEST_VALUES.keys())
+def test_linear_float_channel_round_trip(values_name, max_error):
+    values = COMPRESSION_TEST_VALUES[values_name]
+    channel, decoded = build_linear_float_channel(values, max_error)
+    channel = ycdxml.ChannelsList.LinearFloat.from_xml(channel.to_xml())
+
+    assert channel.numints == len(channel.data)
+    frame_ids = np.arange(len(values))
+    channel_values = channel.get_values(frame_ids, [])
+    # quantum and offset are rounded in the XML
+    assert_allclose(channel_values, decoded, atol=1e-6)
+    assert np.abs(channel_values - values).max() <= max_error + 1e-6
+
+
+def test_fit_piecewise_linear():
+    values = COMPRESSION_TEST_VALUES["sine"]
+    fitted = fit_piecewise_linear(values, 0.001)
+
+    assert np.abs(fitted - values).max() <= 0.001 + 1e-9
+    # most frames should be on straight lines
+    assert np.count_nonzero(np.abs(np.diff(fitted, 2)) > 1e-9) < len(values) // 4
+
+
+def test_compress_values_channel_static_within_max_error():
+    values = np.array([1.0, 1.0004, 0.9996, 1.0], dtype=np.float32)
+    channel, _ = compress_values_channel(values, 0.0005)
+
+    assert isinstance(channel, ycdxml.ChannelsList.StaticFloat)
+
+
+def test_compress_track_channels_cached_quaternion():
+    angles = np.linspace(0.0, 2.0, 600)
+    quats = np.stack((np.cos(angles / 2), np.sin(angles / 2) * 0.6, np.sin(angles / 2) * 0.8, np.zeros(600)), axis=1)
+    channels = compress_track_channels(TrackFormat.Quaternion, quats.astype(np.float32), 0.0005)
+
+    assert len(channels) == 4
+    cached_channel = channels[3]
+    assert isinstance(cached_channel, ycdxml.ChannelsList.CachedQuaternion1)
+    assert cached_channel.quat_index == 3  # W, channels are in XYZW order
+
+    stored = np.stack([decode_channel(c, len(quats)) for c in channels[:3]], axis=1)
+    w = np.sqrt(np.maximum(1.0 - np.einsum("ij,ij->i", stored, stored), 0.0))
+    assert np.abs(stored - quats[:, 1:]).max() <= 0.0005 + 1e-6
+    assert np.abs(w - quats[:, 0]).max() <= 0.0005 + 1e-6
+
+
+def test_compress_track_channels_static_vector():
+    frames_data = np.tile(np.array([1.0, 2.0, 3.0], dtype=np.float32), (10, 1))
+    frames_data[5, 0] += 0.0001
+    channels = compress_track_channels(TrackFormat.Vector3, frames_data, 0.0005)
+
+    assert len(channels) == 1
+    assert isinstance(channels[0], ycdxml.ChannelsList.StaticVector3)
@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+from ..cwxml import clipdictionary as ycdxml
+from ..tools.animationhelper import Track, TrackFormatMap
+from ..ycd.ycdexport import sequence_data_from_frames_data, get_sequence_frame_ranges
+from ..ycd.ycdimport import combine_sequences_and_build_action_data, get_quaternion_from_sequence_data
+
+
+def build_test_channels():
+    static = ycdxml.ChannelsList.StaticFloat()
+    static.value = 2.5
+
+    quantize = ycdxml.ChannelsList.QuantizeFloat()
+    quantize.values = [0.0, 0.5, 1.0, 1.5]
+
+    indirect = ycdxml.ChannelsList.IndirectQuantizeFloat()
+    indirect.values = [-1.0, 3.0]
+    indirect.frames = [0, 1, 1, 0, 1]
+
+    raw = ycdxml.ChannelsList.RawFloat()
+    raw.values = [4.0, 5.0, 6.0]
+
+    return [static, quantize, indirect, raw]
+
+
+@pytest.mark.parametrize("channel_index", range(4))
+def test_channel_get_values_matches_get_value(channel_index):
+    channel = build_test_channels()[channel_index]
+    frame_ids = np.arange(12)
+
+    expected = [channel.get_value(frame_id, []) for frame_id in frame_ids]
+    assert_allclose(channel.get_values(frame_ids, []), expected)
+
+
+def test_get_quaternion_from_sequence_data_cached_quaternion():
+    angles = np.linspace(0.0, 2.0, 100)
+    quats = np.stack((np.cos(angles / 2), np.sin(angles / 2) * 0.6, np.sin(angles / 2) * 0.8, np.zeros(100)), axis=1)
+
+    # compress so the W component is cached
+    sequence_data = sequence_data_from_frames_data(Track.BoneRotation, quats.astype(np.float32), 0.0005)
+    assert sequence_data.channels[-1].type == "CachedQuaternion1"
+
+    decoded = get_quaternion_from_sequence_data(sequence_data, np.arange(100))
+    assert decoded.shape == (100, 4)
+    assert np.abs(decoded - quats).max() <= 0.0005 + 1e-6
+
+
+@pytest.mark.parametrize("sequence_frame_limit", (0, 16, 30))
+def test_combine_sequences_and_build_action_data(sequence_frame_limit):
+    frame_count = 75
+    rng = np.random.default_rng(0)
+    tracks = {
+        Track.BonePosition: np.cumsum(rng.normal(size=(frame_count, 3)), axis=0).astype(np.float32),
+        Track.BoneScale: np.ones((frame_count, 3), dtype=np.float32),
+        Track.CameraFOV: np.linspace(30.0, 60.0, frame_count, dtype=np.float32)[:, None],
+    }
+
+    animation = ycdxml.Animation()
+    animation.frame_count = frame_count
+    animation.sequence_frame_limit = sequence_frame_limit if sequence_frame_limit > 0 else frame_count + 30
+    for track in tracks:
+        bone_id = ycdxml.Animation.BoneIdList.BoneId()
+        bone_id.bone_id = 0
+        bone_id.track = track.value
+        bone_id.format = TrackFormatMap[track].value
+        animation.bone_ids.append(bone_id)
+
+    for start_frame, end_frame in get_sequence_frame_ranges(frame_count, sequence_frame_limit):
+        sequence = ycdxml.Animation.SequenceList.Sequence()
+        sequence.frame_count = end_frame - start_frame
+        for track, frames_data in tracks.items():
+            sequence.sequence_data.append(sequence_data_from_frames_data(track, frames_data[start_frame:end_frame]))
+        animation.sequences.append(sequence)
+
+    action_data = combine_sequences_and_build_action_data(animation)
+
+    assert list(action_data.keys()) == [0]
+    for track, frames_data in tracks.items():
+        decoded = action_data[0][track.value]
+        assert decoded.shape == frames_data.shape
+        assert_allclose(decoded, frames_data, rtol=1e-5, atol=1e-5)
@@ -0,0 +1,77 @@
+import bpy
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+from ..cwxml.ymap import CMapData
+from ..ymap.ymapexport import model_from_obj, calculate_extents, get_verts_hex
+from ..ymap.ymapimport import get_occlude_models_mesh_data
+from .test_fixtures import context, plane_object
+
+
+def test_model_from_obj_triangulates_without_modifying_mesh(plane_object):
+    plane_object.location = (1.0, 2.0, 3.0)
+    plane_object.ymap_properties.flags = 0
+    bpy.context.view_layer.update()
+
+    model = model_from_obj(plane_object)
+
+    assert len(plane_object.data.polygons) == 1
+    assert model.num_tris == 2 + 32768
+    assert model.num_verts_in_bytes == 4 * 12
+
+    ((verts, tris),) = get_occlude_models_mesh_data([model])
+    assert_allclose(verts, np.array([v.co for v in plane_object.data.vertices]) + (1.0, 2.0, 3.0))
+    assert tris.shape == (2, 3)
+
+
+def test_calculate_extents_uses_archetype_bounds_and_lod_dist(plane_object):
+    plane_object.location = (10.0, 0.0, 0.0)
+    plane_object.entity_properties.lod_dist = 100.0
+    bpy.context.view_layer.update()
+
+    ymap = CMapData()
+    calculate_extents(ymap, [plane_object], [])
+
+    # The plane is the archetype asset of itself, its bounding sphere is centered at the origin with radius sqrt(2)
+    radius = np.sqrt(2.0)
+    assert_allclose(ymap.entities_extents_min, (10.0 - radius, -radius, -radius))
+    assert_allclose(ymap.entities_extents_max, (10.0 + radius, radius, radius))
+    assert_allclose(ymap.streaming_extents_min, (-90.0 - radius, -100.0 - radius, -100.0 - radius))
+    assert_allclose(ymap.streaming_extents_max, (110.0 + radius, 100.0 + radius, 100.0 + radius))
+
+
+def test_calculate_extents_uses_archetype_lod_dist_when_entity_lod_dist_not_set(plane_object):
+    plane_object.entity_properties.lod_dist = 0.0
+    ytyp = bpy.context.scene.ytyps.add()
+    archetype = ytyp.archetypes.add()
+    archetype.name = plane_object.name
+    archetype.bs_center = (0.0, 0.0, 0.0)
+    archetype.bs_radius = 5.0
+    archetype.lod_dist = 50.0
+    bpy.context.view_layer.update()
+
+    ymap = CMapData()
+    calculate_extents(ymap, [plane_object], [])
+
+    bpy.context.scene.ytyps.remove(len(bpy.context.scene.ytyps) - 1)
+
+    assert_allclose(ymap.entities_extents_min, (-5.0, -5.0, -5.0))
+    assert_allclose(ymap.entities_extents_max, (5.0, 5.0, 5.0))
+    assert_allclose(ymap.streaming_extents_min, (-55.0, -55.0, -55.0))
+    assert_allclose(ymap.streaming_extents_max, (55.0, 55.0, 55.0))
+
+
+def test_model_from_obj_skips_too_many_vertices(plane_object):
+    mesh = plane_object.data
+    mesh.clear_geometry()
+    mesh.from_pydata([(i, 0.0, i % 2) for i in range(300)], [], [(i, i + 1, i + 2) for i in range(298)])
+
+    assert model_from_obj(plane_object) is None
+
+
+def test_get_verts_hex_does_not_wrap_indices():
+    positions = np.zeros((300, 3))
+    tris = np.array([[0, 1, 299]])
+
+    with pytest.raises(ValueError):
+        get_verts_hex(positions, tris)
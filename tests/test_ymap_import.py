@@ -0,0 +1,51 @@
+import bpy
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal
+from ..cwxml.ymap import OccludeModel
+from ..ymap.ymapimport import build_archetype_objects_index, find_archetype_object, get_occlude_models_mesh_data
+
+
+@pytest.fixture
+def archetype_objs():
+    objs = [bpy.data.objects.new(name, None) for name in ("prop_bench_01", "Prop_Tree_01", "prop_tree_01")]
+    yield objs
+    bpy.data.batch_remove(objs)
+
+
+def test_find_archetype_object(archetype_objs):
+    index = build_archetype_objects_index(archetype_objs)
+
+    assert find_archetype_object(index, "prop_bench_01") == archetype_objs[0]
+    assert find_archetype_object(index, "PROP_BENCH_01") == archetype_objs[0]
+    assert find_archetype_object(index, "prop_unknown") is None
+
+
+def test_find_archetype_object_prefers_exact_name(archetype_objs):
+    index = build_archetype_objects_index(archetype_objs)
+
+    assert find_archetype_object(index, "Prop_Tree_01") == archetype_objs[1]
+    assert find_archetype_object(index, "prop_tree_01") == archetype_objs[2]
+
+
+def make_occlude_model(verts: np.ndarray, tris: np.ndarray) -> OccludeModel:
+    model = OccludeModel()
+    model.verts = (verts.astype("<f4").tobytes() + tris.astype(np.uint8).tobytes()).hex().upper()
+    model.num_verts_in_bytes = len(verts) * 12
+    model.num_tris = len(tris) + 32768
+    return model
+
+
+def test_get_occlude_models_mesh_data():
+    verts_a = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.5]], dtype=np.float32)
+    tris_a = np.array([[0, 1, 2]])
+    verts_b = np.array([[-1.5, 2.0, 3.0], [1.0, 4.0, 0.0], [0.0, 1.0, -8.0], [2.0, 2.0, 2.0]], dtype=np.float32)
+    tris_b = np.array([[0, 1, 2], [2, 3, 0]])
+
+    models = [make_occlude_model(verts_a, tris_a), make_occlude_model(verts_b, tris_b)]
+    (result_verts_a, result_tris_a), (result_verts_b, result_tris_b) = get_occlude_models_mesh_data(models)
+
+    assert_array_equal(result_verts_a, verts_a)
+    assert_array_equal(result_tris_a, tris_a)
+    assert_array_equal(result_verts_b, verts_b)
+    assert_array_equal(result_tris_b, tris_b)
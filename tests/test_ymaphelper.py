@@ -0,0 +1,130 @@
+import bpy
+import pytest
+import numpy as np
+from ..sollumz_properties import SollumType, EntityLodLevel
+from ..tools.blenderhelper import create_empty_object
+from ..tools.ymaphelper import (
+    YmapContentFlags,
+    YmapFlags,
+    create_ymap,
+    create_ymap_group,
+    get_ymap_entity_objects,
+    partition_positions_grid,
+    partition_positions_quadtree,
+    split_ymap,
+)
+
+
+def test_partition_positions_grid():
+    positions = np.array([
+        [10.0, 10.0, 0.0],
+        [600.0, 10.0, 5.0],
+        [20.0, 30.0, 100.0],
+        [-10.0, 10.0, 0.0],
+    ])
+
+    chunks = partition_positions_grid(positions, 500.0)
+
+    assert sorted(chunk.tolist() for chunk in chunks) == [[0, 2], [1], [3]]
+
+
+def test_partition_positions_quadtree_max_count():
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-1000.0, 1000.0, size=(1000, 3))
+
+    chunks = partition_positions_quadtree(positions, max_count=100)
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert sorted(np.concatenate(chunks).tolist()) == list(range(1000))
+
+
+def test_partition_positions_quadtree_max_extent():
+    positions = np.array([[0.0, 0.0, 0.0], [50.0, 0.0, 0.0], [1000.0, 0.0, 0.0], [1050.0, 0.0, 0.0]])
+
+    chunks = partition_positions_quadtree(positions, max_count=10, max_extent=100.0)
+
+    assert [chunk.tolist() for chunk in chunks] == [[0, 1], [2, 3]]
+
+
+def test_partition_positions_quadtree_same_position():
+    positions = np.zeros((10, 3))
+
+    chunks = partition_positions_quadtree(positions, max_count=2)
+
+    assert [chunk.tolist() for chunk in chunks] == [list(range(10))]
+
+
+@pytest.fixture()
+def remove_new_objects():
+    existing_objs = set(bpy.data.objects)
+
+    yield
+
+    bpy.data.batch_remove([obj for obj in bpy.data.objects if obj not in existing_objs])
+
+
+def create_test_ymap(name: str, entities: list[tuple[str, tuple, EntityLodLevel, int]]) -> bpy.types.Object:
+    ymap_obj = create_ymap(name)
+    group_obj = create_ymap_group(SollumType.YMAP_ENTITY_GROUP, ymap_obj, "Entities", select=False)
+    for entity_name, location, lod_level, parent_index in entities:
+        entity_obj = create_empty_object(SollumType.DRAWABLE, entity_name)
+        entity_obj.location = location
+        entity_obj.entity_properties.lod_level = lod_level
+        entity_obj.entity_properties.parent_index = parent_index
+        entity_obj.parent = group_obj
+    bpy.context.view_layer.update()
+    return ymap_obj
+
+
+def test_split_ymap_updates_child_ymaps(remove_new_objects):
+    lod_ymap_obj = create_test_ymap("test_split_lod", [
+        ("test_split_lod_a", (0.0, 0.0, 0.0), EntityLodLevel.LODTYPES_DEPTH_LOD, -1),
+        ("test_split_lod_b", (2000.0, 0.0, 0.0), EntityLodLevel.LODTYPES_DEPTH_LOD, -1),
+    ])
+    hd_ymap_obj = create_test_ymap("test_split_hd", [
+        ("test_split_hd_a", (2010.0, 0.0, 0.0), EntityLodLevel.LODTYPES_DEPTH_HD, 1),
+        ("test_split_hd_b", (10.0, 0.0, 0.0), EntityLodLevel.LODTYPES_DEPTH_HD, 0),
+        ("test_split_hd_c", (1990.0, 0.0, 0.0), EntityLodLevel.LODTYPES_DEPTH_ORPHANHD, -1),
+    ])
+    hd_ymap_obj.ymap_properties.parent = "test_split_lod"
+
+    lod_chunk_objs, hd_chunk_objs = split_ymap(lod_ymap_obj, [np.array([0]), np.array([1])])
+
+    assert [obj.name for obj in lod_chunk_objs] == ["test_split_lod_0", "test_split_lod_1"]
+    assert "test_split_lod" not in bpy.data.objects
+    assert "test_split_hd" not in bpy.data.objects
+    assert len(hd_chunk_objs) == 2
+    for lod_chunk_obj, hd_chunk_obj in zip(lod_chunk_objs, hd_chunk_objs):
+        assert lod_chunk_obj.ymap_properties.content_flags == YmapContentFlags.LOD
+        assert lod_chunk_obj.ymap_properties.flags == YmapFlags.LOD
+        assert hd_chunk_obj.ymap_properties.parent == lod_chunk_obj.name
+        assert hd_chunk_obj.ymap_properties.content_flags & YmapContentFlags.HD
+        assert hd_chunk_obj.ymap_properties.flags == 0
+
+    assert [obj.name for obj in get_ymap_entity_objects(hd_chunk_objs[0])] == ["test_split_hd_b"]
+    assert [obj.name for obj in get_ymap_entity_objects(hd_chunk_objs[1])] == ["test_split_hd_a", "test_split_hd_c"]
+    assert bpy.data.objects["test_split_hd_a"].entity_properties.parent_index == 0
+    assert bpy.data.objects["test_split_hd_b"].entity_properties.parent_index == 0
+    assert bpy.data.objects["test_split_hd_c"].entity_properties.parent_index == -1
+
+
+def test_split_ymap_keeps_occluders_and_updates_flags(remove_new_objects):
+    ymap_obj = create_test_ymap("test_split_occl", [
+        ("test_split_occl_a", (0.0, 0.0, 0.0), EntityLodLevel.LODTYPES_DEPTH_HD, -1),
+        ("test_split_occl_b", (2000.0, 0.0, 0.0), EntityLodLevel.LODTYPES_DEPTH_HD, -1),
+    ])
+    occluder_group_obj = create_ymap_group(SollumType.YMAP_BOX_OCCLUDER_GROUP, ymap_obj, "Box Occluders", select=False)
+    create_empty_object(SollumType.YMAP_BOX_OCCLUDER).parent = occluder_group_obj
+    ymap_obj.ymap_properties.content_flags = int(
+        YmapContentFlags.HD | YmapContentFlags.PHYSICS | YmapContentFlags.OCCLUDERS | YmapContentFlags.CRITICAL
+    )
+
+    chunk_objs, child_objs = split_ymap(ymap_obj, [np.array([0]), np.array([1])])
+
+    assert child_objs == []
+    for chunk_obj in chunk_objs:
+        assert chunk_obj.ymap_properties.content_flags == (
+            YmapContentFlags.HD | YmapContentFlags.PHYSICS | YmapContentFlags.CRITICAL
+        )
+    assert get_ymap_entity_objects(ymap_obj) == []
+    assert ymap_obj.ymap_properties.content_flags == YmapContentFlags.OCCLUDERS | YmapContentFlags.CRITICAL
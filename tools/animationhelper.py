@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import bpy
 import math
+import numpy as np
+from numpy.typing import NDArray
 from sys import float_info
 from mathutils import Quaternion, Vector, Euler, Matrix
 from enum import IntFlag, IntEnum
@@ -170,29 +172,26 @@ TrackToPropertyNameMap = {
 PropertyNameToTrackMap = {v: k for k, v in TrackToPropertyNameMap.items()}
 
 
-def get_quantum_and_min_val(nums):
-    min_val = float_info.max
-    max_val = float_info.min
-    min_delta = float_info.max
-    last_val = 0
+def get_quantum_and_min_val(nums) -> Tuple[float, float]:
+    nums = np.asarray(nums, dtype=np.float64)
+    if len(nums) == 0:
+        return float_info.max, 0.0
 
-    for value in nums:
-        min_val = min(min_val, value)
-        max_val = max(max_val, value)
+    min_val = nums.min()
+    max_val = nums.max()
 
-        if value != last_val:
-            min_delta = min(min_delta, abs(value - last_val))
-
-        last_val = value
-
-    if min_delta == float_info.max:
-        min_delta = 0
+    # deltas between consecutive values, the first value is compared against 0
+    prev_nums = np.empty_like(nums)
+    prev_nums[0] = 0.0
+    prev_nums[1:] = nums[:-1]
+    changed = nums != prev_nums
+    min_delta = np.abs(nums[changed] - prev_nums[changed]).min() if np.any(changed) else 0.0
 
     range_value = max_val - min_val
     min_quant = range_value / 1048576
     quantum = max(min_delta, min_quant)
 
-    return min_val, quantum
+    return float(min_val), float(quantum)
 
 
 def decompose_uv_affine_matrix(
@@ -809,3 +808,200 @@ def get_action_export_frame_count(action: bpy.types.Action) -> int:
     max_num_keyframes = max(len(fc.keyframe_points) for fc in action.fcurves)
     num_frames = math.ceil(get_action_duration_frames(action) + 1)
     return max(max_num_keyframes, num_frames)
+
+
+def get_action_export_frames(action: bpy.types.Action) -> NDArray[np.float64]:
+    """Gets the action frames, including subframes, sampled on export. One for each exported frame."""
+    action_frame_range = action.frame_range
+    export_frame_count = get_action_export_frame_count(action)
+    return np.linspace(action_frame_range[0], action_frame_range[1], export_frame_count)
+
+
+# Interpolation modes that `evaluate_keyframes` supports, by their index in the `interpolation` array
+KEYFRAME_INTERPOLATION_CONSTANT = 0
+KEYFRAME_INTERPOLATION_LINEAR = 1
+KEYFRAME_INTERPOLATION_BEZIER = 2
+KeyframeInterpolationToIndexMap = {
+    "CONSTANT": KEYFRAME_INTERPOLATION_CONSTANT,
+    "LINEAR": KEYFRAME_INTERPOLATION_LINEAR,
+    "BEZIER": KEYFRAME_INTERPOLATION_BEZIER,
+}
+
+# Same threshold Blender uses to consider that a frame is exactly on a keyframe
+KEYFRAME_EXACT_FRAME_THRESHOLD = 0.0001
+KEYFRAME_BEZIER_SOLVER_ITERATIONS = 40
+
+
+def evaluate_keyframes(
+    co: NDArray[np.float64],
+    handle_left: NDArray[np.float64],
+    handle_right: NDArray[np.float64],
+    interpolation: NDArray[np.int32],
+    frames: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Evaluates a keyframed curve at multiple frames at once, replicating ``FCurve.evaluate`` with constant
+    extrapolation. ``co``, ``handle_left`` and ``handle_right`` are (K, 2) arrays with the keyframe points, sorted by
+    frame, and ``interpolation`` contains ``KEYFRAME_INTERPOLATION_*`` values. Returns an array with the value at each
+    frame.
+    """
+    num_keys = len(co)
+    values = np.zeros(len(frames), dtype=np.float64)
+    if num_keys == 0:
+        return values
+
+    key_x = co[:, 0]
+    key_y = co[:, 1]
+
+    before = frames <= key_x[0]
+    after = frames >= key_x[-1]
+    values[before] = key_y[0]
+    values[after] = key_y[-1]
+
+    inside = ~(before | after)
+    if not np.any(inside):
+        return values
+
+    f = frames[inside]
+    seg = np.clip(np.searchsorted(key_x, f, side="right") - 1, 0, num_keys - 2)
+    x0, y0 = key_x[seg], key_y[seg]
+    x1, y1 = key_x[seg + 1], key_y[seg + 1]
+    seg_interpolation = interpolation[seg]
+
+    seg_values = y0.copy()  # KEYFRAME_INTERPOLATION_CONSTANT
+
+    linear = seg_interpolation == KEYFRAME_INTERPOLATION_LINEAR
+    if np.any(linear):
+        dx = x1[linear] - x0[linear]
+        t = np.divide(f[linear] - x0[linear], dx, out=np.zeros_like(dx), where=dx != 0.0)
+        seg_values[linear] = y0[linear] + (y1[linear] - y0[linear]) * t
+
+    bezier = seg_interpolation == KEYFRAME_INTERPOLATION_BEZIER
+    if np.any(bezier):
+        seg_values[bezier] = _evaluate_bezier_segments(
+            co[seg[bezier]], handle_right[seg[bezier]], handle_left[seg[bezier] + 1], co[seg[bezier] + 1], f[bezier]
+        )
+
+    on_prev_key = np.abs(f - x0) < KEYFRAME_EXACT_FRAME_THRESHOLD
+    on_next_key = np.abs(f - x1) < KEYFRAME_EXACT_FRAME_THRESHOLD
+    seg_values[on_prev_key] = y0[on_prev_key]
+    seg_values[on_next_key] = y1[on_next_key]
+
+    values[inside] = seg_values
+    return values
+
+
+def _evaluate_bezier_segments(
+    v1: NDArray[np.float64],
+    v2: NDArray[np.float64],
+    v3: NDArray[np.float64],
+    v4: NDArray[np.float64],
+    f: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Evaluates the cubic Bezier segments defined by the (N, 2) control points at frames ``f``."""
+    v2 = v2.copy()
+    v3 = v3.copy()
+
+    # Scale the handles so they don't overlap, otherwise the curve wouldn't be a function of x.
+    # Same as BKE_fcurve_correct_bezpart
+    h1 = v1 - v2
+    h2 = v4 - v3
+    seg_len = v4[:, 0] - v1[:, 0]
+    handles_len = np.abs(h1[:, 0]) + np.abs(h2[:, 0])
+    overlap = handles_len > seg_len
+    fac = np.divide(seg_len, handles_len, out=np.ones_like(seg_len), where=overlap)[:, None]
+    v2[overlap] = v1[overlap] - fac[overlap] * h1[overlap]
+    v3[overlap] = v4[overlap] - fac[overlap] * h2[overlap]
+
+    def _bezier(p0, p1, p2, p3, t):
+        mt = 1.0 - t
+        return mt * mt * mt * p0 + 3.0 * mt * mt * t * p1 + 3.0 * mt * t * t * p2 + t * t * t * p3
+
+    # x(t) is monotonic after the handles correction, find the t where x(t) == f by bisection
+    t_min = np.zeros_like(f)
+    t_max = np.ones_like(f)
+    for _ in range(KEYFRAME_BEZIER_SOLVER_ITERATIONS):
+        t = (t_min + t_max) * 0.5
+        x = _bezier(v1[:, 0], v2[:, 0], v3[:, 0], v4[:, 0], t)
+        below = x < f
+        t_min = np.where(below, t, t_min)
+        t_max = np.where(below, t_max, t)
+
+    t = (t_min + t_max) * 0.5
+    values = _bezier(v1[:, 1], v2[:, 1], v3[:, 1], v4[:, 1], t)
+
+    eps = np.finfo(np.float32).eps
+    flat = (
+        (np.abs(v1[:, 1] - v4[:, 1]) < eps) &
+        (np.abs(v2[:, 1] - v3[:, 1]) < eps) &
+        (np.abs(v3[:, 1] - v4[:, 1]) < eps)
+    )
+    values[flat] = v1[flat, 1]
+    return values
+
+
+def can_sample_fcurve_keyframes(fcurve: bpy.types.FCurve) -> bool:
+    """Checks whether the F-curve result depends only on its keyframes, so it can be sampled with
+    ``evaluate_keyframes``.
+    """
+    if len(fcurve.keyframe_points) == 0 or fcurve.extrapolation != "CONSTANT":
+        return False
+
+    if any(not modifier.mute for modifier in fcurve.modifiers):
+        return False
+
+    return all(kp.interpolation in KeyframeInterpolationToIndexMap for kp in fcurve.keyframe_points)
+
+
+def sample_fcurve(fcurve: bpy.types.FCurve, frames: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Evaluates the F-curve at all ``frames``. Keyframe points are read in bulk and evaluated with NumPy when
+    possible, otherwise it falls back to ``FCurve.evaluate`` for each frame.
+    """
+    if not can_sample_fcurve_keyframes(fcurve):
+        return np.fromiter((fcurve.evaluate(frame) for frame in frames), dtype=np.float64, count=len(frames))
+
+    keyframe_points = fcurve.keyframe_points
+    num_keys = len(keyframe_points)
+    co = np.empty(num_keys * 2, dtype=np.float32)
+    handle_left = np.empty(num_keys * 2, dtype=np.float32)
+    handle_right = np.empty(num_keys * 2, dtype=np.float32)
+    keyframe_points.foreach_get("co", co)
+    keyframe_points.foreach_get("handle_left", handle_left)
+    keyframe_points.foreach_get("handle_right", handle_right)
+    interpolation = np.fromiter((KeyframeInterpolationToIndexMap[kp.interpolation] for kp in keyframe_points),
+                                dtype=np.int32, count=num_keys)
+
+    return evaluate_keyframes(
+        co.reshape((-1, 2)).astype(np.float64),
+        handle_left.reshape((-1, 2)).astype(np.float64),
+        handle_right.reshape((-1, 2)).astype(np.float64),
+        interpolation,
+        frames
+    )
+
+
+def quaternion_multiply_array(a: NDArray[np.float64], b: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Hamilton product of (..., 4) arrays of quaternions in WXYZ order. Same as ``a @ b`` with ``Quaternion``s."""
+    aw, ax, ay, az = np.moveaxis(np.asarray(a, dtype=np.float64), -1, 0)
+    bw, bx, by, bz = np.moveaxis(np.asarray(b, dtype=np.float64), -1, 0)
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def make_quaternions_continuous(quats: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Flips the sign of the (N, 4) quaternions as needed so the dot product of consecutive quaternions is never
+    negative. The game interpolates each component linearly, so a sign change between frames causes flickering.
+    See the longer explanation in ycdexport.py.
+    """
+    quats = np.array(quats, dtype=np.float64)
+    if len(quats) < 2:
+        return quats
+
+    dots = np.einsum("ij,ij->i", quats[:-1], quats[1:])
+    signs = np.cumprod(np.where(dots < 0.0, -1.0, 1.0))
+    quats[1:] *= signs[:, None]
+    return quats
+
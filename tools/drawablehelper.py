@@ -187,7 +187,7 @@ class MaterialConverter:
 
 
 def set_recommended_bone_properties(bone):
-    bone_item = BonePropertiesManager.bones.get(bone.name)
+    bone_item = BonePropertiesManager.get_bone(bone.name)
     if bone_item is None:
         return
 
@@ -1,30 +1,33 @@
+from functools import lru_cache
+from typing import Iterable
+import numpy as np
+from numpy.typing import NDArray
+
+HASH_CACHE_SIZE = 65536
+
 
 def GenerateData(bts: bytes, seed=0):
-    h = seed
+    h = seed & 0xFFFFFFFF
 
     for b in bts:
-        h += b
-        h &= 0xFFFFFFFF
-        h += (h << 10) & 0xFFFFFFFF
-        h &= 0xFFFFFFFF
-        h ^= (h >> 6) & 0xFFFFFFFF
-        h &= 0xFFFFFFFF
-
-    h += (h << 3) & 0xFFFFFFFF
-    h &= 0xFFFFFFFF
-    h ^= (h >> 11) & 0xFFFFFFFF
-    h &= 0xFFFFFFFF
-    h += (h << 15) & 0xFFFFFFFF
-    h &= 0xFFFFFFFF
+        h = (h + b) & 0xFFFFFFFF
+        h = (h + (h << 10)) & 0xFFFFFFFF
+        h ^= h >> 6
+
+    h = (h + (h << 3)) & 0xFFFFFFFF
+    h ^= h >> 11
+    h = (h + (h << 15)) & 0xFFFFFFFF
 
     return h
 
 
+@lru_cache(maxsize=HASH_CACHE_SIZE)
 def Generate(text, encoding="utf-8", seed=0):
     bts = text.lower().encode(encoding)
     return GenerateData(bts, seed)
 
 
+@lru_cache(maxsize=HASH_CACHE_SIZE)
 def name_to_hash(name: str) -> int:
     """Gets a hash from a string. If it starts with `hash_`, it parses the hexadecimal number afterwards;
     otherwise, it calculates the JOAAT hash of the string.
@@ -34,3 +37,72 @@ def name_to_hash(name: str) -> int:
         return int(name[5:], 16) & 0xFFFFFFFF
     else:
         return Generate(name)
+
+
+def GenerateDataBatch(bts_list: Iterable[bytes], seed=0) -> NDArray[np.uint32]:
+    """Calculates the JOAAT hash of multiple byte strings at once. Returns an array with the hash of each one, in the
+    same order.
+    """
+    bts_list = list(bts_list)
+    num_items = len(bts_list)
+    if num_items == 0:
+        return np.empty(0, dtype=np.uint32)
+
+    # sort by length, longest first, so the items that still have bytes left are always at the start of the array
+    lengths = np.fromiter((len(bts) for bts in bts_list), dtype=np.int64, count=num_items)
+    order = np.argsort(-lengths, kind="stable")
+    sorted_lengths = lengths[order]
+    max_length = int(sorted_lengths[0])
+
+    padded = np.zeros((num_items, max_length), dtype=np.uint8)
+    for row, index in enumerate(order):
+        bts = bts_list[index]
+        padded[row, :len(bts)] = np.frombuffer(bts, dtype=np.uint8)
+
+    # number of items with at least `i + 1` bytes
+    num_active = np.searchsorted(-sorted_lengths, -np.arange(1, max_length + 1), side="right")
+
+    h = np.full(num_items, seed & 0xFFFFFFFF, dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        for i in range(max_length):
+            n = num_active[i]
+            active_h = h[:n]
+            active_h += padded[:n, i]
+            active_h += active_h << np.uint32(10)
+            active_h ^= active_h >> np.uint32(6)
+
+        h += h << np.uint32(3)
+        h ^= h >> np.uint32(11)
+        h += h << np.uint32(15)
+
+    hashes = np.empty(num_items, dtype=np.uint32)
+    hashes[order] = h
+    return hashes
+
+
+def GenerateBatch(texts: Iterable[str], encoding="utf-8", seed=0) -> NDArray[np.uint32]:
+    """Same as ``Generate`` for multiple strings at once. Returns an array with the hash of each string, in the same
+    order.
+    """
+    return GenerateDataBatch((text.lower().encode(encoding) for text in texts), seed)
+
+
+def names_to_hashes(names: Iterable[str]) -> NDArray[np.uint32]:
+    """Same as ``name_to_hash`` for multiple strings at once. Returns an array with the hash of each string, in the
+    same order.
+    """
+    names = list(names)
+    hashes = np.empty(len(names), dtype=np.uint32)
+    text_indices = []
+    texts = []
+    for i, name in enumerate(names):
+        if name.startswith("hash_"):
+            hashes[i] = int(name[5:], 16) & 0xFFFFFFFF
+        else:
+            text_indices.append(i)
+            texts.append(name)
+
+    if texts:
+        hashes[text_indices] = GenerateBatch(texts)
+
+    return hashes
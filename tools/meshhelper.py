@@ -349,22 +349,24 @@ def get_total_bounds(obj):
 
 def get_combined_bound_box(obj: bpy.types.Object, use_world: bool = False, matrix: Matrix = Matrix()):
     """Adds the ``bound_box`` of ``obj`` and all of it's child mesh objects. Returhs bbmin, bbmax"""
-    total_bounds: list[Vector] = []
+    corners = []
+    matrices = []
 
     for child in [obj, *obj.children_recursive]:
         if child.type != "MESH":
             continue
 
-        child_matrix = matrix @ (
-            child.matrix_world if use_world else child.matrix_basis)
-
-        total_bounds.extend([child_matrix @ Vector(v)
-                            for v in child.bound_box])
+        corners.append(child.bound_box)
+        matrices.append(matrix @ (child.matrix_world if use_world else child.matrix_basis))
 
-    if not total_bounds:
+    if not corners:
         return Vector(), Vector()
 
-    return get_min_vector_list(total_bounds), get_max_vector_list(total_bounds)
+    corners = np.array(corners, dtype=np.float64)
+    matrices = np.array(matrices, dtype=np.float64)
+    corners = np.einsum("nij,nkj->nki", matrices[:, :3, :3], corners) + matrices[:, np.newaxis, :3, 3]
+
+    return Vector(corners.min(axis=(0, 1))), Vector(corners.max(axis=(0, 1)))
 
 
 def get_bound_center(obj):
@@ -15,37 +15,25 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from enum import Enum
 from functools import cache
 from typing import Iterable
-import bpy
 import bmesh
-import math
-import time
 from mathutils import Vector, Matrix
 import numpy as np
+from numpy.typing import NDArray
 
 
-def bbox_orient(bme_verts, mx):
-    """
-    takes a lsit of BMverts ora  list of vectors
-    """
-    if hasattr(bme_verts[0], "co"):
-        verts = [mx @ v.co for v in bme_verts]
-    else:
-        verts = [mx @ v for v in bme_verts]
-
-    xs = [v[0] for v in verts]
-    ys = [v[1] for v in verts]
-    zs = [v[2] for v in verts]
-
-    return (min(xs), max(xs), min(ys), max(ys), min(zs), max(zs))
-
-
-def bbox_vol(box: tuple[float, float, float, float, float, float]) -> float:
+class OBBMethod(str, Enum):
+    EXACT = "EXACT"
+    SAMPLED = "SAMPLED"
 
-    V = max(box[1] - box[0], 0.0001) * max(box[3] - box[2], 0.0001) * max(box[5] - box[4], 0.0001)
 
-    return V
+# Max number of floats computed per batch when projecting the hull onto the candidate rotations. Keeps the
+# temporary (R, 3, H) array at a reasonable size with dense selections.
+OBB_BATCH_SIZE = 4_000_000
+# Minimum box dimension used when computing volumes, so flat boxes can still be compared
+OBB_MIN_DIMENSION = 0.0001
 
 
 def box_coords(box):
@@ -70,9 +58,10 @@ def get_obb_extents(obb):
     np_obb = np.array(obb, dtype=Vector)
     return Vector(np_obb.min(axis=0)), Vector(np_obb.max(axis=0))
 
+
 @cache
-def generate_vectors_structured(num_samples: int):
-    """Generates vectors around the sphere, at regular intervals."""
+def generate_vectors_structured(num_samples: int) -> NDArray[np.float64]:
+    """Generates vectors around the sphere, at regular intervals. Returns a read-only (num_samples, 3) array."""
     # Uses the Fibonnaci lattice to generate evenly distributed points on a sphere
     # https://arxiv.org/pdf/0912.4540.pdf
     # https://extremelearning.com.au/how-to-evenly-distribute-points-on-a-sphere-more-effectively-than-the-canonical-fibonacci-lattice/
@@ -85,60 +74,219 @@ def generate_vectors_structured(num_samples: int):
     vectors[:, 0] = np.sin(theta) * np.cos(phi)
     vectors[:, 1] = np.cos(theta)
     vectors[:, 2] = np.sin(theta) * np.sin(phi)
-    return [Vector(vector[:]).freeze() for vector in vectors]
-
-
-def get_obb(verts: Iterable[Vector], num_samples: int, angle_step: int) -> tuple[list[Vector], Matrix]:
-    already_found = set[Matrix]()
-    world_mx = Matrix.Identity(4)
-    scale = world_mx.to_scale()
-    trans = world_mx.to_translation()
-
-    tr_mx = Matrix.Identity(4)
-    sc_mx = Matrix.Identity(4)
+    vectors.flags.writeable = False
+    return vectors
 
-    tr_mx[0][3], tr_mx[1][3], tr_mx[2][3] = trans[0], trans[1], trans[2]
-    sc_mx[0][0], sc_mx[1][1], sc_mx[2][2] = scale[0], scale[1], scale[2]
-    r_mx = world_mx.to_quaternion().to_matrix().to_4x4()
 
+@cache
+def generate_rotations_structured(num_samples: int, angle_step: int) -> NDArray[np.float64]:
+    """Generates the rotation matrices tested by the sampled OBB method, ``angle_step`` half-degrees apart around
+    each of the ``num_samples`` axes. Duplicated rotations are removed and the identity is always the first one.
+    Returns a read-only (R, 3, 3) array.
+    """
+    axes = generate_vectors_structured(num_samples)
+    angles = np.pi * np.arange(0, 720, angle_step) / 360
+    cos = np.cos(angles)[None, :, None, None]
+    sin = np.sin(angles)[None, :, None, None]
+
+    # Rodrigues' rotation formula, for all axes and angles at once
+    x, y, z = axes[:, 0], axes[:, 1], axes[:, 2]
+    zeros = np.zeros_like(x)
+    cross_mx = np.stack((
+        np.stack((zeros, -z, y), axis=-1),
+        np.stack((z, zeros, -x), axis=-1),
+        np.stack((-y, x, zeros), axis=-1),
+    ), axis=1)[:, None]
+    outer_mx = (axes[:, :, None] * axes[:, None, :])[:, None]
+    rotations = cos * np.identity(3) + sin * cross_mx + (1.0 - cos) * outer_mx
+    rotations = rotations.reshape((-1, 3, 3))
+
+    rotations = np.concatenate((np.identity(3)[None], rotations))
+    _, unique_indices = np.unique(np.round(rotations.reshape((-1, 9)), 6), axis=0, return_index=True)
+    rotations = rotations[np.sort(unique_indices)]
+    rotations.flags.writeable = False
+    return rotations
+
+
+def get_convex_hull(
+    verts: Iterable[Vector]
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.uint32], NDArray[np.uint32]]:
+    """Calculates the convex hull of ``verts``.
+
+    Returns a tuple with the hull vertices (H, 3), the outward face normals (F, 3), the edges as pairs of vertex
+    indices (E, 2) and the faces adjacent to each edge as pairs of face indices (E, 2). Faces and edges may be empty
+    if the hull is degenerate (e.g. all vertices are coplanar).
+    """
     bme = bmesh.new()
 
     for vert in verts:
         bme.verts.new(vert)
 
-    convex_hull = bmesh.ops.convex_hull(
-        bme, input=bme.verts, use_existing_faces=True, )
+    convex_hull = bmesh.ops.convex_hull(bme, input=bme.verts, use_existing_faces=True)
     total_hull = convex_hull["geom"]
 
-    hull_verts = [item.co for item in total_hull if hasattr(item, "co")]
+    hull_verts = [item for item in total_hull if isinstance(item, bmesh.types.BMVert)]
+    if not hull_verts:
+        # Degenerate input (e.g. all vertices coplanar), no hull could be built so just use all vertices
+        hull_verts = list(bme.verts)
+    hull_faces = [item for item in total_hull if isinstance(item, bmesh.types.BMFace)]
+    hull_edges = [item for item in total_hull if isinstance(item, bmesh.types.BMEdge)]
+
+    vert_indices = {vert: i for i, vert in enumerate(hull_verts)}
+    face_indices = {face: i for i, face in enumerate(hull_faces)}
+
+    points = np.array([vert.co for vert in hull_verts], dtype=np.float64).reshape((-1, 3))
+    faces = [[vert_indices[vert] for vert in face.verts[:3]] for face in hull_faces]
+    edges = []
+    edge_faces = []
+    for edge in hull_edges:
+        link_faces = [face_indices[face] for face in edge.link_faces if face in face_indices]
+        if len(link_faces) != 2 or edge.verts[0] not in vert_indices or edge.verts[1] not in vert_indices:
+            continue
+
+        edges.append((vert_indices[edge.verts[0]], vert_indices[edge.verts[1]]))
+        edge_faces.append(link_faces)
 
     bme.free()
 
-    min_mx = Matrix.Identity(4)
-    min_box = bbox_orient(hull_verts, min_mx)
-    min_V = bbox_vol(min_box)
-    # Iterate through all degrees to obtain a more predictable result
+    faces = np.array(faces, dtype=np.uint32).reshape((-1, 3))
+    edges = np.array(edges, dtype=np.uint32).reshape((-1, 2))
+    edge_faces = np.array(edge_faces, dtype=np.uint32).reshape((-1, 2))
+
+    normals = np.cross(points[faces[:, 1]] - points[faces[:, 0]], points[faces[:, 2]] - points[faces[:, 0]])
+    # Make sure all normals point outwards, the hull centroid is always inside
+    face_centers = points[faces].mean(axis=1)
+    outwards = np.einsum("ij,ij->i", normals, face_centers - points.mean(axis=0))
+    normals[outwards < 0.0] *= -1.0
+    lengths = np.linalg.norm(normals, axis=1)
+    lengths[lengths == 0.0] = 1.0
+    normals /= lengths[:, None]
+
+    return points, normals, edges, edge_faces
 
-    axes = generate_vectors_structured(num_samples)
 
-    for axis in axes:
-        for n in range(0, 720, angle_step):
-            angle = math.pi * n / 360
-            rot_mx = Matrix.Rotation(angle, 4, axis)
-            rot_mx.freeze()
-            if rot_mx in already_found:
-                continue
-            already_found.add(rot_mx)
+def get_min_volume_rotation(
+    points: NDArray[np.float64],
+    rotations: NDArray[np.float64]
+) -> tuple[int, NDArray[np.float64], NDArray[np.float64], float]:
+    """Finds the rotation in ``rotations`` (R, 3, 3) whose axis-aligned bounding box of the rotated ``points`` (H, 3)
+    has the smallest volume. If multiple rotations have the same volume, the first one is chosen.
 
-            box = bbox_orient(hull_verts, rot_mx)
-            test_V = bbox_vol(box)
+    Returns a tuple with the index of the rotation, the min and max corners of its bounding box and its volume.
+    """
+    num_points = max(len(points), 1)
+    batch_size = max(OBB_BATCH_SIZE // (3 * num_points), 1)
+    points_t = points.T
+
+    best_index = -1
+    best_min = best_max = None
+    best_volume = np.inf
+    for start in range(0, len(rotations), batch_size):
+        projected = rotations[start:start + batch_size] @ points_t
+        mins = projected.min(axis=2)
+        maxs = projected.max(axis=2)
+        volumes = np.prod(np.maximum(maxs - mins, OBB_MIN_DIMENSION), axis=1)
+
+        i = np.argmin(volumes)
+        if volumes[i] < best_volume:
+            best_index = start + i
+            best_min = mins[i]
+            best_max = maxs[i]
+            best_volume = volumes[i]
+
+    return best_index, best_min, best_max, best_volume
+
+
+def get_obb_rotation_sampled(points: NDArray[np.float64], num_samples: int, angle_step: int) -> NDArray[np.float64]:
+    """Gets the best bounding box rotation by testing rotations around ``num_samples`` axes distributed
+    around the sphere.
+    """
+    rotations = generate_rotations_structured(num_samples, angle_step)
+    index, _, _, _ = get_min_volume_rotation(points, rotations)
+    return rotations[index]
+
+
+def get_obb_rotation_exact(
+    points: NDArray[np.float64],
+    normals: NDArray[np.float64],
+    edges: NDArray[np.uint32],
+    edge_faces: NDArray[np.uint32]
+) -> NDArray[np.float64]:
+    """Gets the best bounding box rotation by using rotating calipers over the hull silhouette. The candidate boxes
+    have one axis along a hull face normal or a hull edge direction, and a side flush with another hull edge.
+    """
+    edge_dirs = points[edges[:, 1]] - points[edges[:, 0]]
+    edge_lengths = np.linalg.norm(edge_dirs, axis=1)
+    edge_dirs = edge_dirs[edge_lengths > 0.0] / edge_lengths[edge_lengths > 0.0, None]
+    # Use the same sign for opposite directions so they are merged by np.unique
+    flip = np.sign(edge_dirs[np.arange(len(edge_dirs)), np.argmax(np.abs(edge_dirs), axis=1)])
+    edge_dirs *= flip[:, None]
+
+    axes = np.concatenate((normals[np.linalg.norm(normals, axis=1) > 0.0], edge_dirs))
+    _, unique_indices = np.unique(np.round(axes, 6), axis=0, return_index=True)
+    axes = axes[np.sort(unique_indices)]
+
+    edge_vectors = points[edges[:, 1]] - points[edges[:, 0]]
+
+    best_rotation = np.identity(3)
+    best_volume = np.inf
+    for n in axes:
+        # Basis of the plane perpendicular to the axis, (u, v, n) is right-handed
+        u = np.cross(n, (1.0, 0.0, 0.0) if abs(n[0]) < 0.9 else (0.0, 1.0, 0.0))
+        u /= np.linalg.norm(u)
+        v = np.cross(n, u)
+
+        # Only the silhouette edges form the outline of the hull projected onto the plane
+        front_faces = (normals @ n) > 1e-9
+        silhouette = front_faces[edge_faces[:, 0]] != front_faces[edge_faces[:, 1]]
+        silhouette_vectors = edge_vectors[silhouette]
+        angles = np.arctan2(silhouette_vectors @ v, silhouette_vectors @ u) % (np.pi * 0.5)
+        angles = np.unique(np.round(angles, 9)) if len(angles) > 0 else np.zeros(1)
+
+        cos = np.cos(angles)[:, None]
+        sin = np.sin(angles)[:, None]
+        pu = points @ u
+        pv = points @ v
+        pa = cos * pu + sin * pv
+        pb = cos * pv - sin * pu
+        areas = np.maximum(np.ptp(pa, axis=1), OBB_MIN_DIMENSION) * np.maximum(np.ptp(pb, axis=1), OBB_MIN_DIMENSION)
+
+        i = np.argmin(areas)
+        volume = areas[i] * max(np.ptp(points @ n), OBB_MIN_DIMENSION)
+        if volume < best_volume:
+            a = cos[i, 0] * u + sin[i, 0] * v
+            b = cos[i, 0] * v - sin[i, 0] * u
+            best_rotation = np.stack((a, b, n))
+            best_volume = volume
+
+    return best_rotation
+
+
+def get_obb(verts: Iterable[Vector], num_samples: int, angle_step: int,
+            method: OBBMethod = OBBMethod.SAMPLED) -> tuple[list[Vector], Matrix]:
+    """Calculates the oriented bounding box of ``verts``.
+
+    With ``OBBMethod.SAMPLED``, ``num_samples`` axes are tested, each rotated in steps of ``angle_step`` half-degrees.
+    With ``OBBMethod.EXACT``, the box orientation is found from the convex hull geometry and the other parameters
+    are ignored.
+
+    Returns a tuple with the box corners, in the same configuration as the default cube, and the box world matrix.
+    """
+    points, normals, edges, edge_faces = get_convex_hull(verts)
+
+    if method == OBBMethod.EXACT and len(edges) > 0:
+        rotation = get_obb_rotation_exact(points, normals, edges, edge_faces)
+    else:
+        # Sampled method, also used as fallback when the hull is degenerate (no faces)
+        rotation = get_obb_rotation_sampled(points, num_samples, angle_step)
 
-            if test_V < min_V:
-                min_V = test_V
-                min_box = box
-                min_mx = rot_mx
+    projected = rotation @ points.T
+    bbmin = projected.min(axis=1)
+    bbmax = projected.max(axis=1)
+    min_box = (bbmin[0], bbmax[0], bbmin[1], bbmax[1], bbmin[2], bbmax[2])
 
-    fmx = tr_mx @ r_mx @ min_mx.inverted_safe() @ sc_mx
+    # Inverse of the rotation to go from the box space back to world space
+    fmx = Matrix(rotation.T.tolist()).to_4x4()
 
     box_verts = box_coords(min_box)
 
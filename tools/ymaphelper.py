@@ -1,7 +1,12 @@
 import bpy
+import bmesh
+import numpy as np
+from numpy.typing import NDArray
+from enum import IntFlag
 from pathlib import Path
-from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
-from ..tools.blenderhelper import find_bsdf_and_material_output
+from typing import Optional
+from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType, EntityLodLevel
+from ..tools.blenderhelper import find_bsdf_and_material_output, remove_number_suffix
 from ..shared.obj_reader import obj_read_from_file
 
 # TODO: This is not a real flag calculation, definitely need to do better
@@ -89,3 +94,284 @@ def get_cargen_mesh() -> bpy.types.Mesh:
         mesh = cargen_obj_mesh.as_bpy_mesh(CARGEN_MESH_NAME)
 
     return mesh
+
+
+BOX_OCCLUDER_MESH_NAME = ".sollumz.box_occluder_mesh"
+
+
+def get_box_occluder_mesh() -> bpy.types.Mesh:
+    """Get the unit cube mesh shared by all imported box occluders or create it if not exist."""
+    mesh = bpy.data.meshes.get(BOX_OCCLUDER_MESH_NAME, None)
+    if mesh is None:
+        mesh = bpy.data.meshes.new(BOX_OCCLUDER_MESH_NAME)
+        bm = bmesh.new()
+        bmesh.ops.create_cube(bm, size=1.0)
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.materials.append(add_occluder_material(SollumType.YMAP_BOX_OCCLUDER))
+
+    return mesh
+
+
+def partition_positions_grid(positions: NDArray, cell_size: float) -> list[NDArray[np.intp]]:
+    """Split positions into the cells of a grid on the XY plane. Returns the indices of the positions in each non-empty
+    cell.
+    """
+    if len(positions) == 0:
+        return []
+
+    cells = np.floor(positions[:, :2] / cell_size).astype(np.int64)
+    _, cell_indices = np.unique(cells, axis=0, return_inverse=True)
+    cell_indices = cell_indices.ravel()
+
+    order = np.argsort(cell_indices, kind="stable")
+    counts = np.bincount(cell_indices)
+    return np.split(order, np.cumsum(counts)[:-1])
+
+
+def partition_positions_quadtree(positions: NDArray, max_count: int, max_extent: float = 0.0) -> list[NDArray[np.intp]]:
+    """Split positions into quadrants on the XY plane, recursively, until each chunk has at most ``max_count`` positions
+    and is at most ``max_extent`` wide (0 for no limit). Returns the indices of the positions in each chunk.
+    """
+    if len(positions) == 0:
+        return []
+
+    chunks = []
+    pending = [np.arange(len(positions))]
+    while pending:
+        indices = pending.pop()
+        xy = positions[indices, :2]
+        bbmin = xy.min(axis=0)
+        bbmax = xy.max(axis=0)
+        size = (bbmax - bbmin).max()
+
+        fits = len(indices) <= max_count and (max_extent <= 0.0 or size <= max_extent)
+        if fits or size == 0.0:
+            # Positions in the same spot cannot be split any further
+            chunks.append(indices)
+            continue
+
+        center = (bbmin + bbmax) * 0.5
+        quadrants = (xy[:, 0] > center[0]) + (xy[:, 1] > center[1]) * 2
+        for quadrant in range(4):
+            quadrant_indices = indices[quadrants == quadrant]
+            if len(quadrant_indices) > 0:
+                pending.append(quadrant_indices)
+
+    chunks.sort(key=lambda chunk: chunk[0])
+    return chunks
+
+
+class YmapFlags(IntFlag):
+    SCRIPT_LOADED = 1
+    LOD = 2
+
+
+class YmapContentFlags(IntFlag):
+    HD = 1
+    LOD = 2
+    SLOD2 = 4
+    INTERIOR = 8
+    SLOD = 16
+    OCCLUDERS = 32
+    PHYSICS = 64
+    LOD_LIGHTS = 128
+    DISTANT_LOD_LIGHTS = 256
+    CRITICAL = 512
+    GRASS = 1024
+
+
+# Content flags set based on the entities and occluders of the YMAP
+CONTENT_FLAGS_FROM_CONTENTS = (
+    YmapContentFlags.HD | YmapContentFlags.LOD | YmapContentFlags.SLOD2 | YmapContentFlags.SLOD |
+    YmapContentFlags.OCCLUDERS
+)
+# Content flags that depend on the entities but cannot be derived from them, only kept if the YMAP has entities
+CONTENT_FLAGS_OF_ENTITIES = YmapContentFlags.INTERIOR | YmapContentFlags.PHYSICS
+
+ENTITY_LOD_LEVEL_CONTENT_FLAGS = {
+    EntityLodLevel.LODTYPES_DEPTH_HD: YmapContentFlags.HD,
+    EntityLodLevel.LODTYPES_DEPTH_ORPHANHD: YmapContentFlags.HD,
+    EntityLodLevel.LODTYPES_DEPTH_LOD: YmapContentFlags.LOD,
+    EntityLodLevel.LODTYPES_DEPTH_SLOD1: YmapContentFlags.SLOD,
+    EntityLodLevel.LODTYPES_DEPTH_SLOD2: YmapContentFlags.SLOD2,
+    EntityLodLevel.LODTYPES_DEPTH_SLOD3: YmapContentFlags.SLOD2,
+    EntityLodLevel.LODTYPES_DEPTH_SLOD4: YmapContentFlags.SLOD2,
+}
+
+
+def get_ymap_entity_objects(ymap_obj: bpy.types.Object) -> list[bpy.types.Object]:
+    """Get the entity objects of ``ymap_obj`` in the order they are exported. The ``parent_index`` of the entities in
+    child YMAPs refers to this order.
+    """
+    return [entity_obj
+            for group_obj in ymap_obj.children if group_obj.sollum_type == SollumType.YMAP_ENTITY_GROUP
+            for entity_obj in group_obj.children if entity_obj.sollum_type == SollumType.DRAWABLE]
+
+
+def get_child_ymap_objects(ymap_obj: bpy.types.Object) -> list[bpy.types.Object]:
+    """Get the YMAPs in the scene whose parent YMAP is ``ymap_obj``."""
+    name = remove_number_suffix(ymap_obj.name)
+    return [obj for obj in bpy.context.scene.objects
+            if obj.sollum_type == SollumType.YMAP and obj.ymap_properties.parent == name]
+
+
+def update_ymap_flags(ymap_obj: bpy.types.Object, content_flags: int, flags: int):
+    """Set the content flags and flags of ``ymap_obj`` based on the entities and occluders it contains. The flags that
+    cannot be derived from its contents are taken from ``content_flags`` and ``flags``.
+    """
+    entity_objs = get_ymap_entity_objects(ymap_obj)
+
+    content_flags = YmapContentFlags(content_flags) & ~CONTENT_FLAGS_FROM_CONTENTS
+    if not entity_objs:
+        content_flags &= ~CONTENT_FLAGS_OF_ENTITIES
+
+    has_lod_entities = False
+    for entity_obj in entity_objs:
+        lod_level = entity_obj.entity_properties.lod_level
+        content_flags |= ENTITY_LOD_LEVEL_CONTENT_FLAGS[lod_level]
+        if lod_level not in (EntityLodLevel.LODTYPES_DEPTH_HD, EntityLodLevel.LODTYPES_DEPTH_ORPHANHD):
+            has_lod_entities = True
+
+    occluder_group_types = (SollumType.YMAP_BOX_OCCLUDER_GROUP, SollumType.YMAP_MODEL_OCCLUDER_GROUP)
+    if any(child.sollum_type in occluder_group_types and child.children for child in ymap_obj.children):
+        content_flags |= YmapContentFlags.OCCLUDERS
+
+    flags = YmapFlags(flags) & ~YmapFlags.LOD
+    if has_lod_entities:
+        flags |= YmapFlags.LOD
+
+    ymap_obj.ymap_properties.content_flags = int(content_flags)
+    ymap_obj.ymap_properties.flags = int(flags)
+
+
+def split_ymap_entities(
+    ymap_obj: bpy.types.Object,
+    entity_objs: list[bpy.types.Object],
+    chunks: list[NDArray[np.intp]]
+) -> list[bpy.types.Object]:
+    """Move each chunk of ``entity_objs`` to a new YMAP, which keeps the properties of ``ymap_obj``, like its parent
+    YMAP. The flags of the new YMAPs are updated to their contents. Returns the new YMAP objects.
+    """
+    base_name = remove_number_suffix(ymap_obj.name)
+    content_flags = ymap_obj.ymap_properties.content_flags
+    flags = ymap_obj.ymap_properties.flags
+    chunk_ymap_objs = []
+    for i, chunk in enumerate(chunks):
+        chunk_ymap_obj = ymap_obj.copy()
+        chunk_ymap_obj.name = f"{base_name}_{i}"
+        for collection in ymap_obj.users_collection:
+            collection.objects.link(chunk_ymap_obj)
+
+        group_obj = create_ymap_group(
+            sollum_type=SollumType.YMAP_ENTITY_GROUP, selected_ymap=chunk_ymap_obj, empty_name="Entities", select=False
+        )
+        for index in chunk:
+            entity_objs[index].parent = group_obj
+
+        update_ymap_flags(chunk_ymap_obj, content_flags, flags)
+        chunk_ymap_objs.append(chunk_ymap_obj)
+
+    return chunk_ymap_objs
+
+
+def split_ymap(
+    ymap_obj: bpy.types.Object,
+    chunks: list[NDArray[np.intp]]
+) -> tuple[list[bpy.types.Object], list[bpy.types.Object]]:
+    """Split the entities of ``ymap_obj`` into a new YMAP for each chunk of indices into
+    ``get_ymap_entity_objects(ymap_obj)``. ``ymap_obj`` keeps its other contents, like occluders, and is removed if it
+    is left empty.
+
+    The child YMAPs of ``ymap_obj`` are split too, so the entities of each child YMAP only have parents in one of the
+    new YMAPs, and their parent indices are updated. Entities without parent go with the closest new YMAP.
+
+    Returns the new YMAPs split from ``ymap_obj`` and the new YMAPs split from its child YMAPs.
+    """
+    entity_objs = get_ymap_entity_objects(ymap_obj)
+    child_ymap_objs = get_child_ymap_objects(ymap_obj)
+    content_flags = ymap_obj.ymap_properties.content_flags
+    flags = ymap_obj.ymap_properties.flags
+
+    chunk_ymap_objs = split_ymap_entities(ymap_obj, entity_objs, chunks)
+
+    new_child_ymap_objs = []
+    for child_ymap_obj in child_ymap_objs:
+        new_child_ymap_objs.extend(split_child_ymap(child_ymap_obj, entity_objs, chunk_ymap_objs))
+
+    for group_obj in list(ymap_obj.children):
+        if group_obj.sollum_type == SollumType.YMAP_ENTITY_GROUP and not group_obj.children:
+            bpy.data.objects.remove(group_obj)
+
+    if ymap_obj.children:
+        update_ymap_flags(ymap_obj, content_flags, flags)
+    else:
+        bpy.data.objects.remove(ymap_obj)
+
+    return chunk_ymap_objs, new_child_ymap_objs
+
+
+def split_child_ymap(
+    child_ymap_obj: bpy.types.Object,
+    parent_entity_objs: list[bpy.types.Object],
+    parent_chunk_ymap_objs: list[bpy.types.Object]
+) -> list[bpy.types.Object]:
+    """Split ``child_ymap_obj`` after its parent YMAP, whose entities were ``parent_entity_objs``, was split into
+    ``parent_chunk_ymap_objs``. Returns the new YMAPs, or an empty list if all its entities have their parent in the
+    same YMAP and only its parent needs to be updated.
+    """
+    parent_entity_locations = {}  # entity object -> (index of its YMAP in parent_chunk_ymap_objs, index in the YMAP)
+    parent_chunk_centers = np.empty((len(parent_chunk_ymap_objs), 2))
+    for chunk_index, chunk_ymap_obj in enumerate(parent_chunk_ymap_objs):
+        chunk_entity_objs = get_ymap_entity_objects(chunk_ymap_obj)
+        for entity_index, entity_obj in enumerate(chunk_entity_objs):
+            parent_entity_locations[entity_obj] = (chunk_index, entity_index)
+        parent_chunk_centers[chunk_index] = np.mean([obj.matrix_world.translation[:2] for obj in chunk_entity_objs],
+                                                    axis=0)
+
+    entity_objs = get_ymap_entity_objects(child_ymap_obj)
+    entity_parent_locations = []
+    entity_chunk_indices = np.zeros(len(entity_objs), dtype=np.intp)
+    for i, entity_obj in enumerate(entity_objs):
+        parent_index = entity_obj.entity_properties.parent_index
+        parent_location = None
+        if 0 <= parent_index < len(parent_entity_objs):
+            parent_location = parent_entity_locations.get(parent_entity_objs[parent_index], None)
+
+        if parent_location is not None:
+            entity_chunk_indices[i] = parent_location[0]
+        else:
+            # Entity without parent, keep it with the closest parent YMAP
+            distances = np.linalg.norm(parent_chunk_centers - entity_obj.matrix_world.translation[:2], axis=1)
+            entity_chunk_indices[i] = np.argmin(distances)
+
+        entity_parent_locations.append(parent_location)
+
+    used_chunk_indices = np.unique(entity_chunk_indices)
+    if len(used_chunk_indices) <= 1:
+        chunk_index = used_chunk_indices[0] if len(used_chunk_indices) == 1 else 0
+        set_ymap_parent(child_ymap_obj, parent_chunk_ymap_objs[chunk_index], entity_objs, entity_parent_locations)
+        return []
+
+    chunks = [np.flatnonzero(entity_chunk_indices == chunk_index) for chunk_index in used_chunk_indices]
+    new_ymap_objs, new_child_ymap_objs = split_ymap(child_ymap_obj, chunks)
+    for new_ymap_obj, chunk_index, chunk in zip(new_ymap_objs, used_chunk_indices, chunks):
+        set_ymap_parent(new_ymap_obj, parent_chunk_ymap_objs[chunk_index],
+                        [entity_objs[i] for i in chunk], [entity_parent_locations[i] for i in chunk])
+
+    return new_ymap_objs + new_child_ymap_objs
+
+
+def set_ymap_parent(
+    ymap_obj: bpy.types.Object,
+    parent_ymap_obj: bpy.types.Object,
+    entity_objs: list[bpy.types.Object],
+    entity_parent_locations: list[Optional[tuple[int, int]]]
+):
+    """Set ``parent_ymap_obj`` as parent YMAP of ``ymap_obj`` and the new parent indices of ``entity_objs``, from
+    the locations of their parents returned by ``split_child_ymap``.
+    """
+    ymap_obj.ymap_properties.parent = remove_number_suffix(parent_ymap_obj.name)
+    for entity_obj, parent_location in zip(entity_objs, entity_parent_locations):
+        if parent_location is not None:
+            entity_obj.entity_properties.parent_index = parent_location[1]
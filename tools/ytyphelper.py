@@ -2,7 +2,8 @@ import bpy
 import os
 from ..sollumz_helper import has_embedded_textures, has_collision
 from ..cwxml.ytyp import BaseArchetype, CMapTypes
-from ..tools.meshhelper import get_extents, get_bound_center, get_sphere_radius
+from ..tools.meshhelper import get_bound_center_from_bounds, get_sphere_radius
+from ..ytyp.boundcache import archetype_bounds_cache
 from ..sollumz_properties import SollumType
 
 
@@ -21,10 +22,10 @@ def base_archetype_from_object(obj):
             drawable_dictionary = obj.parent.name
     arch.drawable_dictionary = drawable_dictionary
     arch.physics_dictionary = obj.name if has_collision(obj) else ""
-    bbmin, bbmax = get_extents(obj)
+    bbmin, bbmax = archetype_bounds_cache.get_bounds(obj)
     arch.bb_min = bbmin
     arch.bb_max = bbmax
-    arch.bs_center = get_bound_center(obj)
+    arch.bs_center = get_bound_center_from_bounds(bbmin, bbmax)
     arch.bs_radius = get_sphere_radius(bbmin, bbmax)
     arch.asset_name = obj.name
     if obj.sollum_type == SollumType.FRAGMENT:
@@ -0,0 +1,106 @@
+"""
+Cache of exported bound children, to skip recalculating bounds that didn't change between exports.
+"""
+import os
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+from typing import Optional
+from xml.etree import ElementTree as ET
+
+from ..cwxml.bound import BoundChild, BoundList
+from .. import logger
+
+BOUND_CACHE_FILE_EXTENSION = ".sollumz_bounds_cache.xml"
+BOUND_CACHE_VERSION = "1"
+
+
+class BoundExportCache:
+    """In-memory cache of ``BoundChild`` XML objects, keyed by a hash of all the data used to create them.
+    The least recently used entries are discarded when the cache exceeds ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, BoundChild] = OrderedDict()
+        self._lock = Lock()
+        self._loaded_filepath: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[BoundChild]:
+        """Gets a copy of the cached bound, or ``None`` if not in the cache."""
+        with self._lock:
+            bound_xml = self._entries.get(key, None)
+            if bound_xml is None:
+                return None
+
+            self._entries.move_to_end(key)
+
+        return deepcopy(bound_xml)
+
+    def set(self, key: str, bound_xml: BoundChild):
+        """Stores a copy of ``bound_xml`` in the cache."""
+        bound_xml = deepcopy(bound_xml)
+        with self._lock:
+            self._entries[key] = bound_xml
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._loaded_filepath = None
+
+    def load(self, filepath: str):
+        """Adds the entries stored in ``filepath`` to the cache. Does nothing if the file was already loaded or it
+        doesn't exist.
+        """
+        if self._loaded_filepath == filepath or not os.path.isfile(filepath):
+            return
+
+        try:
+            root = ET.parse(filepath).getroot()
+        except ET.ParseError:
+            logger.warning(f"Bounds cache file '{filepath}' is corrupted! Ignoring it...")
+            return
+
+        if root.get("version") != BOUND_CACHE_VERSION:
+            return
+
+        for entry in root.iter("Entry"):
+            children = BoundList.from_xml(entry).value
+            if len(children) != 1:
+                continue
+
+            self.set(entry.get("key"), children[0])
+
+        self._loaded_filepath = filepath
+
+    def save(self, filepath: str):
+        """Writes all the cache entries to ``filepath``."""
+        root = ET.Element("SollumzBoundsCache", attrib={"version": BOUND_CACHE_VERSION})
+        with self._lock:
+            entries = list(self._entries.items())
+
+        for key, bound_xml in entries:
+            entry = ET.SubElement(root, "Entry", attrib={"key": key})
+            entry.append(bound_xml.to_xml())
+
+        ET.ElementTree(root).write(filepath, encoding="UTF-8", xml_declaration=True)
+        self._loaded_filepath = filepath
+
+
+def get_bound_cache_filepath(blend_filepath: str) -> Optional[str]:
+    """Gets the path of the bounds cache file stored next to ``blend_filepath``. Returns ``None`` if the .blend file
+    hasn't been saved yet.
+    """
+    if not blend_filepath:
+        return None
+
+    return os.path.splitext(blend_filepath)[0] + BOUND_CACHE_FILE_EXTENSION
+
+
+bound_export_cache = BoundExportCache()
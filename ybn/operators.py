@@ -1,5 +1,5 @@
 from math import ceil
-from ..tools.obb import get_obb, get_obb_extents
+from ..tools.obb import get_obb, get_obb_extents, OBBMethod
 import traceback
 from ..cwxml.flag_preset import FlagPreset
 from ..ybn.properties import BoundFlags, load_flag_presets, flag_presets, get_flag_presets_path
@@ -44,6 +44,17 @@ class SOLLUMZ_OT_create_polygon_box_from_verts(bpy.types.Operator):
         name="Parent",
         description="Parent for the new box object. If not set, the parent of the active object is used."
     )
+    method: bpy.props.EnumProperty(
+        items=[
+            (OBBMethod.SAMPLED.value, "Sampled", "Test rotations around multiple axes distributed around the sphere"),
+            (OBBMethod.EXACT.value, "Exact",
+             "Find the orientation from the convex hull faces and edges of the selection. Usually finds a tighter "
+             "box, but it can be slower with dense selections"),
+        ],
+        name="Method",
+        description="Method used to find the best orientation for the bounding box",
+        default=OBBMethod.SAMPLED.value
+    )
     num_samples: bpy.props.IntProperty(
         name="Number of Samples",
         description="Number of samples to use to find the best orientation for the bounding box",
@@ -71,6 +82,17 @@ class SOLLUMZ_OT_create_polygon_box_from_verts(bpy.types.Operator):
         self.poll_message_set("Must be in Edit Mode.")
         return context.mode == "EDIT_MESH"
 
+    def draw(self, context):
+        layout = self.layout
+        layout.use_property_split = True
+        layout.prop(self, "parent_name")
+        layout.prop(self, "sollum_type")
+        layout.prop(self, "method")
+        col = layout.column()
+        col.active = self.method == OBBMethod.SAMPLED
+        col.prop(self, "num_samples")
+        col.prop(self, "angle_step")
+
     def execute(self, context):
         objects = context.objects_in_mode
         verts: list[Vector] = []
@@ -92,7 +114,7 @@ class SOLLUMZ_OT_create_polygon_box_from_verts(bpy.types.Operator):
 
         pobj = create_blender_object(self.sollum_type)
 
-        obb, world_matrix = get_obb(verts, self.num_samples, self.angle_step)
+        obb, world_matrix = get_obb(verts, self.num_samples, self.angle_step, OBBMethod(self.method))
         bbmin, bbmax = get_obb_extents(obb)
 
         center = world_matrix @ (bbmin + bbmax) / 2
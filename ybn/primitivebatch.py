@@ -0,0 +1,261 @@
+"""
+Batched BVH primitives. All the boxes, spheres, capsules or cylinders of a BVH can be stored in a single mesh object,
+instead of one object per primitive. Each primitive is a copy of a template mesh and its vertices store the index of
+the primitive in the ``PRIMITIVE_INDEX_ATTR`` attribute. On export, the shape of each primitive is read back from its
+vertices, so primitives can be moved, rotated and resized in edit mode.
+"""
+import bpy
+import numpy as np
+from numpy.typing import NDArray
+from functools import cache
+from typing import NamedTuple
+from mathutils import Matrix
+from ..sollumz_properties import SollumType, SOLLUMZ_UI_NAMES
+from ..tools.meshhelper import create_box, create_sphere, create_cylinder, create_capsule
+from .. import logger
+
+PRIMITIVE_INDEX_ATTR = "primitive_index"
+
+BATCHED_PRIMITIVE_TYPES = (
+    SollumType.BOUND_POLY_BOX,
+    SollumType.BOUND_POLY_SPHERE,
+    SollumType.BOUND_POLY_CAPSULE,
+    SollumType.BOUND_POLY_CYLINDER,
+)
+
+# Corners of the box stored in the BVH, same corners of the object bounding box used when exporting single boxes
+BOX_CORNERS = ((-1, -1, -1), (1, -1, 1), (-1, 1, 1), (1, 1, -1))
+
+
+class PrimitiveTemplate(NamedTuple):
+    vertices: NDArray[np.float64]
+    face_vertices: NDArray[np.int32]
+    face_sizes: NDArray[np.int32]
+    # Vertices the shape is read from: the box corners for boxes, and the rings at both ends for capsules and
+    # cylinders
+    key_vertices: tuple[NDArray[np.intp], ...]
+
+
+class BatchedPrimitives(NamedTuple):
+    # (primitives, points, 3) array with the 4 corners of boxes, the center of spheres or the ends of capsules and
+    # cylinders
+    points: NDArray[np.float64]
+    radii: NDArray[np.float64]
+    material_indices: NDArray[np.int32]
+
+
+def is_batched_primitives_object(obj: bpy.types.Object) -> bool:
+    return (
+        obj.type == "MESH" and obj.sollum_type in BATCHED_PRIMITIVE_TYPES and
+        PRIMITIVE_INDEX_ATTR in obj.data.attributes
+    )
+
+
+@cache
+def get_primitive_template(sollum_type: SollumType) -> PrimitiveTemplate:
+    """Get the mesh of a primitive of size 1. Boxes are centered at the origin, the other primitives are along the
+    Z axis. Capsules have a radius of 1 and the centers of their hemispheres at -1 and 1.
+    """
+    mesh = bpy.data.meshes.new("template")
+    match sollum_type:
+        case SollumType.BOUND_POLY_BOX:
+            create_box(mesh, size=1)
+        case SollumType.BOUND_POLY_SPHERE:
+            create_sphere(mesh, radius=1)
+        case SollumType.BOUND_POLY_CAPSULE:
+            create_capsule(mesh, radius=1, length=2, axis="Z")
+        case SollumType.BOUND_POLY_CYLINDER:
+            create_cylinder(mesh, radius=1, length=1, axis="Z")
+
+    vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", vertices)
+    face_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", face_vertices)
+    face_sizes = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", face_sizes)
+    bpy.data.meshes.remove(mesh)
+
+    vertices = vertices.reshape((-1, 3)).astype(np.float64)
+    if sollum_type == SollumType.BOUND_POLY_BOX:
+        corners = [np.flatnonzero(np.all(np.sign(vertices) == corner, axis=1))[0] for corner in BOX_CORNERS]
+        key_vertices = (np.array(corners),)
+    elif sollum_type == SollumType.BOUND_POLY_SPHERE:
+        key_vertices = ()
+    else:
+        end_z = 1.0 if sollum_type == SollumType.BOUND_POLY_CAPSULE else 0.5
+        on_ring = np.isclose(np.linalg.norm(vertices[:, :2], axis=1), 1.0)
+        key_vertices = tuple(
+            _get_unique_vertices(vertices, on_ring & np.isclose(vertices[:, 2], z)) for z in (-end_z, end_z)
+        )
+
+    return PrimitiveTemplate(vertices, face_vertices, face_sizes, key_vertices)
+
+
+def _get_unique_vertices(vertices: NDArray[np.float64], mask: NDArray[np.bool_]) -> NDArray[np.intp]:
+    """Get the indices of the vertices in ``mask``, skipping vertices with the same position as a previous one. Some
+    templates repeat the first vertex of a ring at the end, which would move the center of the ring.
+    """
+    indices = np.flatnonzero(mask)
+    _, first_indices = np.unique(vertices[indices].round(5), axis=0, return_index=True)
+    return indices[np.sort(first_indices)]
+
+
+def _get_axis_rotations(
+    starts: NDArray[np.float64],
+    ends: NDArray[np.float64]
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Get the rotation matrices that align the Z axis with the axis from ``starts`` to ``ends``, and the length of
+    each axis.
+    """
+    axes = ends - starts
+    lengths = np.linalg.norm(axes, axis=1)
+    z_axes = np.zeros_like(axes)
+    z_axes[:, 2] = 1.0
+    has_length = lengths > 0.0
+    z_axes[has_length] = axes[has_length] / lengths[has_length, None]
+
+    helper_axes = np.where(np.abs(z_axes[:, :1]) < 0.9, (1.0, 0.0, 0.0), (0.0, 1.0, 0.0))
+    x_axes = np.cross(helper_axes, z_axes)
+    x_axes /= np.linalg.norm(x_axes, axis=1)[:, None]
+    y_axes = np.cross(z_axes, x_axes)
+    return np.stack((x_axes, y_axes, z_axes), axis=-1), lengths
+
+
+def get_box_primitives_vertices(matrices: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Get the vertices of boxes of size 1 transformed by each of the (boxes, 4, 4) ``matrices``."""
+    template = get_primitive_template(SollumType.BOUND_POLY_BOX)
+    return np.einsum("pij,vj->pvi", matrices[:, :3, :3], template.vertices) + matrices[:, None, :3, 3]
+
+
+def get_sphere_primitives_vertices(centers: NDArray[np.float64], radii: NDArray[np.float64]) -> NDArray[np.float64]:
+    template = get_primitive_template(SollumType.BOUND_POLY_SPHERE)
+    return template.vertices[None, :, :] * radii[:, None, None] + centers[:, None, :]
+
+
+def get_capsule_primitives_vertices(
+    starts: NDArray[np.float64],
+    ends: NDArray[np.float64],
+    radii: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    template = get_primitive_template(SollumType.BOUND_POLY_CAPSULE)
+    rotations, lengths = _get_axis_rotations(starts, ends)
+
+    # scale the hemispheres by the radius around their centers and move them to the ends
+    template_z = template.vertices[:, 2]
+    local_vertices = np.empty((len(radii), len(template.vertices), 3), dtype=np.float64)
+    local_vertices[:, :, :2] = template.vertices[None, :, :2] * radii[:, None, None]
+    local_vertices[:, :, 2] = np.sign(template_z) * (
+        lengths[:, None] * 0.5 + radii[:, None] * (np.abs(template_z) - 1.0)
+    )
+    centers = (starts + ends) * 0.5
+    return np.einsum("pij,pvj->pvi", rotations, local_vertices) + centers[:, None, :]
+
+
+def get_cylinder_primitives_vertices(
+    starts: NDArray[np.float64],
+    ends: NDArray[np.float64],
+    radii: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    template = get_primitive_template(SollumType.BOUND_POLY_CYLINDER)
+    rotations, lengths = _get_axis_rotations(starts, ends)
+
+    scales = np.stack((radii, radii, lengths), axis=1)
+    local_vertices = template.vertices[None, :, :] * scales[:, None, :]
+    centers = (starts + ends) * 0.5
+    return np.einsum("pij,pvj->pvi", rotations, local_vertices) + centers[:, None, :]
+
+
+def create_batched_primitives_mesh(
+    sollum_type: SollumType,
+    primitives_vertices: NDArray[np.float64],
+    material_indices: NDArray[np.int32],
+    materials: list[bpy.types.Material]
+) -> bpy.types.Mesh:
+    """Create a mesh with a primitive of type ``sollum_type`` for each of the (primitives, template vertices, 3)
+    ``primitives_vertices``.
+    """
+    template = get_primitive_template(sollum_type)
+    num_primitives, num_template_vertices = primitives_vertices.shape[:2]
+
+    mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[sollum_type])
+    mesh.vertices.add(num_primitives * num_template_vertices)
+    mesh.vertices.foreach_set("co", primitives_vertices.astype(np.float32).ravel())
+
+    vertex_offsets = np.arange(num_primitives, dtype=np.int32) * num_template_vertices
+    face_vertices = (template.face_vertices[None, :] + vertex_offsets[:, None]).ravel()
+    mesh.loops.add(len(face_vertices))
+    mesh.loops.foreach_set("vertex_index", face_vertices)
+
+    face_sizes = np.tile(template.face_sizes, num_primitives)
+    mesh.polygons.add(len(face_sizes))
+    # polygon sizes are derived from loop_start, loop_total is read-only since Blender 3.6
+    mesh.polygons.foreach_set("loop_start", (np.cumsum(face_sizes) - face_sizes).astype(np.int32))
+    mesh.update(calc_edges=True)
+
+    for mat in materials:
+        mesh.materials.append(mat)
+    face_material_indices = np.repeat(material_indices, len(template.face_sizes)).astype(np.int32)
+    mesh.polygons.foreach_set("material_index", face_material_indices)
+
+    primitive_index_attr = mesh.attributes.new(PRIMITIVE_INDEX_ATTR, "INT", "POINT")
+    primitive_index_attr.data.foreach_set(
+        "value", np.repeat(np.arange(num_primitives, dtype=np.int32), num_template_vertices)
+    )
+
+    return mesh
+
+
+def get_batched_primitives(obj: bpy.types.Object, mesh: bpy.types.Mesh, transforms: Matrix) -> BatchedPrimitives:
+    """Read back the primitives of the batched primitives object ``obj`` from its evaluated ``mesh``, with
+    ``transforms`` applied. Primitives whose vertices were added or removed are skipped.
+    """
+    template = get_primitive_template(obj.sollum_type)
+    num_template_vertices = len(template.vertices)
+
+    num_vertices = len(mesh.vertices)
+    positions = np.empty(num_vertices * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    matrix = np.array(transforms, dtype=np.float64)
+    positions = positions.reshape((-1, 3)) @ matrix[:3, :3].T + matrix[:3, 3]
+
+    primitive_indices = np.empty(num_vertices, dtype=np.int32)
+    mesh.attributes[PRIMITIVE_INDEX_ATTR].data.foreach_get("value", primitive_indices)
+
+    order = np.argsort(primitive_indices, kind="stable")
+    ids, starts, counts = np.unique(primitive_indices[order], return_index=True, return_counts=True)
+    is_complete = counts == num_template_vertices
+    if not np.all(is_complete):
+        logger.warning(
+            f"'{obj.name}' has {np.count_nonzero(~is_complete)} primitives with added or removed vertices! "
+            "Skipping them..."
+        )
+    ids = ids[is_complete]
+    vertices = positions[order[starts[is_complete, None] + np.arange(num_template_vertices)]]
+
+    # use the material of the first face of each primitive
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    face_materials = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", face_materials)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    face_ids = primitive_indices[loop_vertices[loop_starts]]
+    face_primitives = np.minimum(np.searchsorted(ids, face_ids), max(len(ids) - 1, 0))
+    has_primitive = ids[face_primitives] == face_ids if len(ids) > 0 else np.zeros(len(face_ids), dtype=bool)
+    material_indices = np.zeros(len(ids), dtype=np.int32)
+    material_indices[face_primitives[has_primitive][::-1]] = face_materials[has_primitive][::-1]
+
+    match obj.sollum_type:
+        case SollumType.BOUND_POLY_BOX:
+            points = vertices[:, template.key_vertices[0]]
+            radii = np.zeros(len(ids), dtype=np.float64)
+        case SollumType.BOUND_POLY_SPHERE:
+            centers = vertices.mean(axis=1)
+            points = centers[:, None, :]
+            radii = np.linalg.norm(vertices - points, axis=2).max(axis=1, initial=0.0)
+        case _:
+            bottom_ring, top_ring = template.key_vertices
+            points = np.stack((vertices[:, bottom_ring].mean(axis=1), vertices[:, top_ring].mean(axis=1)), axis=1)
+            radii = np.linalg.norm(vertices[:, bottom_ring[0]] - points[:, 0], axis=1)
+
+    return BatchedPrimitives(points, radii, material_indices)
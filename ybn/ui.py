@@ -2,6 +2,7 @@ import bpy
 from .properties import BoundFlags, CollisionProperties, CollisionMatFlags
 from ..sollumz_properties import MaterialType, SollumType, BOUND_TYPES, BOUND_POLYGON_TYPES
 from .collision_materials import collisionmats
+from .primitivebatch import is_batched_primitives_object
 from ..sollumz_ui import SOLLUMZ_PT_OBJECT_PANEL, SOLLUMZ_PT_MAT_PANEL
 from . import operators as ybn_ops
 
@@ -80,7 +81,10 @@ class SOLLUMZ_PT_BOUND_SHAPE_PANEL(bpy.types.Panel):
     @classmethod
     def poll(self, context):
         obj = context.active_object
-        return obj and (obj.sollum_type != SollumType.BOUND_COMPOSITE and obj.sollum_type != SollumType.BOUND_POLY_TRIANGLE)
+        return obj and (
+            obj.sollum_type != SollumType.BOUND_COMPOSITE and obj.sollum_type != SollumType.BOUND_POLY_TRIANGLE and
+            not is_batched_primitives_object(obj)
+        )
 
     def draw(self, context):
         obj = context.active_object
@@ -1,6 +1,8 @@
 import bpy
 from mathutils import Vector, Matrix
 from typing import Optional, TypeVar, Callable, Type
+from functools import partial
+import hashlib
 import numpy as np
 
 from ..sollumz_helper import get_parent_inverse
@@ -33,8 +35,11 @@ from ..tools.meshhelper import (
     get_color_attr_name,
 )
 from ..sollumz_properties import MaterialType, SOLLUMZ_UI_NAMES, SollumType, BOUND_POLYGON_TYPES
+from ..sollumz_preferences import get_export_settings
 from .. import logger
 from .properties import CollisionMatFlags, get_collision_mat_raw_flags, BoundFlags
+from .boundcache import bound_export_cache
+from .primitivebatch import PRIMITIVE_INDEX_ATTR, get_batched_primitives, is_batched_primitives_object
 
 T_Bound = TypeVar("T_Bound", bound=Bound)
 T_BoundChild = TypeVar("T_BoundChild", bound=BoundChild)
@@ -97,18 +102,124 @@ def create_composite_xml(
 
 def create_bound_xml(obj: bpy.types.Object, is_root: bool = False) -> BoundChild:
     """Create a ``Bound`` instance based on `obj.sollum_type``."""
+    calculate_bound_xml = gather_bound_xml(obj, is_root)
+    if calculate_bound_xml is None:
+        return None
+
+    return calculate_bound_xml()
+
+
+def gather_bound_xml(obj: bpy.types.Object, is_root: bool = False) -> Optional[Callable[[], BoundChild]]:
+    """Create a ``Bound`` instance based on `obj.sollum_type``, reading all the required data from ``obj``.
+
+    Returns a function that finishes the ``Bound`` by calculating its centroid and mass properties. This function
+    doesn't access any Blender data. Returns ``None`` if the bound is skipped.
+
+    If the bounds export cache is enabled and ``obj`` didn't change since it was last exported, the cached ``Bound``
+    is reused.
+    """
     if (obj.type == "MESH" and not has_col_mats(obj)) or (obj.type == "EMPTY" and not bound_geom_has_mats(obj)):
         logger.warning(f"'{obj.name}' has no collision materials! Skipping...")
         return
 
+    if not get_export_settings().use_bound_cache:
+        return gather_bound_xml_uncached(obj, is_root)
+
+    cache_key = get_bound_cache_key(obj, is_root)
+    cached_bound_xml = bound_export_cache.get(cache_key)
+    if cached_bound_xml is not None:
+        return lambda: cached_bound_xml
+
+    calculate_bound_xml = gather_bound_xml_uncached(obj, is_root)
+
+    def _calculate_and_cache_bound_xml() -> BoundChild:
+        bound_xml = calculate_bound_xml()
+        bound_export_cache.set(cache_key, bound_xml)
+        return bound_xml
+
+    return _calculate_and_cache_bound_xml
+
+
+def get_bound_cache_key(obj: bpy.types.Object, is_root: bool = False) -> str:
+    """Get a hash of all the data used to create the ``Bound`` of ``obj``: transforms, mesh data and collision
+    materials of ``obj`` and its children. Used as key in the bounds export cache.
+    """
+    h = hashlib.blake2b(digest_size=20)
+
+    def _update_matrix(matrix: Matrix):
+        h.update(np.array(matrix, dtype=np.float64).tobytes())
+
+    def _update_material(mat: Optional[bpy.types.Material]):
+        if mat is None or mat.sollum_type != MaterialType.COLLISION:
+            h.update(b"None")
+            return
+
+        props = mat.collision_properties
+        h.update(repr((
+            props.collision_index, props.procedural_id, props.room_id, props.ped_density,
+            props.material_color_index, get_collision_mat_raw_flags(mat.collision_flags)
+        )).encode())
+
+    def _update_mesh(mesh_obj: bpy.types.Object):
+        mesh = mesh_obj.to_mesh()
+
+        for collection, attr_name, dtype in (
+            (mesh.vertices, "co", np.float32),
+            (mesh.loops, "vertex_index", np.int32),
+            (mesh.polygons, "loop_start", np.int32),
+            (mesh.polygons, "loop_total", np.int32),
+            (mesh.polygons, "material_index", np.int32),
+        ):
+            values = np.empty(len(collection) * (3 if attr_name == "co" else 1), dtype=dtype)
+            collection.foreach_get(attr_name, values)
+            h.update(values.tobytes())
+
+        primitive_index_attr = mesh.attributes.get(PRIMITIVE_INDEX_ATTR, None)
+        if primitive_index_attr is not None:
+            h.update(f"{primitive_index_attr.domain}{primitive_index_attr.data_type}".encode())
+            primitive_indices = np.empty(len(primitive_index_attr.data), dtype=np.int32)
+            primitive_index_attr.data.foreach_get("value", primitive_indices)
+            h.update(primitive_indices.tobytes())
+
+        color_attr = mesh.color_attributes.get(get_color_attr_name(0), None)
+        if color_attr is not None:
+            h.update(f"{color_attr.domain}{color_attr.data_type}".encode())
+            colors = np.empty(len(color_attr.data) * 4, dtype=np.float32)
+            color_attr.data.foreach_get("color_srgb", colors)
+            h.update(colors.tobytes())
+
+        for mat in mesh.materials:
+            _update_material(mat)
+
+        mesh_obj.to_mesh_clear()
+
+    h.update(repr((is_root, get_export_settings().apply_transforms)).encode())
+    _update_matrix(get_pose_inverse(obj))
+    for flags_prop_name in ("composite_flags1", "composite_flags2"):
+        flags = getattr(obj, flags_prop_name)
+        h.update(repr([name for name in BoundFlags.__annotations__ if name in flags and flags[name]]).encode())
+
+    for child in [obj, *obj.children_recursive]:
+        h.update(repr((child.type, child.sollum_type)).encode())
+        _update_matrix(child.matrix_world)
+        _update_matrix(child.matrix_basis)
+        _update_matrix(get_parent_inverse(child))
+        h.update(np.array(child.bound_box, dtype=np.float64).tobytes())
+        _update_material(child.active_material)
+        if child.type == "MESH":
+            _update_mesh(child)
+
+    return h.hexdigest()
+
+
+def gather_bound_xml_uncached(obj: bpy.types.Object, is_root: bool = False) -> Callable[[], BoundChild]:
+    """Same as ``gather_bound_xml`` but without checking for collision materials or using the bounds export cache."""
     from ..shared.geometry import (
         get_centroid_of_box, get_mass_properties_of_box,
         get_centroid_of_disc, get_mass_properties_of_disc,
         get_centroid_of_sphere, get_mass_properties_of_sphere,
         get_centroid_of_cylinder, get_mass_properties_of_cylinder,
         get_centroid_of_capsule, get_mass_properties_of_capsule,
-        get_centroid_of_mesh, get_mass_properties_of_mesh,
-        grow_sphere
     )
 
     match obj.sollum_type:
@@ -173,72 +284,11 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False) -> BoundChild
 
         case SollumType.BOUND_GEOMETRY:
             bound_xml = create_bound_geometry_xml(obj)
-
-            mesh_vertices = np.array([(v + bound_xml.geometry_center) for v in bound_xml.vertices])
-            mesh_faces = []
-            for poly in bound_xml.polygons:
-                mesh_faces.append([poly.v1, poly.v2, poly.v3])
-            mesh_faces = np.array(mesh_faces)
-
-            centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
-            volume, cg, inertia = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
-            # CW calculates the shrunk mesh on import now (though it doesn't update the margin!)
-            # _, margin = shrink_mesh(mesh_vertices, mesh_faces)
-            # bound_xml.vertices_shrunk = [Vector(vert) - bound_xml.geometry_center for vert in shrunk_vertices]
-            margin = 0.0025 # set it to the minimum margin, though it should depend on the shrunk mesh
+            return partial(calculate_bound_geometry_xml, bound_xml)
 
         case SollumType.BOUND_GEOMETRYBVH:
             bound_xml = create_bvh_xml(obj)
-
-            mesh_vertices = np.array([(v + bound_xml.geometry_center) for v in bound_xml.vertices])
-            mesh_faces = []
-            primitives = []
-            for poly in bound_xml.polygons:
-                if not isinstance(poly, PolyTriangle):
-                    primitives.append(poly)
-                    continue
-                mesh_faces.append([poly.v1, poly.v2, poly.v3])
-
-            centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
-            if len(mesh_faces) > 0:
-                # If we have a mesh, calculate the center of gravity from the mesh
-                mesh_faces = np.array(mesh_faces)
-                _, cg, _ = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
-            else:
-                # Otherwise, approximate with the centroid
-                cg = centroid
-            # BVHs don't need to calculate the volume or inertia
-            volume = 1.0
-            inertia = Vector((1.0, 1.0, 1.0))
-            margin = 0.04  # BVHs always have this margin
-
-            # Grow radius_around_centroid to fit all primitives
-            for prim in primitives:
-                match prim:
-                    case PolyBox():
-                        # Calculate the opposite corners of the box. The corners stored in the vertices array are
-                        # already inside the bounding sphere, but the opposite corners may not be.
-                        v = mesh_vertices[[prim.v1, prim.v2, prim.v3, prim.v4]]
-                        v0b = Vector((v[1] + v[2] + v[3] - v[0]) * 0.5)
-                        v1b = Vector((v[0] + v[2] + v[3] - v[1]) * 0.5)
-                        v2b = Vector((v[0] + v[1] + v[3] - v[2]) * 0.5)
-                        v3b = Vector((v[0] + v[1] + v[2] - v[3]) * 0.5)
-                        radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v0b, 0.0)
-                        radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v1b, 0.0)
-                        radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v2b, 0.0)
-                        radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v3b, 0.0)
-                    case PolySphere():
-                        # The sphere center vertex is inside the bounding sphere but the whole sphere may not be.
-                        radius_around_centroid = grow_sphere(
-                            centroid, radius_around_centroid, Vector(mesh_vertices[prim.v]), prim.radius)
-                    case PolyCapsule() | PolyCylinder():
-                        # Capsules and cylinders are approximated by two spheres on their ends.
-                        radius_around_centroid = grow_sphere(
-                            centroid, radius_around_centroid, Vector(mesh_vertices[prim.v1]), prim.radius)
-                        radius_around_centroid = grow_sphere(
-                            centroid, radius_around_centroid, Vector(mesh_vertices[prim.v2]), prim.radius)
-                    case _:
-                        assert False, f"Unknown primitive type '{type(prim)}'"
+            return partial(calculate_bvh_xml, bound_xml)
 
         case _:
             assert False, f"Unknown bound type '{obj.sollum_type}'"
@@ -266,6 +316,88 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False) -> BoundChild
         transform.translation = Vector((0.0, 0.0, 0.0))
         bound_xml.composite_transform = transform.transposed()
 
+    set_bound_centroid(bound_xml, centroid, radius_around_centroid)
+    set_bound_mass_properties(bound_xml, volume, cg, inertia)
+    bound_xml.margin = margin
+    return lambda: bound_xml
+
+
+def get_bound_geometry_mesh_arrays(geom_xml: BoundGeometry | BoundGeometryBVH) -> tuple[np.ndarray, np.ndarray]:
+    """Get the vertices, with the geometry center applied, and the triangles of ``geom_xml`` as arrays."""
+    mesh_vertices = np.array(geom_xml.vertices, dtype=np.float64).reshape((-1, 3)) + np.array(geom_xml.geometry_center)
+    mesh_faces = np.array(
+        [(poly.v1, poly.v2, poly.v3) for poly in geom_xml.polygons if isinstance(poly, PolyTriangle)],
+        dtype=np.int64
+    ).reshape((-1, 3))
+    return mesh_vertices, mesh_faces
+
+
+def calculate_bound_geometry_xml(bound_xml: BoundGeometry) -> BoundGeometry:
+    """Calculate the centroid and mass properties of ``bound_xml``. Doesn't access Blender data."""
+    from ..shared.geometry import get_centroid_of_mesh, get_mass_properties_of_mesh
+
+    mesh_vertices, mesh_faces = get_bound_geometry_mesh_arrays(bound_xml)
+
+    centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
+    volume, cg, inertia = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
+    # CW calculates the shrunk mesh on import now (though it doesn't update the margin!)
+    # _, margin = shrink_mesh(mesh_vertices, mesh_faces)
+    # bound_xml.vertices_shrunk = [Vector(vert) - bound_xml.geometry_center for vert in shrunk_vertices]
+    margin = 0.0025 # set it to the minimum margin, though it should depend on the shrunk mesh
+
+    set_bound_centroid(bound_xml, centroid, radius_around_centroid)
+    set_bound_mass_properties(bound_xml, volume, cg, inertia)
+    bound_xml.margin = margin
+    return bound_xml
+
+
+def calculate_bvh_xml(bound_xml: BoundGeometryBVH) -> BoundGeometryBVH:
+    """Calculate the centroid and mass properties of ``bound_xml``. Doesn't access Blender data."""
+    from ..shared.geometry import get_centroid_of_mesh, get_mass_properties_of_mesh, grow_sphere
+
+    mesh_vertices, mesh_faces = get_bound_geometry_mesh_arrays(bound_xml)
+    primitives = [poly for poly in bound_xml.polygons if not isinstance(poly, PolyTriangle)]
+
+    centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
+    if len(mesh_faces) > 0:
+        # If we have a mesh, calculate the center of gravity from the mesh
+        _, cg, _ = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
+    else:
+        # Otherwise, approximate with the centroid
+        cg = centroid
+    # BVHs don't need to calculate the volume or inertia
+    volume = 1.0
+    inertia = Vector((1.0, 1.0, 1.0))
+    margin = 0.04  # BVHs always have this margin
+
+    # Grow radius_around_centroid to fit all primitives
+    for prim in primitives:
+        match prim:
+            case PolyBox():
+                # Calculate the opposite corners of the box. The corners stored in the vertices array are
+                # already inside the bounding sphere, but the opposite corners may not be.
+                v = mesh_vertices[[prim.v1, prim.v2, prim.v3, prim.v4]]
+                v0b = Vector((v[1] + v[2] + v[3] - v[0]) * 0.5)
+                v1b = Vector((v[0] + v[2] + v[3] - v[1]) * 0.5)
+                v2b = Vector((v[0] + v[1] + v[3] - v[2]) * 0.5)
+                v3b = Vector((v[0] + v[1] + v[2] - v[3]) * 0.5)
+                radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v0b, 0.0)
+                radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v1b, 0.0)
+                radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v2b, 0.0)
+                radius_around_centroid = grow_sphere(centroid, radius_around_centroid, v3b, 0.0)
+            case PolySphere():
+                # The sphere center vertex is inside the bounding sphere but the whole sphere may not be.
+                radius_around_centroid = grow_sphere(
+                    centroid, radius_around_centroid, Vector(mesh_vertices[prim.v]), prim.radius)
+            case PolyCapsule() | PolyCylinder():
+                # Capsules and cylinders are approximated by two spheres on their ends.
+                radius_around_centroid = grow_sphere(
+                    centroid, radius_around_centroid, Vector(mesh_vertices[prim.v1]), prim.radius)
+                radius_around_centroid = grow_sphere(
+                    centroid, radius_around_centroid, Vector(mesh_vertices[prim.v2]), prim.radius)
+            case _:
+                assert False, f"Unknown primitive type '{type(prim)}'"
+
     set_bound_centroid(bound_xml, centroid, radius_around_centroid)
     set_bound_mass_properties(bound_xml, volume, cg, inertia)
     bound_xml.margin = margin
@@ -421,6 +553,10 @@ def create_bound_xml_poly_shape(obj: bpy.types.Object, geom_xml: BoundGeometryBV
 
     transforms = get_bound_poly_transforms_to_apply(obj, geom_xml.composite_transform)
 
+    if is_batched_primitives_object(obj):
+        geom_xml.polygons.extend(create_batched_poly_xmls(obj, mesh, transforms, get_vert_index, get_mat_index))
+        return
+
     match obj.sollum_type:
         case SollumType.BOUND_POLY_TRIANGLE:
             triangles = create_poly_xml_triangles(mesh, transforms, get_vert_index, get_mat_index)
@@ -574,6 +710,37 @@ def create_poly_cylinder_capsule_xml(poly_type: Type[T_PolyCylCap], obj: bpy.typ
     return poly_xml
 
 
+def create_batched_poly_xmls(
+    obj: bpy.types.Object,
+    mesh: bpy.types.Mesh,
+    transforms: Matrix,
+    get_vert_index: Callable[[Vector], int],
+    get_mat_index: Callable[[bpy.types.Material], int]
+) -> list[PolyBox | PolySphere | PolyCapsule | PolyCylinder]:
+    """Create the bound polygons of all the primitives in a batched primitives object."""
+    polys = []
+    for points, radius, material_index in zip(*get_batched_primitives(obj, mesh, transforms)):
+        indices = [get_vert_index(Vector(point)) for point in points]
+
+        match obj.sollum_type:
+            case SollumType.BOUND_POLY_BOX:
+                poly_xml = PolyBox()
+                poly_xml.v1, poly_xml.v2, poly_xml.v3, poly_xml.v4 = indices
+            case SollumType.BOUND_POLY_SPHERE:
+                poly_xml = PolySphere()
+                poly_xml.v = indices[0]
+                poly_xml.radius = float(radius)
+            case SollumType.BOUND_POLY_CAPSULE | SollumType.BOUND_POLY_CYLINDER:
+                poly_xml = PolyCapsule() if obj.sollum_type == SollumType.BOUND_POLY_CAPSULE else PolyCylinder()
+                poly_xml.v1, poly_xml.v2 = indices
+                poly_xml.radius = float(radius)
+
+        poly_xml.material_index = get_mat_index(mesh.materials[material_index])
+        polys.append(poly_xml)
+
+    return polys
+
+
 def create_col_mat_xml(mat: bpy.types.Material):
     mat_xml = Material()
     set_col_mat_xml_properties(mat_xml, mat)
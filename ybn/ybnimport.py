@@ -21,7 +21,15 @@ from ..cwxml.bound import (
     Material as ColMaterial
 )
 from ..sollumz_properties import SollumType, SOLLUMZ_UI_NAMES
+from ..sollumz_preferences import get_import_settings
 from .collision_materials import create_collision_material_from_index
+from .primitivebatch import (
+    create_batched_primitives_mesh,
+    get_box_primitives_vertices,
+    get_capsule_primitives_vertices,
+    get_cylinder_primitives_vertices,
+    get_sphere_primitives_vertices,
+)
 from ..tools.meshhelper import (
     create_box,
     create_sphere,
@@ -169,7 +177,10 @@ def create_bvh_obj(bvh_xml: BoundGeometryBVH):
 
     materials = create_geometry_materials(bvh_xml)
 
-    create_bvh_polys(bvh_xml, materials, bvh_obj)
+    if get_import_settings().ybn_batch_bvh_primitives:
+        create_bvh_polys_batched(bvh_xml, materials, bvh_obj)
+    else:
+        create_bvh_polys(bvh_xml, materials, bvh_obj)
 
     triangles = get_poly_triangles(bvh_xml.polygons)
 
@@ -227,6 +238,43 @@ def create_bvh_polys(bvh: BoundGeometryBVH, materials: list[bpy.types.Material],
         poly_obj.parent = bvh_obj
 
 
+def create_bvh_polys_batched(bvh: BoundGeometryBVH, materials: list[bpy.types.Material], bvh_obj: bpy.types.Object):
+    """Create one object for each type of primitive polygon in ``bvh``, instead of one object per polygon."""
+    vertices = np.array(bvh.vertices, dtype=np.float64).reshape((-1, 3))
+
+    for sollum_type, poly_type in (
+        (SollumType.BOUND_POLY_BOX, PolyBox),
+        (SollumType.BOUND_POLY_SPHERE, PolySphere),
+        (SollumType.BOUND_POLY_CAPSULE, PolyCapsule),
+        (SollumType.BOUND_POLY_CYLINDER, PolyCylinder),
+    ):
+        polys = [poly for poly in bvh.polygons if type(poly) is poly_type]
+        if not polys:
+            continue
+
+        if poly_type is PolyBox:
+            matrices = np.array([get_poly_box_matrix(poly, bvh.vertices) for poly in polys], dtype=np.float64)
+            primitives_vertices = get_box_primitives_vertices(matrices)
+        else:
+            radii = np.array([poly.radius for poly in polys], dtype=np.float64)
+            if poly_type is PolySphere:
+                primitives_vertices = get_sphere_primitives_vertices(vertices[[poly.v for poly in polys]], radii)
+            else:
+                starts = vertices[[poly.v1 for poly in polys]]
+                ends = vertices[[poly.v2 for poly in polys]]
+                get_vertices = (
+                    get_capsule_primitives_vertices if poly_type is PolyCapsule else get_cylinder_primitives_vertices
+                )
+                primitives_vertices = get_vertices(starts, ends, radii)
+
+        material_indices = np.array([poly.material_index for poly in polys], dtype=np.int32)
+        mesh = create_batched_primitives_mesh(sollum_type, primitives_vertices, material_indices, materials)
+
+        poly_obj = create_blender_object(sollum_type, object_data=mesh)
+        poly_obj.location = bvh.geometry_center
+        poly_obj.parent = bvh_obj
+
+
 def init_poly_obj(poly, sollum_type, materials):
     name = SOLLUMZ_UI_NAMES[sollum_type]
     mesh = bpy.data.meshes.new(name)
@@ -241,7 +289,14 @@ def init_poly_obj(poly, sollum_type, materials):
 
 def create_poly_box(poly, materials, vertices):
     obj = init_poly_obj(poly, SollumType.BOUND_POLY_BOX, materials)
+    create_box(obj.data, size=1)
+    obj.matrix_basis = get_poly_box_matrix(poly, vertices)
+
+    return obj
+
 
+def get_poly_box_matrix(poly: PolyBox, vertices: list[Vector]) -> Matrix:
+    """Get the matrix that transforms a box of size 1 centered at the origin into ``poly``."""
     v1 = vertices[poly.v1]
     v2 = vertices[poly.v2]
     v3 = vertices[poly.v3]
@@ -306,10 +361,7 @@ def create_poly_box(poly, materials, vertices):
     mat[1] = edge1.y, edge2.y, edge3.y, center.y
     mat[2] = edge1.z, edge2.z, edge3.z, center.z
 
-    create_box(obj.data, size=1)
-    obj.matrix_basis = mat
-
-    return obj
+    return mat
 
 
 def create_poly_sphere(poly, materials, vertices):
@@ -374,7 +426,15 @@ def create_bound_mesh_data(
 
     verts, faces, colors = get_bound_geom_mesh_data(vertices, triangles, vertex_colors)
 
-    mesh.from_pydata(verts, [], faces)
+    num_faces = len(faces)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.astype(np.float32).ravel())
+    mesh.loops.add(num_faces * 3)
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+    mesh.polygons.add(num_faces)
+    # polygon sizes are derived from loop_start, loop_total is read-only since Blender 3.6
+    mesh.polygons.foreach_set("loop_start", np.arange(0, num_faces * 3, 3, dtype=np.int32))
+    mesh.update(calc_edges=True)
 
     if colors is not None:
         create_color_attr(mesh, 0, initial_values=colors)
@@ -390,37 +450,39 @@ def apply_bound_geom_materials(mesh: bpy.types.Mesh, triangles: list[PolyTriangl
     for mat in materials:
         mesh.materials.append(mat)
 
-    for i, poly_xml in enumerate(triangles):
-        mesh.polygons[i].material_index = poly_xml.material_index
+    mat_inds = np.fromiter((poly_xml.material_index for poly_xml in triangles), dtype=np.int32, count=len(triangles))
+    mesh.polygons.foreach_set("material_index", mat_inds)
 
 
 def get_bound_geom_mesh_data(
     vertices: list[Vector],
     triangles: list[PolyTriangle],
     vertex_colors: Optional[list[tuple[int, int, int, int]]]
-) -> tuple[list, list, Optional[NDArray]]:
-    def _color_to_float(color_int: tuple[int, int, int, int]):
-        return (color_int[0] / 255, color_int[1] / 255, color_int[2] / 255, color_int[3] / 255)
-
-    verts = []
-    verts_dict = {}
-    faces = []
-    colors = [] if vertex_colors else None
-
-    for poly in triangles:
-        face = []
-        for v in [vertices[poly.v1], vertices[poly.v2], vertices[poly.v3]]:
-            v_tuple = tuple(v)
-            if v_tuple not in verts_dict:
-                verts_dict[v_tuple] = len(verts)
-                verts.append(v)
-            face.append(verts_dict[v_tuple])
-        faces.append(face)
-
-        if colors is not None:
-            colors.extend(_color_to_float(vertex_colors[v]) for v in [poly.v1, poly.v2, poly.v3])
-
-    return verts, faces, np.array(colors, dtype=np.float64) if colors is not None else None
+) -> tuple[NDArray[np.float64], NDArray[np.int32], Optional[NDArray[np.float64]]]:
+    """Get the vertex positions, faces and face corner colors of the mesh made of ``triangles``. Vertices not used by
+    any triangle are removed and vertices with the same position are merged, in order of first use.
+    """
+    tri_inds = np.fromiter(
+        (v for poly in triangles for v in (poly.v1, poly.v2, poly.v3)), dtype=np.int64, count=len(triangles) * 3
+    )
+    # + 0.0 to treat -0.0 and 0.0 as the same position
+    positions = np.array(vertices, dtype=np.float64).reshape((-1, 3))[tri_inds] + 0.0
+
+    _, first_use, inverse = np.unique(positions, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    # np.unique sorts the positions, restore the order in which the vertices are first used by the triangles
+    order = np.argsort(first_use)
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+
+    verts = positions[first_use[order]]
+    faces = new_index[inverse].reshape((-1, 3)).astype(np.int32)
+
+    colors = None
+    if vertex_colors:
+        colors = np.array(vertex_colors, dtype=np.float64).reshape((-1, 4))[tri_inds] / 255
+
+    return verts, faces, colors
 
 
 def set_bound_child_properties(bound_xml: BoundChild, bound_obj: bpy.types.Object):
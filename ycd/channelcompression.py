@@ -0,0 +1,356 @@
+"""
+Error-bounded compression of animation channels. Each track component is stored with the channel encoding that
+takes the least space while keeping every frame within the user-specified maximum error.
+
+Channel sizes are estimates of the space used in the binary format, used to compare encodings and report the
+compression results. The actual size is determined when the XML is converted to the binary format.
+"""
+import numpy as np
+from numpy.typing import NDArray
+from mathutils import Vector, Quaternion
+from ..cwxml import clipdictionary as ycdxml
+from ..tools.animationhelper import TrackFormat
+
+# Max number of quantized values, same limit used in `get_quantum_and_min_val`
+QUANTIZE_MAX_STEPS = 1048576
+
+# Sizes in bits of the channel data, excluding the values
+CHANNEL_TYPE_BITS = 32
+STATIC_FLOAT_BITS = 32
+QUANTIZE_HEADER_BITS = 3 * 32  # quantum, offset and bits per value
+INDIRECT_QUANTIZE_HEADER_BITS = 4 * 32  # quantum, offset, bits per value and bits per frame index
+LINEAR_FLOAT_HEADER_BITS = 4 * 32  # num ints, counts, quantum and offset
+CACHED_QUATERNION_BITS = 32  # quat index
+
+# Components of the quaternion stored in the channels, frames data is in WXYZ order but channels are in XYZW order
+QUATERNION_CHANNELS_COMPONENTS = (1, 2, 3, 0)
+
+# Don't cache quaternion components too close to zero, the reconstructed value is too sensitive to errors in the
+# other components
+CACHED_QUATERNION_MIN_COMPONENT = 0.1
+
+
+def get_bits_needed(max_value: int) -> int:
+    """Gets the bits needed to store unsigned integers up to ``max_value``."""
+    return max(int(max_value), 0).bit_length()
+
+
+def get_channel_size(channel: ycdxml.ChannelsList.Channel) -> int:
+    """Gets the estimated size in bits of ``channel``."""
+    bits = CHANNEL_TYPE_BITS
+    if isinstance(channel, ycdxml.ChannelsList.StaticQuaternion):
+        bits += 4 * 32
+    elif isinstance(channel, ycdxml.ChannelsList.StaticVector3):
+        bits += 3 * 32
+    elif isinstance(channel, ycdxml.ChannelsList.StaticFloat):
+        bits += STATIC_FLOAT_BITS
+    elif isinstance(channel, ycdxml.ChannelsList.RawFloat):
+        bits += 32 * len(channel.values)
+    elif isinstance(channel, (ycdxml.ChannelsList.CachedQuaternion1, ycdxml.ChannelsList.CachedQuaternion2)):
+        bits += CACHED_QUATERNION_BITS
+    elif isinstance(channel, ycdxml.ChannelsList.LinearFloat):
+        bits += LINEAR_FLOAT_HEADER_BITS + 32 * len(channel.data)
+    elif isinstance(channel, ycdxml.ChannelsList.QuantizeFloat):
+        values = np.array(channel.values, dtype=np.float64)
+        quantized = _get_quantized_ints(values, channel.quantum, channel.offset)
+        if isinstance(channel, ycdxml.ChannelsList.IndirectQuantizeFloat):
+            bits += INDIRECT_QUANTIZE_HEADER_BITS
+            bits += len(values) * get_bits_needed(quantized.max(initial=0))
+            bits += len(channel.frames) * get_bits_needed(len(values) - 1)
+        else:
+            bits += QUANTIZE_HEADER_BITS + len(values) * get_bits_needed(quantized.max(initial=0))
+
+    return bits
+
+
+def get_sequence_data_size(sequence_data: ycdxml.Animation.SequenceDataList.SequenceData) -> int:
+    """Gets the estimated size in bits of all channels in ``sequence_data``."""
+    return sum(get_channel_size(channel) for channel in sequence_data.channels)
+
+
+def _get_quantized_ints(values: NDArray[np.float64], quantum: float, offset: float) -> NDArray[np.int64]:
+    if quantum <= 0.0:
+        return np.zeros(len(values), dtype=np.int64)
+
+    return np.rint((values - offset) / quantum).astype(np.int64)
+
+
+def _get_quantum(values: NDArray[np.float64], max_error: float) -> float:
+    """Gets the quantum that keeps the rounding error within ``max_error``, limited by the max number of steps."""
+    range_value = float(values.max() - values.min())
+    return max(2.0 * max_error, range_value / QUANTIZE_MAX_STEPS)
+
+
+def fit_piecewise_linear(values: NDArray[np.float64], max_error: float) -> NDArray[np.float64]:
+    """Approximates ``values`` with a continuous piecewise-linear function within ``max_error`` of every value, using
+    as few segments as the greedy swing door algorithm finds. Returns the approximated values.
+    """
+    num_values = len(values)
+    fitted = np.empty(num_values, dtype=np.float64)
+    if num_values == 0:
+        return fitted
+
+    values_list = values.tolist()
+    anchor_frame = 0
+    anchor_value = values_list[0]
+    fitted[0] = anchor_value
+    min_slope = -np.inf
+    max_slope = np.inf
+    frame = 1
+    while frame < num_values:
+        dist = frame - anchor_frame
+        value = values_list[frame]
+        new_min_slope = max(min_slope, (value - max_error - anchor_value) / dist)
+        new_max_slope = min(max_slope, (value + max_error - anchor_value) / dist)
+        if new_min_slope <= new_max_slope:
+            min_slope, max_slope = new_min_slope, new_max_slope
+            frame += 1
+            continue
+
+        # this frame can't be reached by the current segment, end it on the previous frame
+        slope = (min_slope + max_slope) * 0.5
+        end_frame = frame - 1
+        segment_frames = np.arange(anchor_frame + 1, end_frame + 1)
+        fitted[anchor_frame + 1:end_frame + 1] = anchor_value + slope * (segment_frames - anchor_frame)
+        anchor_frame = end_frame
+        anchor_value = fitted[end_frame]
+        min_slope = -np.inf
+        max_slope = np.inf
+
+    if anchor_frame < num_values - 1:
+        slope = 0.0 if np.isinf(min_slope) else (min_slope + max_slope) * 0.5
+        segment_frames = np.arange(anchor_frame + 1, num_values)
+        fitted[anchor_frame + 1:] = anchor_value + slope * (segment_frames - anchor_frame)
+
+    return fitted
+
+
+def _write_bits(bits: NDArray[np.uint8], positions: NDArray[np.int64], values: NDArray[np.int64], num_bits: int):
+    for i in range(num_bits):
+        bits[positions + i] = (values >> i) & 1
+
+
+def encode_linear_float_data(quantized: NDArray[np.int64]) -> tuple[list[int], int]:
+    """Encodes the non-negative ``quantized`` values of a LinearFloat channel, in the layout decoded by
+    ``decode_linear_float_data``. Returns the packed data and the counts.
+    """
+    chunk_size = ycdxml.LINEAR_FLOAT_CHUNK_SIZE
+    num_frames = len(quantized)
+    num_chunks = (num_frames + chunk_size - 1) // chunk_size
+
+    # change of the increment for each frame that is not the first of its chunk
+    frame_ids = np.arange(1, num_frames)
+    increments = np.diff(quantized)
+    prev_increments = np.concatenate(([0], increments))[:-1]
+    prev_increments[(frame_ids - 1) % chunk_size == 0] = 0
+    is_delta_frame = frame_ids % chunk_size != 0
+    deltas = (increments - prev_increments)[is_delta_frame]
+    delta_chunks = frame_ids[is_delta_frame] // chunk_size
+
+    # use the number of low bits that makes the delta stream smallest
+    magnitudes = np.abs(deltas)
+    best_size = None
+    for num_low_bits in range(get_bits_needed(magnitudes.max(initial=0)) + 1):
+        size = int(np.sum(num_low_bits + (magnitudes >> num_low_bits) + 1 + (magnitudes != 0)))
+        if best_size is None or size < best_size:
+            best_size = size
+            delta_low_bits = num_low_bits
+    high_magnitudes = magnitudes >> delta_low_bits
+    delta_sizes = delta_low_bits + high_magnitudes + 1 + (magnitudes != 0)
+
+    chunk_sizes = np.bincount(delta_chunks, weights=delta_sizes, minlength=num_chunks).astype(np.int64)
+    chunk_offsets = np.cumsum(chunk_sizes) - chunk_sizes
+    chunk_values = quantized[::chunk_size]
+    offset_bits = get_bits_needed(chunk_offsets.max(initial=0))
+    value_bits = get_bits_needed(chunk_values.max(initial=0))
+
+    values_start = num_chunks * offset_bits
+    deltas_start = values_start + num_chunks * value_bits
+    num_bits = deltas_start + int(delta_sizes.sum())
+    # at least one integer, so the data is never empty
+    num_ints = max((num_bits + 31) // 32, 1)
+    bits = np.zeros(num_ints * 32, dtype=np.uint8)
+
+    chunk_ids = np.arange(num_chunks)
+    _write_bits(bits, chunk_ids * offset_bits, chunk_offsets, offset_bits)
+    _write_bits(bits, values_start + chunk_ids * value_bits, chunk_values, value_bits)
+
+    delta_starts = deltas_start + np.cumsum(delta_sizes) - delta_sizes
+    _write_bits(bits, delta_starts, magnitudes, delta_low_bits)
+    unary_starts = delta_starts + delta_low_bits
+    num_ones = int(high_magnitudes.sum())
+    first_ones = np.cumsum(high_magnitudes) - high_magnitudes
+    bits[np.repeat(unary_starts - first_ones, high_magnitudes) + np.arange(num_ones)] = 1
+    signed = deltas != 0
+    bits[(unary_starts + high_magnitudes + 1)[signed]] = deltas[signed] < 0
+
+    data = np.packbits(bits, bitorder="little").view("<u4").tolist()
+    counts = offset_bits | (value_bits << 8) | (delta_low_bits << 16)
+    return data, counts
+
+
+def build_linear_float_channel(
+    values: NDArray[np.float64],
+    max_error: float
+) -> tuple[ycdxml.ChannelsList.LinearFloat, NDArray[np.float64]]:
+    """Builds a LinearFloat channel that stores ``values`` within ``max_error``. The values are approximated by straight
+    lines, which only need a few bits per frame in the delta stream. Returns the channel and the values decoded from it.
+    """
+    # half of the error for the linear approximation and the other half for the quantization
+    fitted = fit_piecewise_linear(values, max_error * 0.5)
+    # quantum and offset are written as 32-bit floats, the offset can't be above the min value or the quantized
+    # values could be negative
+    quantum = float(np.float32(_get_quantum(fitted, max_error * 0.5)))
+    offset = np.float32(fitted.min())
+    if offset > fitted.min():
+        offset = np.nextafter(offset, np.float32(-np.inf))
+    offset = float(offset)
+    quantized = _get_quantized_ints(fitted, quantum, offset)
+    decoded = offset + quantized * quantum
+
+    channel = ycdxml.ChannelsList.LinearFloat()
+    channel.offset = offset
+    channel.quantum = quantum
+    # decoded values are also written, for tools that only read them
+    channel.values = decoded.tolist()
+    channel.data, channel.counts = encode_linear_float_data(quantized)
+    channel.numints = len(channel.data)
+    return channel, decoded
+
+
+def _build_quantize_channel(
+    values: NDArray[np.float64],
+    max_error: float,
+    channel_type: type[ycdxml.ChannelsList.QuantizeFloat]
+) -> tuple[ycdxml.ChannelsList.QuantizeFloat, NDArray[np.float64]]:
+    quantum = _get_quantum(values, max_error)
+    offset = float(values.min())
+    quantized = _get_quantized_ints(values, quantum, offset)
+    decoded = offset + quantized * quantum
+
+    channel = channel_type()
+    channel.offset = offset
+    channel.quantum = quantum
+    if channel_type == ycdxml.ChannelsList.IndirectQuantizeFloat:
+        uniq_quantized, frames = np.unique(quantized, return_inverse=True)
+        channel.values = (offset + uniq_quantized * quantum).tolist()
+        channel.frames = frames.ravel().tolist()
+    else:
+        channel.values = decoded.tolist()
+
+    return channel, decoded
+
+
+def _build_raw_channel(values: NDArray[np.float64]) -> tuple[ycdxml.ChannelsList.RawFloat, NDArray[np.float64]]:
+    decoded = values.astype(np.float32).astype(np.float64)
+
+    channel = ycdxml.ChannelsList.RawFloat()
+    channel.values = decoded.tolist()
+    return channel, decoded
+
+
+def compress_values_channel(
+    values: NDArray[np.float32],
+    max_error: float
+) -> tuple[ycdxml.ChannelsList.Channel, NDArray[np.float64]]:
+    """Builds the smallest channel that stores ``values`` within ``max_error``. Returns the channel and the values
+    decoded from it.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    min_value = values.min()
+    max_value = values.max()
+    static_value = float(np.float32((min_value + max_value) * 0.5))
+    if max(max_value - static_value, static_value - min_value) <= max_error:
+        channel = ycdxml.ChannelsList.StaticFloat()
+        channel.value = static_value
+        return channel, np.full(len(values), static_value)
+
+    candidates = [
+        _build_quantize_channel(values, max_error, ycdxml.ChannelsList.QuantizeFloat),
+        _build_quantize_channel(values, max_error, ycdxml.ChannelsList.IndirectQuantizeFloat),
+        build_linear_float_channel(values, max_error),
+    ]
+    # the quantum is limited by the max number of steps, so very small errors can't always be met
+    candidates = [c for c in candidates if np.abs(c[1] - values).max() <= max_error]
+    if not candidates:
+        return _build_raw_channel(values)
+
+    return min(candidates, key=lambda c: get_channel_size(c[0]))
+
+
+def _compress_quaternion_cached(
+    frames_data: NDArray[np.float64],
+    max_error: float
+) -> list[ycdxml.ChannelsList.Channel] | None:
+    """Stores three components of the quaternions and reconstructs the fourth one from them. Returns ``None`` if no
+    component can be reconstructed within ``max_error``.
+    """
+    xyzw = frames_data[:, QUATERNION_CHANNELS_COMPONENTS]
+    # the reconstructed component is always positive, so it needs to have the same sign in all frames to be able
+    # to flip the whole track without breaking the continuity between frames
+    same_sign = np.all(xyzw > 0.0, axis=0) | np.all(xyzw < 0.0, axis=0)
+    min_magnitudes = np.where(same_sign, np.abs(xyzw).min(axis=0), 0.0)
+    quat_index = int(np.argmax(min_magnitudes))
+    if min_magnitudes[quat_index] < CACHED_QUATERNION_MIN_COMPONENT:
+        return None
+
+    if xyzw[0, quat_index] < 0.0:
+        xyzw = -xyzw
+
+    stored_components = [i for i in range(4) if i != quat_index]
+    # errors in the stored components are amplified in the reconstructed one, try with tighter errors before
+    # giving up
+    for error_scale in (1.0, 0.25):
+        channels = []
+        decoded = np.empty((len(xyzw), 3), dtype=np.float64)
+        for i, comp_index in enumerate(stored_components):
+            channel, decoded[:, i] = compress_values_channel(xyzw[:, comp_index], max_error * error_scale)
+            channels.append(channel)
+
+        reconstructed = np.sqrt(np.maximum(1.0 - np.einsum("ij,ij->i", decoded, decoded), 0.0))
+        if np.abs(reconstructed - xyzw[:, quat_index]).max() <= max_error:
+            cached_channel = ycdxml.ChannelsList.CachedQuaternion1()
+            cached_channel.quat_index = quat_index
+            channels.append(cached_channel)
+            return channels
+
+    return None
+
+
+def compress_track_channels(
+    track_format: TrackFormat,
+    frames_data: NDArray[np.float32],
+    max_error: float
+) -> list[ycdxml.ChannelsList.Channel]:
+    """Builds the channels of a track with the smallest encoding that keeps all frames within ``max_error``.
+    ``frames_data`` is a (frames, components) array, in WXYZ order for quaternions.
+    """
+    frames_data = np.asarray(frames_data, dtype=np.float64).reshape((len(frames_data), -1))
+
+    if track_format == TrackFormat.Quaternion:
+        components = QUATERNION_CHANNELS_COMPONENTS
+    else:
+        components = tuple(range(frames_data.shape[1]))
+
+    channels = [compress_values_channel(frames_data[:, comp_index], max_error)[0] for comp_index in components]
+    all_static = all(isinstance(channel, ycdxml.ChannelsList.StaticFloat) for channel in channels)
+
+    if all_static and track_format == TrackFormat.Vector3:
+        channel = ycdxml.ChannelsList.StaticVector3()
+        channel.value = Vector([c.value for c in channels])
+        return [channel]
+
+    if track_format == TrackFormat.Quaternion:
+        if all_static:
+            x, y, z, w = (c.value for c in channels)
+            channel = ycdxml.ChannelsList.StaticQuaternion()
+            channel.value = Quaternion((w, x, y, z))
+            return [channel]
+
+        cached_channels = _compress_quaternion_cached(frames_data, max_error)
+        if cached_channels is not None:
+            cached_size = sum(get_channel_size(c) for c in cached_channels)
+            if cached_size < sum(get_channel_size(c) for c in channels):
+                return cached_channels
+
+    return channels
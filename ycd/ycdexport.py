@@ -2,6 +2,9 @@ import bpy
 from mathutils import Vector, Quaternion
 import math
 import struct
+from typing import Optional
+import numpy as np
+from numpy.typing import NDArray
 from ..cwxml import clipdictionary as ycdxml
 from ..sollumz_properties import SollumType
 from ..tools import jenkhash
@@ -18,8 +21,14 @@ from ..tools.animationhelper import (
     get_action_duration_frames,
     get_action_duration_secs,
     get_action_export_frame_count,
+    get_action_export_frames,
+    sample_fcurve,
+    quaternion_multiply_array,
+    make_quaternions_continuous,
 )
 from .properties import ClipAttribute, ClipTag, calculate_final_uv_transform_matrix
+from .channelcompression import compress_track_channels, get_sequence_data_size
+from ..sollumz_preferences import get_export_settings
 
 from .. import logger
 
@@ -42,19 +51,28 @@ def parse_uv_transform_data_path(data_path: str) -> tuple[int, str]:
     return index, prop
 
 
-TrackFramesData = list[Vector] | list[Quaternion] | list[float]
+TrackFramesData = NDArray[np.float32]  # (frames, components) array, WXYZ order for quaternions
 SequenceItems = dict[int, dict[Track, TrackFramesData]]
 
+# TODO: defaults should be kept in-sync with the properties defaults in AnimationTracks, refactor this
+#  once we add more defaults to avoid duplication
+TrackDefaultValueMap = {
+    Track.UV0: (1.0, 0.0, 0.0),
+    Track.UV1: (0.0, 1.0, 0.0),
+}
+TrackFormatDefaultValueMap = {
+    TrackFormat.Vector3: (0.0, 0.0, 0.0),
+    TrackFormat.Quaternion: (1.0, 0.0, 0.0, 0.0),
+    TrackFormat.Float: (0.0,),
+}
+
 
 def sequence_items_from_action(
         action: bpy.types.Action,
         target_id: bpy.types.ID
 ) -> SequenceItems:
-    action_frame_range = action.frame_range
-    export_frame_count = get_action_export_frame_count(action)
-    def _export_frame_to_action_frame(frame_index: int) -> float:
-        export_last_frame_index = export_frame_count - 1
-        return action_frame_range[0] + (frame_index / export_last_frame_index) * (action_frame_range[1] - action_frame_range[0])
+    export_frames = get_action_export_frames(action)
+    export_frame_count = len(export_frames)
 
     target = get_target_from_id(target_id)
     target_is_armature = isinstance(target_id, bpy.types.Armature)
@@ -83,8 +101,8 @@ def sequence_items_from_action(
             uv_transforms_fcurves[bone_id].append(fcurve)
             continue  # UV transforms are handled later
 
-        comp_index = fcurve.array_index
         track_format = TrackFormatMap[track]
+        comp_index = 0 if track_format == TrackFormat.Float else fcurve.array_index
 
         if bone_id not in sequence_items:
             sequence_items[bone_id] = {}
@@ -92,28 +110,10 @@ def sequence_items_from_action(
         bone_sequences = sequence_items[bone_id]
 
         if track not in bone_sequences:
-            if track_format == TrackFormat.Vector3:
-                # TODO: defaults should be kept in-sync with the properties defaults in AnimationTracks, refactor this
-                #  once we add more defaults to avoid duplication
-                if track == Track.UV0:
-                    default_vec = (1.0, 0.0, 0.0)
-                elif track == Track.UV1:
-                    default_vec = (0.0, 1.0, 0.0)
-                else:
-                    default_vec = (0.0, 0.0, 0.0)
-                bone_sequences[track] = [Vector(default_vec) for _ in range(export_frame_count)]
-            elif track_format == TrackFormat.Quaternion:
-                bone_sequences[track] = [Quaternion((1.0, 0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            elif track_format == TrackFormat.Float:
-                bone_sequences[track] = [0.0] * export_frame_count
-
-        track_sequence = bone_sequences[track]
-        for frame_id in range(export_frame_count):
-            value = fcurve.evaluate(_export_frame_to_action_frame(frame_id))
-            if track_format == TrackFormat.Float:
-                track_sequence[frame_id] = value
-            else:
-                track_sequence[frame_id][comp_index] = value
+            default_value = TrackDefaultValueMap.get(track, TrackFormatDefaultValueMap[track_format])
+            bone_sequences[track] = np.tile(np.array(default_value, dtype=np.float64), (export_frame_count, 1))
+
+        bone_sequences[track][:, comp_index] = sample_fcurve(fcurve, export_frames)
 
     if target_is_armature:
         # transform bones from pose space to local space
@@ -121,25 +121,25 @@ def sequence_items_from_action(
             transform_mat = calculate_bone_space_transform_matrix(bone_map.get(bone_id, None), None)
 
             if Track.BonePosition in bone_sequences:
+                mat = np.array(transform_mat)
                 vecs = bone_sequences[Track.BonePosition]
-                for i in range(export_frame_count):
-                    vecs[i] = transform_mat @ vecs[i]
+                bone_sequences[Track.BonePosition] = vecs @ mat[:3, :3].T + mat[:3, 3]
 
             if Track.BoneRotation in bone_sequences:
+                # same as Quaternion.rotate(transform_mat) on each frame
+                rotation = np.array(transform_mat.to_quaternion())
                 quats = bone_sequences[Track.BoneRotation]
-                for i in range(export_frame_count):
-                    quats[i].rotate(transform_mat)
+                bone_sequences[Track.BoneRotation] = quaternion_multiply_array(rotation, quats)
 
     if target_is_camera:
         # see animationhelper.transform_camera_rotation_quaternion
-        angle_delta = math.radians(-90.0)
-        x_axis = Vector((1.0, 0.0, 0.0))
+        # rotating around the local X axis, Quaternion(q @ x_axis, angle) @ q, is the same as
+        # q @ Quaternion(x_axis, angle)
+        rotation = np.array(Quaternion(Vector((1.0, 0.0, 0.0)), math.radians(-90.0)))
         for bone_id, bone_sequences in sequence_items.items():
             if Track.CameraRotation in bone_sequences:
                 quats = bone_sequences[Track.CameraRotation]
-                for i in range(export_frame_count):
-                    x_axis_local = quats[i] @ x_axis
-                    quats[i].rotate(Quaternion(x_axis_local, angle_delta))
+                bone_sequences[Track.CameraRotation] = quaternion_multiply_array(quats, rotation)
 
     if target_id is not None and len(uv_transforms_fcurves) > 0:
         # copy the UV transforms defined by the user to apply f-curves on them without modifying the original ones
@@ -156,31 +156,29 @@ def sequence_items_from_action(
 
             bone_sequences = sequence_items[bone_id]
 
+            fcurves_targets = [(*parse_uv_transform_data_path(fcurve.data_path), fcurve.array_index)
+                               for fcurve in fcurves]
+            fcurves_values = [sample_fcurve(fcurve, export_frames).tolist() for fcurve in fcurves]
+
             # compute uv0/uv1 from uv_transform
-            bone_sequences[Track.UV0] = [Vector((0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            bone_sequences[Track.UV1] = [Vector((0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            uv0_sequence = bone_sequences[Track.UV0]
-            uv1_sequence = bone_sequences[Track.UV1]
+            uv0_sequence = np.zeros((export_frame_count, 3), dtype=np.float64)
+            uv1_sequence = np.zeros((export_frame_count, 3), dtype=np.float64)
             for frame_id in range(export_frame_count):
                 # apply f-curves to UV transforms
-                for fcurve in fcurves:
-                    value = fcurve.evaluate(_export_frame_to_action_frame(frame_id))
-                    transform_index, prop_name = parse_uv_transform_data_path(fcurve.data_path)
-
+                for (transform_index, prop_name, comp_index), values in zip(fcurves_targets, fcurves_values):
+                    value = values[frame_id]
                     prop = getattr(uv_transforms[transform_index], prop_name)
                     if isinstance(prop, float):
                         setattr(uv_transforms[transform_index], prop_name, value)
                     else:  # Vector
-                        comp_index = fcurve.array_index
                         prop[comp_index] = value
 
                 mat = calculate_final_uv_transform_matrix(uv_transforms)
-                uv0_sequence[frame_id][0] = mat[0][0]
-                uv0_sequence[frame_id][1] = mat[0][1]
-                uv0_sequence[frame_id][2] = mat[0][2]
-                uv1_sequence[frame_id][0] = mat[1][0]
-                uv1_sequence[frame_id][1] = mat[1][1]
-                uv1_sequence[frame_id][2] = mat[1][2]
+                uv0_sequence[frame_id] = mat[0]
+                uv1_sequence[frame_id] = mat[1]
+
+            bone_sequences[Track.UV0] = uv0_sequence
+            bone_sequences[Track.UV1] = uv1_sequence
 
         uv_transforms.clear()
 
@@ -207,48 +205,55 @@ def sequence_items_from_action(
     quaternion_tracks = list(map(lambda kvp: kvp[0],
                                  filter(lambda kvp: kvp[1] == TrackFormat.Quaternion,
                                         TrackFormatMap.items())))
+    rotated_tracks = (Track.BoneRotation,) if target_is_armature else ()
+    rotated_tracks += (Track.CameraRotation,) if target_is_camera else ()
     for bone_id, bone_sequences in sequence_items.items():
         for track in quaternion_tracks:
             quats = bone_sequences.get(track, None)
             if quats is None:
                 continue
 
-            for i in range(1, export_frame_count):
-                if quats[i - 1].dot(quats[i]) < 0:
-                    quats[i] *= -1
+            if track in rotated_tracks:
+                # Quaternion.rotate returns quaternions with non-negative W, keep the same starting sign
+                quats = np.where(quats[:, :1] < 0.0, -quats, quats)
+
+            bone_sequences[track] = make_quaternions_continuous(quats)
     # WARNING: ANY OPERATION WITH ROTATION WILL CAUSE SIGN CHANGE. PROCEED ANYTHING BEFORE FIX.
 
+    # values are exported as 32-bit floats
+    for bone_sequences in sequence_items.values():
+        for track, frames_data in bone_sequences.items():
+            bone_sequences[track] = frames_data.astype(np.float32)
+
     return sequence_items
 
 
 def build_values_channel(
-    values: list[float],
-    uniq_values: list[float],
+    values: NDArray[np.float32],
     indirect_percentage: float = 0.1
 ) -> ycdxml.ChannelsList.Channel:
+    uniq_values, uniq_indices = np.unique(values, return_inverse=True)
     values_len_percentage = len(uniq_values) / len(values)
 
     if len(uniq_values) == 1:
         channel = ycdxml.ChannelsList.StaticFloat()
 
-        channel.value = uniq_values[0]
+        channel.value = float(uniq_values[0])
     elif values_len_percentage <= indirect_percentage:
         channel = ycdxml.ChannelsList.IndirectQuantizeFloat()
 
         min_value, quantum = get_quantum_and_min_val(uniq_values)
 
-        channel.values = uniq_values
+        channel.values = uniq_values.tolist()
         channel.offset = min_value
         channel.quantum = quantum
-
-        for value in values:
-            channel.frames.append(uniq_values.index(value))
+        channel.frames = uniq_indices.ravel().tolist()
     else:
         channel = ycdxml.ChannelsList.QuantizeFloat()
 
         min_value, quantum = get_quantum_and_min_val(values)
 
-        channel.values = values
+        channel.values = values.tolist()
         channel.offset = min_value
         channel.quantum = quantum
 
@@ -260,82 +265,78 @@ def build_values_channel(
     return channel
 
 
+# Order in which each component is stored in the channels, the frames data stores quaternions in WXYZ order
+TrackFormatChannelComponentsMap = {
+    TrackFormat.Vector3: (0, 1, 2),
+    TrackFormat.Quaternion: (1, 2, 3, 0),
+    TrackFormat.Float: (0,),
+}
+
+
 def sequence_data_from_frames_data(
     track: Track,
-    frames_data: TrackFramesData
+    frames_data: TrackFramesData,
+    max_error: Optional[float] = None
 ) -> ycdxml.Animation.SequenceDataList.SequenceData:
+    """Builds the channels of the track. If ``max_error`` is given, the channels are compressed keeping the values
+    within that error, otherwise the values are stored as they are.
+    """
     sequence_data = ycdxml.Animation.SequenceDataList.SequenceData()
 
     track_format = TrackFormatMap[track]
+    frames_data = np.asarray(frames_data, dtype=np.float32).reshape((len(frames_data), -1))
+    if max_error is not None:
+        for channel in compress_track_channels(track_format, frames_data, max_error):
+            sequence_data.channels.append(channel)
+        return sequence_data
+
+    is_static = bool(np.all(frames_data == frames_data[0]))
 
-    if track_format == TrackFormat.Vector3:
-        values_x = []
-        values_y = []
-        values_z = []
+    if is_static and track_format == TrackFormat.Vector3:
+        channel = ycdxml.ChannelsList.StaticVector3()
+        channel.value = Vector(frames_data[0].tolist())
 
-        for vector in frames_data:
-            values_x.append(vector.x)
-            values_y.append(vector.y)
-            values_z.append(vector.z)
+        sequence_data.channels.append(channel)
+    elif is_static and track_format == TrackFormat.Quaternion:
+        channel = ycdxml.ChannelsList.StaticQuaternion()
+        channel.value = Quaternion(frames_data[0].tolist())
 
-        uniq_x = list(set(values_x))
-        len_uniq_x = len(uniq_x)
+        sequence_data.channels.append(channel)
+    else:
+        for comp_index in TrackFormatChannelComponentsMap[track_format]:
+            sequence_data.channels.append(build_values_channel(frames_data[:, comp_index]))
 
-        uniq_y = list(set(values_y))
-        len_uniq_y = len(uniq_y)
+    return sequence_data
 
-        uniq_z = list(set(values_z))
-        len_uniq_z = len(uniq_z)
 
-        if len_uniq_x == 1 and len_uniq_y == 1 and len_uniq_z == 1:
-            channel = ycdxml.ChannelsList.StaticVector3()
-            channel.value = frames_data[0]
+def get_track_format_max_errors() -> Optional[dict[TrackFormat, float]]:
+    """Gets the max error allowed for each track format when compressing channels. Returns ``None`` if channel
+    compression is disabled.
+    """
+    export_settings = get_export_settings()
+    if not export_settings.ycd_compress_channels:
+        return None
 
-            sequence_data.channels.append(channel)
-        else:
-            sequence_data.channels.append(build_values_channel(values_x, uniq_x))
-            sequence_data.channels.append(build_values_channel(values_y, uniq_y))
-            sequence_data.channels.append(build_values_channel(values_z, uniq_z))
-    elif track_format == TrackFormat.Quaternion:
-        values_x = []
-        values_y = []
-        values_z = []
-        values_w = []
-
-        for quat in frames_data:
-            values_x.append(quat.x)
-            values_y.append(quat.y)
-            values_z.append(quat.z)
-            values_w.append(quat.w)
-
-        uniq_x = list(set(values_x))
-        len_uniq_x = len(uniq_x)
-
-        uniq_y = list(set(values_y))
-        len_uniq_y = len(uniq_y)
-
-        uniq_z = list(set(values_z))
-        len_uniq_z = len(uniq_z)
-
-        uniq_w = list(set(values_w))
-        len_uniq_w = len(uniq_w)
-
-        if len_uniq_x == 1 and len_uniq_y == 1 and len_uniq_z == 1 and len_uniq_w == 1:
-            channel = ycdxml.ChannelsList.StaticQuaternion()
-            channel.value = frames_data[0]
+    return {
+        TrackFormat.Vector3: export_settings.ycd_max_error_vector,
+        TrackFormat.Quaternion: export_settings.ycd_max_error_quaternion,
+        TrackFormat.Float: export_settings.ycd_max_error_float,
+    }
 
-            sequence_data.channels.append(channel)
-        else:
-            sequence_data.channels.append(build_values_channel(values_x, uniq_x))
-            sequence_data.channels.append(build_values_channel(values_y, uniq_y))
-            sequence_data.channels.append(build_values_channel(values_z, uniq_z))
-            sequence_data.channels.append(build_values_channel(values_w, uniq_w))
-    elif track_format == TrackFormat.Float:
-        values = frames_data
-        uniq = list(set(values))
-        sequence_data.channels.append(build_values_channel(values, uniq))
 
-    return sequence_data
+def get_sequence_frame_ranges(frame_count: int, sequence_frame_limit: int) -> list[tuple[int, int]]:
+    """Splits the animation frames in sequences of ``sequence_frame_limit`` frames, as (start, end) frame ranges.
+    Sequences include the first frame of the next sequence too, so the game can interpolate between the last frames
+    of one sequence without reading the next one. If ``sequence_frame_limit`` is 0, returns a single sequence with
+    all frames.
+    """
+    if sequence_frame_limit <= 0 or frame_count <= sequence_frame_limit:
+        return [(0, frame_count)]
+
+    # the importer picks the sequence of a frame with `frame // sequence_frame_limit`, so every frame needs a sequence
+    # starting on a multiple of the limit
+    return [(start, min(start + sequence_frame_limit + 1, frame_count))
+            for start in range(0, frame_count, sequence_frame_limit)]
 
 
 def animation_from_object(animation_obj: bpy.types.Object) -> ycdxml.Animation:
@@ -344,10 +345,11 @@ def animation_from_object(animation_obj: bpy.types.Object) -> ycdxml.Animation:
     animation_properties = animation_obj.animation_properties
     action = animation_properties.action
     export_frame_count = get_action_export_frame_count(action)
+    sequence_frame_limit = get_export_settings().ycd_sequence_frame_limit
 
     animation.hash = animation_properties.hash
     animation.frame_count = export_frame_count
-    animation.sequence_frame_limit = export_frame_count + 30
+    animation.sequence_frame_limit = sequence_frame_limit if sequence_frame_limit > 0 else export_frame_count + 30
     animation.duration = get_action_duration_secs(action)
     animation.unknown10 = AnimationFlag.Default
 
@@ -358,10 +360,6 @@ def animation_from_object(animation_obj: bpy.types.Object) -> ycdxml.Animation:
     target_id = animation_properties.target_id
     sequence_items = sequence_items_from_action(action, target_id)
 
-    sequence = ycdxml.Animation.SequenceList.Sequence()
-    sequence.frame_count = export_frame_count
-    sequence.hash = "hash_00000000"  # TODO: calculate signature
-
     sequence_datas = [(bone_id, track, frames_data)
                       for bone_id, bones_data in sequence_items.items()
                       for track, frames_data in bones_data.items()]
@@ -370,24 +368,61 @@ def animation_from_object(animation_obj: bpy.types.Object) -> ycdxml.Animation:
         if track == Track.MoverPosition or track == Track.MoverRotation:
             animation.unknown10 |= AnimationFlag.RootMotion
 
-        sequence_data = sequence_data_from_frames_data(track, frames_data)
-
         seq_bone_id = ycdxml.Animation.BoneIdList.BoneId()
         seq_bone_id.bone_id = bone_id
         seq_bone_id.track = track.value
         seq_bone_id.format = TrackFormatMap[track].value
         animation.bone_ids.append(seq_bone_id)
 
-        sequence.sequence_data.append(sequence_data)
-
-    animation.sequences.append(sequence)
-
     # Get int value from enum, a bit junky...
     animation.unknown10 = animation.unknown10.value
 
+    max_errors = get_track_format_max_errors()
+    channels_size = build_animation_sequences(animation, sequence_datas, sequence_frame_limit, max_errors)
+    if max_errors is not None:
+        log_animation_compression(animation, channels_size)
+
     return animation
 
 
+def build_animation_sequences(
+    animation: ycdxml.Animation,
+    sequence_datas: list[tuple[int, Track, TrackFramesData]],
+    sequence_frame_limit: int,
+    max_errors: Optional[dict[TrackFormat, float]]
+) -> int:
+    """Encodes the sampled tracks in the animation sequences. Returns the estimated size in bits of all its channels.
+    """
+    # each sequence is compressed independently, so channels can use a different encoding in each one
+    channels_size = 0
+    for start_frame, end_frame in get_sequence_frame_ranges(animation.frame_count, sequence_frame_limit):
+        sequence = ycdxml.Animation.SequenceList.Sequence()
+        sequence.frame_count = end_frame - start_frame
+        sequence.hash = "hash_00000000"  # TODO: calculate signature
+
+        for bone_id, track, frames_data in sequence_datas:
+            max_error = None if max_errors is None else max_errors[TrackFormatMap[track]]
+            sequence_data = sequence_data_from_frames_data(track, frames_data[start_frame:end_frame], max_error)
+            channels_size += get_sequence_data_size(sequence_data)
+
+            sequence.sequence_data.append(sequence_data)
+
+        animation.sequences.append(sequence)
+
+    return channels_size
+
+
+def log_animation_compression(animation: ycdxml.Animation, channels_size: int):
+    num_components = sum(3 if bone_id.format == TrackFormat.Vector3 else
+                         4 if bone_id.format == TrackFormat.Quaternion else 1
+                         for bone_id in animation.bone_ids)
+    raw_size = 32 * animation.frame_count * num_components
+    logger.info(
+        f"Animation '{animation.hash}' channels compressed to ~{(channels_size + 7) // 8} bytes "
+        f"(~{(raw_size + 7) // 8} bytes uncompressed)."
+    )
+
+
 def clip_attribute_to_xml(attr: ClipAttribute) -> ycdxml.AttributesList.Attribute:
     if attr.type == "Float":
         xml_attr = ycdxml.AttributesList.FloatAttribute()
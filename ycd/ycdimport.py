@@ -1,6 +1,7 @@
 import os
 import bpy
-from mathutils import Vector, Quaternion
+import numpy as np
+from numpy.typing import NDArray
 from ..cwxml import clipdictionary as ycdxml
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
 from ..tools.animationhelper import (
@@ -9,7 +10,7 @@ from ..tools.animationhelper import (
     TrackFormatMap,
     get_canonical_track_data_path,
     get_action_duration_frames,
-    get_scene_fps
+    get_scene_fps,
 )
 from ..tools.utils import color_hash
 
@@ -22,90 +23,61 @@ def create_anim_obj(sollum_type: SollumType) -> bpy.types.Object:
     return anim_obj
 
 
-ActionData = dict[int, dict[Track, list]]
+ActionData = dict[int, dict[Track, NDArray[np.float64]]]  # (frames, components) arrays, WXYZ order for quaternions
 
 
-def insert_action_data(action_data: ActionData, bone_id: int, track: Track, data):
-    if bone_id not in action_data:
-        action_data[bone_id] = {}
-
-    if track not in action_data[bone_id]:
-        action_data[bone_id][track] = []
-
-    action_data[bone_id][track].append(data)
-
-
-def get_values_from_sequence_data(sequence_data: ycdxml.Animation.SequenceDataList.SequenceData, frame_id: int) -> list:
+def get_values_from_sequence_data(
+    sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
+    frame_ids: NDArray[np.int64]
+) -> list[NDArray[np.float64]]:
     channel_values = []
 
-    for i in range(len(sequence_data.channels)):
-        while len(channel_values) <= i:
-            channel_values.append(None)
-
-        channel = sequence_data.channels[i]
-
-        if channel is not None:
-            channel_values[i] = channel.get_value(frame_id, channel_values)
+    for channel in sequence_data.channels:
+        channel_values.append(None if channel is None else channel.get_values(frame_ids, channel_values))
 
     return channel_values
 
 
 def get_vector3_from_sequence_data(
     sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
-    frame_id: int
-) -> Vector:
-    channel_values = get_values_from_sequence_data(sequence_data, frame_id)
+    frame_ids: NDArray[np.int64]
+) -> NDArray[np.float64]:
+    channel_values = get_values_from_sequence_data(sequence_data, frame_ids)
 
     if len(channel_values) == 1:
         location = channel_values[0]
     else:
-        location = Vector([
-            channel_values[0],
-            channel_values[1],
-            channel_values[2],
-        ])
+        location = np.stack(channel_values[:3], axis=-1)
 
     return location
 
 
 def get_quaternion_from_sequence_data(
     sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
-    frame_id: int
-) -> Quaternion:
-    channel_values = get_values_from_sequence_data(sequence_data, frame_id)
+    frame_ids: NDArray[np.int64]
+) -> NDArray[np.float64]:
+    channel_values = get_values_from_sequence_data(sequence_data, frame_ids)
 
     if len(channel_values) == 1:
-        rotation = channel_values[0]
-    else:
-        if len(sequence_data.channels) <= 4:
-            for channel in sequence_data.channels:
-                if channel.type == "CachedQuaternion1" or channel.type == "CachedQuaternion2":
-                    cached_value = channel.get_value(frame_id, channel_values)
-
-                    if channel.quat_index == 0:
-                        channel_values = [
-                            cached_value, channel_values[0], channel_values[1], channel_values[2]]
-                    elif channel.quat_index == 1:
-                        channel_values = [
-                            channel_values[0], cached_value, channel_values[1], channel_values[2]]
-                    elif channel.quat_index == 2:
-                        channel_values = [
-                            channel_values[0], channel_values[1], cached_value, channel_values[2]]
-                    elif channel.quat_index == 3:
-                        channel_values = [
-                            channel_values[0], channel_values[1], channel_values[2], cached_value]
-
-            if channel.type == "CachedQuaternion2":
-                rotation = Quaternion(
-                    (channel_values[0], channel_values[1], channel_values[2], channel_values[3]))
-            else:
-                rotation = Quaternion(
-                    (channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
+        return channel_values[0]
+
+    channels = sequence_data.channels
+    if len(channels) <= 4:
+        for channel in channels:
+            if channel.type == "CachedQuaternion1" or channel.type == "CachedQuaternion2":
+                cached_value = channel.get_values(frame_ids, channel_values)
+                quat_index = channel.quat_index
+                stored_values = channel_values[:3]
+                channel_values = stored_values[:quat_index] + [cached_value] + stored_values[quat_index:]
+
+        if channels[-1].type == "CachedQuaternion2":
+            rotation = (channel_values[0], channel_values[1], channel_values[2], channel_values[3])
         else:
-            rotation = Quaternion(
-                (channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
+            rotation = (channel_values[3], channel_values[0], channel_values[1], channel_values[2])
+    else:
+        rotation = (channel_values[3], channel_values[0], channel_values[1], channel_values[2])
 
-    return rotation
+    return np.stack(rotation, axis=-1)
 
 
 def combine_sequences_and_build_action_data(animation: ycdxml.Animation) -> ActionData:
@@ -115,36 +87,43 @@ def combine_sequences_and_build_action_data(animation: ycdxml.Animation) -> Acti
         sequence_frame_limit = animation.frame_count + 30
 
     action_data = {}
+    if len(animation.sequences) == 0:
+        return action_data
 
-    for frame_id in range(0, animation.frame_count):
-        sequence_index = int(frame_id / (sequence_frame_limit))
-        sequence_frame = frame_id % (sequence_frame_limit)
-
-        if sequence_index >= len(animation.sequences):
-            sequence_index = len(animation.sequences) - 1
+    frame_ids = np.arange(animation.frame_count)
+    sequence_indices = np.minimum(frame_ids // sequence_frame_limit, len(animation.sequences) - 1)
+    sequence_frame_ids = frame_ids % sequence_frame_limit
 
-        sequence = animation.sequences[sequence_index]
+    for sequence_index, sequence in enumerate(animation.sequences):
+        sequence_mask = sequence_indices == sequence_index
+        if not np.any(sequence_mask):
+            continue
 
+        sequence_frames = sequence_frame_ids[sequence_mask]
         for sequence_data_index, sequence_data in enumerate(sequence.sequence_data):
             bone_data = animation.bone_ids[sequence_data_index]
-            bone_id = bone_data.bone_id
-
             if bone_data is None:
                 continue
 
+            bone_id = bone_data.bone_id
             track = bone_data.track
             format = bone_data.format
             assert TrackFormatMap[track] == format, f"Track format mismatch: {TrackFormatMap[track]} != {format}"
 
             if format == TrackFormat.Vector3:
-                vec = get_vector3_from_sequence_data(sequence_data, sequence_frame)
-                insert_action_data(action_data, bone_id, track, vec)
+                values = get_vector3_from_sequence_data(sequence_data, sequence_frames)
             elif format == TrackFormat.Quaternion:
-                quat = get_quaternion_from_sequence_data(sequence_data, sequence_frame)
-                insert_action_data(action_data, bone_id, track, quat)
+                values = get_quaternion_from_sequence_data(sequence_data, sequence_frames)
             elif format == TrackFormat.Float:
-                value = get_values_from_sequence_data(sequence_data, sequence_frame)[0]
-                insert_action_data(action_data, bone_id, track, value)
+                values = get_values_from_sequence_data(sequence_data, sequence_frames)[0][:, None]
+            else:
+                continue
+
+            bone_action_data = action_data.setdefault(bone_id, {})
+            if track not in bone_action_data:
+                bone_action_data[track] = np.zeros((animation.frame_count, values.shape[1]), dtype=np.float64)
+
+            bone_action_data[track][sequence_mask] = values
 
     return action_data
 
@@ -154,80 +133,28 @@ def apply_action_data_to_action(action_data: ActionData, action: bpy.types.Actio
     # -1 because the anim finishes when it reaches the last frame
     unscaled_duration_secs = (frame_count - 1) / get_scene_fps()
     scale_factor = duration_secs / unscaled_duration_secs
-    scaled_frame_ids = [frame_id * scale_factor for frame_id in range(frame_count)]
+    scaled_frame_ids = np.arange(frame_count) * scale_factor
 
-    def _interleave_frame_ids(track_data: list[float]) -> list[float]:
-        """Converts [data0, data1, ..., dataN] to [frameId0, data0, frameId1, data1, ..., frameIdN, dataN]"""
-        assert len(track_data) == len(scaled_frame_ids)
-        return [value for co in zip(scaled_frame_ids, track_data) for value in co]
+    # [frameId0, data0, frameId1, data1, ..., frameIdN, dataN] buffer, the data column is filled for each F-curve
+    keyframes_co = np.empty((frame_count, 2), dtype=np.float32)
+    keyframes_co[:, 0] = scaled_frame_ids
 
     for bone_id, bones_data in action_data.items():
         group_item = action.groups.new(f"#{bone_id}")
         for track, frames_data in bones_data.items():
-            track_format = TrackFormatMap[track]
+            assert len(frames_data) == frame_count
             data_path = get_canonical_track_data_path(track, bone_id)
-            if track_format == TrackFormat.Vector3:
-                vec_tracks_x = list(map(lambda vec: vec.x, frames_data))
-                vec_tracks_y = list(map(lambda vec: vec.y, frames_data))
-                vec_tracks_z = list(map(lambda vec: vec.z, frames_data))
-
-                vec_curve_x = action.fcurves.new(data_path=data_path, index=0)
-                vec_curve_y = action.fcurves.new(data_path=data_path, index=1)
-                vec_curve_z = action.fcurves.new(data_path=data_path, index=2)
-
-                vec_curve_x.group = group_item
-                vec_curve_y.group = group_item
-                vec_curve_z.group = group_item
-
-                vec_curve_x.keyframe_points.add(len(frames_data))
-                vec_curve_y.keyframe_points.add(len(frames_data))
-                vec_curve_z.keyframe_points.add(len(frames_data))
-
-                vec_curve_x.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_x))
-                vec_curve_y.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_y))
-                vec_curve_z.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_z))
-
-                vec_curve_x.update()
-                vec_curve_y.update()
-                vec_curve_z.update()
-            elif track_format == TrackFormat.Quaternion:
-                quat_tracks_x = list(map(lambda rotation: rotation.x, frames_data))
-                quat_tracks_y = list(map(lambda rotation: rotation.y, frames_data))
-                quat_tracks_z = list(map(lambda rotation: rotation.z, frames_data))
-                quat_tracks_w = list(map(lambda rotation: rotation.w, frames_data))
-
-                quat_curve_w = action.fcurves.new(data_path=data_path, index=0)
-                quat_curve_x = action.fcurves.new(data_path=data_path, index=1)
-                quat_curve_y = action.fcurves.new(data_path=data_path, index=2)
-                quat_curve_z = action.fcurves.new(data_path=data_path, index=3)
-
-                quat_curve_w.group = group_item
-                quat_curve_x.group = group_item
-                quat_curve_y.group = group_item
-                quat_curve_z.group = group_item
-
-                quat_curve_w.keyframe_points.add(len(frames_data))
-                quat_curve_x.keyframe_points.add(len(frames_data))
-                quat_curve_y.keyframe_points.add(len(frames_data))
-                quat_curve_z.keyframe_points.add(len(frames_data))
-
-                quat_curve_w.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_w))
-                quat_curve_x.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_x))
-                quat_curve_y.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_y))
-                quat_curve_z.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_z))
-
-                quat_curve_w.update()
-                quat_curve_x.update()
-                quat_curve_y.update()
-                quat_curve_z.update()
-            elif track_format == TrackFormat.Float:
-                value_curve = action.fcurves.new(data_path=data_path)
-                value_curve.group = group_item
-
-                value_curve.keyframe_points.add(len(frames_data))
-                value_curve.keyframe_points.foreach_set("co", _interleave_frame_ids(frames_data))
-
-                value_curve.update()
+
+            # component order matches the F-curve array indices, including WXYZ quaternions
+            for comp_index in range(frames_data.shape[1]):
+                fcurve = action.fcurves.new(data_path=data_path, index=comp_index)
+                fcurve.group = group_item
+
+                keyframes_co[:, 1] = frames_data[:, comp_index]
+                fcurve.keyframe_points.add(frame_count)
+                fcurve.keyframe_points.foreach_set("co", keyframes_co.ravel())
+
+                fcurve.update()
 
 
 def action_data_to_action(action_name: str, action_data, frame_count: int, duration_secs: float) -> bpy.types.Action:
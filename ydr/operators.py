@@ -8,7 +8,7 @@ from ..lods import LODLevels
 from ..sollumz_helper import SOLLUMZ_OT_base, find_sollumz_parent
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, LODLevel, LightType, SollumType, MaterialType
 from ..sollumz_operators import SelectTimeFlagsRange, ClearTimeFlags
-from ..ydr.shader_materials import create_shader, create_tinted_shader_graph, is_tint_material, shadermats
+from ..ydr.shader_materials import create_shader, create_tinted_shader_graph, is_tint_material, get_shader_materials
 from ..tools.drawablehelper import MaterialConverter, set_recommended_bone_properties, convert_obj_to_drawable, convert_obj_to_model, convert_objs_to_single_drawable, center_drawable_to_models
 from ..tools.boundhelper import convert_obj_to_composite, convert_objs_to_single_composite
 from ..tools.blenderhelper import add_armature_modifier, add_child_of_bone_constraint, create_blender_object, create_empty_object, duplicate_object, get_child_of_constraint, set_child_of_constraint_space, tag_redraw
@@ -383,7 +383,7 @@ class MaterialConverterHelper:
         return materials
 
     def get_shader_name(self):
-        return shadermats[bpy.context.window_manager.sz_shader_material_index].value
+        return get_shader_materials()[bpy.context.window_manager.sz_shader_material_index].value
 
     def convert_material(self, obj: bpy.types.Object, material: bpy.types.Material) -> bpy.types.Material | None:
         return MaterialConverter(obj, material).convert(self.get_shader_name())
@@ -463,7 +463,7 @@ class SOLLUMZ_OT_create_shader_material(SOLLUMZ_OT_base, bpy.types.Operator):
             return False
 
         for obj in objs:
-            shader = shadermats[context.window_manager.sz_shader_material_index].value
+            shader = get_shader_materials()[context.window_manager.sz_shader_material_index].value
             try:
                 self.create_material(context, obj, shader)
                 self.message(f"Added a {shader} shader to {obj.name}.")
@@ -1,11 +1,11 @@
 import bpy
 import os
 from typing import Optional
-from ..tools.blenderhelper import lod_level_enum_flag_prop_factory
+from ..tools.blenderhelper import lod_level_enum_flag_prop_factory, tag_redraw
 from ..sollumz_helper import find_sollumz_parent
 from ..cwxml.light_preset import LightPresetsFile
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, items_from_enums, TextureUsage, TextureFormat, LODLevel, SollumType, LightType, FlagPropertyGroup, TimeFlags
-from ..ydr.shader_materials import shadermats
+from ..ydr.shader_materials import get_shader_materials
 from .render_bucket import RenderBucket, RenderBucketEnumItems
 from .light_flashiness import Flashiness, LightFlashinessEnumItems
 from bpy.app.handlers import persistent
@@ -530,15 +530,28 @@ def get_model_properties(model_obj: bpy.types.Object, lod_level: LODLevel) -> Dr
     return lod_mesh.drawable_model_properties
 
 
-def refresh_ui_collections():
-    # Initialize shader materials collection with an entry per shader
+def load_shader_materials_collection():
+    """Fills the shader materials collection with an entry per shader, if it is still empty. This is the first use of
+    the shaders registry from the UI, so Shaders.xml is only parsed once the shader list is needed.
+    """
     # We need the shader list as a collection property to be able to display it on the UI
-    bpy.context.window_manager.sz_shader_materials.clear()
-    for index, mat in enumerate(shadermats):
-        item = bpy.context.window_manager.sz_shader_materials.add()
+    shader_materials = bpy.context.window_manager.sz_shader_materials
+    if len(shader_materials) > 0:
+        return
+
+    for index, mat in enumerate(get_shader_materials()):
+        item = shader_materials.add()
         item.index = index
         item.name = mat.name
 
+    tag_redraw(bpy.context, space_type="VIEW_3D", region_type="UI")
+
+
+def refresh_ui_collections():
+    # The shader materials collection is filled again on first use, the shader list may have changed since the
+    # file was saved
+    bpy.context.window_manager.sz_shader_materials.clear()
+
     load_light_presets()
 
 
@@ -1,3 +1,4 @@
+from functools import cache
 from typing import Optional, NamedTuple
 import bpy
 from ..cwxml.shader import (
@@ -33,13 +34,19 @@ class ShaderMaterial(NamedTuple):
     value: str
 
 
-shadermats = []
+@cache
+def get_shader_materials() -> tuple[ShaderMaterial, ...]:
+    """Gets the list of shader materials, one per shader filename. Built on first use, so the shaders are not loaded
+    when the add-on is loaded.
+    """
+    shadermats = []
+    for shader in ShaderManager.get_shaders().values():
+        name = shader.filename.replace(".sps", "").upper()
 
-for shader in ShaderManager._shaders.values():
-    name = shader.filename.replace(".sps", "").upper()
+        shadermats.append(ShaderMaterial(
+            name, name.replace("_", " "), shader.filename))
 
-    shadermats.append(ShaderMaterial(
-        name, name.replace("_", " "), shader.filename))
+    return tuple(shadermats)
 
 
 def try_get_node(node_tree: bpy.types.NodeTree, name: str) -> Optional[bpy.types.Node]:
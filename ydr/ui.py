@@ -1,7 +1,8 @@
 import bpy
 from bpy.types import Context
 from . import operators as ydr_ops
-from .shader_materials import shadermats
+from .shader_materials import get_shader_materials
+from .properties import load_shader_materials_collection
 from .cable import is_cable_mesh
 from ..cwxml.shader import ShaderManager
 from ..sollumz_ui import SOLLUMZ_PT_OBJECT_PANEL, SOLLUMZ_PT_MAT_PANEL
@@ -131,7 +132,7 @@ class SOLLUMZ_UL_SHADER_MATERIALS_LIST(bpy.types.UIList):
     def draw_item(
         self, context, layout, data, item, icon, active_data, active_propname, index
     ):
-        name = shadermats[item.index].ui_name
+        name = get_shader_materials()[item.index].ui_name
         # If the object is selected
         if self.layout_type in {"DEFAULT", "COMPACT"}:
             row = layout.row()
@@ -319,6 +320,11 @@ class SOLLUMZ_PT_SHADER_TOOLS_PANEL(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         layout.label(text="Create")
+        if len(context.window_manager.sz_shader_materials) == 0:
+            # Can't write to the window manager while drawing, fill the shader list right after
+            if not bpy.app.timers.is_registered(load_shader_materials_collection):
+                bpy.app.timers.register(load_shader_materials_collection)
+            layout.label(text="Loading shaders...")
         layout.template_list(
             SOLLUMZ_UL_SHADER_MATERIALS_LIST.bl_idname, "",
             context.window_manager, "sz_shader_materials", context.window_manager, "sz_shader_material_index"
@@ -1,7 +1,19 @@
 import bpy
+import numpy as np
 from ..sollumz_helper import SOLLUMZ_OT_base, set_object_collection
-from ..tools.ymaphelper import add_occluder_material, create_ymap, create_ymap_group, get_cargen_mesh
+from ..tools.ymaphelper import (
+    add_occluder_material,
+    create_ymap,
+    create_ymap_group,
+    get_cargen_mesh,
+    partition_positions_grid,
+    partition_positions_quadtree,
+    get_ymap_entity_objects,
+    split_ymap,
+)
+from ..cwxml.ymap import CMapData
 from ..sollumz_properties import SollumType
+from .ymapexport import calculate_extents
 
 
 class SOLLUMZ_OT_create_ymap(SOLLUMZ_OT_base, bpy.types.Operator):
@@ -206,3 +218,81 @@ class SOLLUMZ_OT_create_car_generator(SOLLUMZ_OT_base, bpy.types.Operator):
         context.view_layer.objects.active = cargen_obj
 
         return True
+
+
+class SOLLUMZ_OT_split_ymap(SOLLUMZ_OT_base, bpy.types.Operator):
+    """Split the entities of a sollumz YMAP into multiple YMAPs by position"""
+    bl_idname = "sollumz.split_ymap"
+    bl_label = "Split YMAP"
+    bl_description = (
+        "Split the entities of the selected YMAP into multiple smaller YMAPs, grouped by position, so each one is "
+        "streamed in separately"
+    )
+
+    method: bpy.props.EnumProperty(
+        name="Method",
+        items=(
+            ("QUADTREE", "Quadtree", "Split the area into quadrants until each YMAP fits the limits"),
+            ("GRID", "Grid", "Split the area into cells of the same size"),
+        ),
+        default="QUADTREE",
+    )
+    cell_size: bpy.props.FloatProperty(name="Cell Size", default=500.0, min=1.0, subtype="DISTANCE")
+    max_entities: bpy.props.IntProperty(name="Max Entities", default=500, min=1)
+    max_extent: bpy.props.FloatProperty(
+        name="Max Extent", default=1000.0, min=0.0, subtype="DISTANCE",
+        description="Maximum width of the area covered by the entities of each YMAP. 0 for no limit"
+    )
+
+    @classmethod
+    def poll(cls, context):
+        aobj = context.active_object
+        return (aobj is not None and aobj.sollum_type == SollumType.YMAP and
+                any(child.sollum_type == SollumType.YMAP_ENTITY_GROUP for child in aobj.children))
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "method")
+        if self.method == "GRID":
+            layout.prop(self, "cell_size")
+        else:
+            layout.prop(self, "max_entities")
+            layout.prop(self, "max_extent")
+
+    def run(self, context):
+        ymap_obj = context.active_object
+        entity_objs = get_ymap_entity_objects(ymap_obj)
+
+        positions = np.array([obj.matrix_world.translation for obj in entity_objs], dtype=np.float64).reshape((-1, 3))
+        if self.method == "GRID":
+            chunks = partition_positions_grid(positions, self.cell_size)
+        else:
+            chunks = partition_positions_quadtree(positions, self.max_entities, self.max_extent)
+
+        if len(chunks) <= 1:
+            self.message(f"'{ymap_obj.name}' already fits in a single YMAP.")
+            return True
+
+        # Child YMAPs are split too, so their entities keep pointing to the right LOD parents
+        chunk_ymap_objs, child_ymap_objs = split_ymap(ymap_obj, chunks)
+
+        max_streaming_size = 0.0
+        for chunk_ymap_obj in chunk_ymap_objs + child_ymap_objs:
+            ymap = CMapData()
+            calculate_extents(ymap, get_ymap_entity_objects(chunk_ymap_obj), [])
+            chunk_ymap_obj.ymap_properties.streaming_extents_min = ymap.streaming_extents_min
+            chunk_ymap_obj.ymap_properties.streaming_extents_max = ymap.streaming_extents_max
+            chunk_ymap_obj.ymap_properties.entities_extents_min = ymap.entities_extents_min
+            chunk_ymap_obj.ymap_properties.entities_extents_max = ymap.entities_extents_max
+            streaming_size = ymap.streaming_extents_max - ymap.streaming_extents_min
+            max_streaming_size = max(max_streaming_size, streaming_size.x, streaming_size.y)
+
+        counts = [len(chunk) for chunk in chunks]
+        self.message(
+            f"Split {len(entity_objs)} entities into {len(chunks)} YMAPs. Entities per YMAP: min {min(counts)}, "
+            f"max {max(counts)}, average {sum(counts) / len(counts):.1f}. Largest streaming extents width: "
+            f"{max_streaming_size:.1f} m. New child YMAPs: {len(child_ymap_objs)}.")
+        return True
@@ -95,6 +95,8 @@ class SOLLUMZ_PT_YMAP_TOOL_PANEL(bpy.types.Panel):
                 layout.operator("sollumz.create_model_occluder_group")
                 layout.operator("sollumz.create_box_occluder_group")
                 layout.operator("sollumz.create_car_generator_group")
+                layout.separator()
+                layout.operator("sollumz.split_ymap")
             elif active_object.sollum_type == SollumType.YMAP_BOX_OCCLUDER_GROUP:
                 layout.label(text="Box Occluders Options")
                 row = layout.row()
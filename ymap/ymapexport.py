@@ -1,18 +1,26 @@
 import bpy
-import re
 import math
+import numpy as np
+from numpy.typing import NDArray
+from typing import NamedTuple, Optional
 
 from mathutils import Vector
-from struct import pack
 from ..cwxml.ymap import *
-from binascii import hexlify
 from ..tools.blenderhelper import remove_number_suffix
-from ..tools.meshhelper import get_bound_center_from_bounds, get_extents, get_dimensions
+from ..tools.meshhelper import (
+    get_bound_center_from_bounds,
+    get_extents,
+    get_dimensions,
+    get_sphere_radius,
+)
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
-from ..tools.utils import get_min_vector, get_max_vector
 from ..sollumz_preferences import get_export_settings
+from ..ytyp.boundcache import archetype_bounds_cache
+from .ymapimport import build_archetype_objects_index, find_archetype_object
 from .. import logger
 
+MAX_OCCLUDE_MODEL_VERTS = 256
+
 
 def box_from_obj(obj):
     box = BoxOccluder()
@@ -38,42 +46,59 @@ def box_from_obj(obj):
     return box
 
 
-def triangulate_obj(obj):
-    """Convert mesh from n-polygons to triangles"""
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode="EDIT")
-    bpy.ops.mesh.select_all(action="SELECT")
-    bpy.ops.mesh.quads_convert_to_tris()
-    bpy.ops.object.mode_set(mode="OBJECT")
+def get_triangulated_mesh_data(obj) -> tuple[NDArray[np.float64], NDArray[np.uint32]]:
+    """
+    Get the vertex coordinates in global space (this way we don't need to apply transforms) and the vertex indices of
+    each triangle. The mesh is triangulated through its loop triangles, so the object data is not modified.
+
+    :return positions: Vertex coordinates, shape (num_verts, 3)
+    :return tris: Vertex indices of each triangle, shape (num_tris, 3)
+    """
+    mesh = obj.data
+
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    positions = positions.reshape((-1, 3)) @ matrix[:3, :3].T + matrix[:3, 3]
+
+    if not mesh.loop_triangles:
+        mesh.calc_loop_triangles()
 
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.uint32)
+    mesh.loop_triangles.foreach_get("vertices", tris)
 
-def get_verts_from_obj(obj):
+    return positions, tris.reshape((-1, 3))
+
+
+def get_verts_hex(positions: NDArray, tris: NDArray) -> str:
     """
-    For each vertex get its coordinates in global space (this way we don't need to apply transfroms)
-    then get their bytes hex representation and append. After that for each face get its indices,
-    get their bytes hex representation and append.
+    Get the vertex coordinates as little-endian floats, followed by the vertex indices of each triangle as bytes.
 
-    :return verts: String if vertex coordinates and face indices in hex representation
+    :return verts: String of vertex coordinates and triangle indices in hex representation
     :rtype str:
     """
-    verts = ''
-    for v in obj.data.vertices:
-        for c in obj.matrix_world @ v.co:
-            verts += str(hexlify(pack('f', c)))[2:-1].upper()
-    for p in obj.data.polygons:
-        for i in p.vertices:
-            verts += str(hexlify(pack('B', i)))[2:-1].upper()
-    return verts
+    if len(tris) > 0 and tris.max() > MAX_OCCLUDE_MODEL_VERTS - 1:
+        raise ValueError(f"Occluder triangle indices must be less than {MAX_OCCLUDE_MODEL_VERTS}")
+
+    data = positions.astype("<f4").tobytes() + tris.astype(np.uint8).tobytes()
+    return data.hex().upper()
 
 
-def model_from_obj(obj):
-    triangulate_obj(obj)
+def model_from_obj(obj) -> Optional[OccludeModel]:
+    """Create an occluder model from ``obj``. Returns ``None`` if ``obj`` can't be exported as an occluder model."""
+    positions, tris = get_triangulated_mesh_data(obj)
+    if len(positions) > MAX_OCCLUDE_MODEL_VERTS:
+        # Vertex indices are stored as single bytes
+        logger.error(
+            f"Object {obj.name} has too many vertices and will be skipped. It can not have more than "
+            f"{MAX_OCCLUDE_MODEL_VERTS} vertices.")
+        return None
 
     model = OccludeModel()
     model.bmin, model.bmax = get_extents(obj)
-    model.verts = get_verts_from_obj(obj)
-    model.num_verts_in_bytes = len(obj.data.vertices) * 12
-    face_count = len(obj.data.polygons)
+    model.verts = get_verts_hex(positions, tris)
+    model.num_verts_in_bytes = len(positions) * 12
+    face_count = len(tris)
     model.num_tris = face_count + 32768
     model.data_size = model.num_verts_in_bytes + (face_count * 3)
     model.flags = obj.ymap_properties.flags
@@ -81,12 +106,14 @@ def model_from_obj(obj):
     return model
 
 
-def entity_from_obj(obj):
+def get_entity_archetype_name(obj) -> str:
     # Removing " (not found)" suffix, created when importing ymaps while entity was not found in the view layer
-    obj.name = re.sub(" \(not found\)", "", obj.name.lower())
+    return remove_number_suffix(obj.name.lower().replace(" (not found)", ""))
+
 
+def entity_from_obj(obj):
     entity = Entity()
-    entity.archetype_name = remove_number_suffix(obj.name)
+    entity.archetype_name = get_entity_archetype_name(obj)
     entity.flags = int(obj.entity_properties.flags)
     entity.guid = int(obj.entity_properties.guid)
     entity.position = obj.location
@@ -109,20 +136,161 @@ def entity_from_obj(obj):
 
     return entity
 
-# TODO: This needs more work for non occluder object (entities )
+def get_objects_world_bounds(objs: list[bpy.types.Object]) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Get the world-space bounding box of each object, including all of its child meshes. Objects without meshes are
+    treated as a point at their location.
+
+    :return bbmin: Minimum corner of each object, shape (num_objs, 3)
+    :return bbmax: Maximum corner of each object, shape (num_objs, 3)
+    """
+    num_objs = len(objs)
+    locations = np.empty((num_objs, 3), dtype=np.float64)
+    corners = []
+    matrices = []
+    owners = []
+    for i, obj in enumerate(objs):
+        locations[i] = obj.matrix_world.translation
+        for child in (obj, *obj.children_recursive):
+            if child.type != "MESH":
+                continue
 
+            corners.append(child.bound_box)
+            matrices.append(child.matrix_world)
+            owners.append(i)
 
-def calculate_extents(ymap, obj):
-    bbmin, bbmax = get_extents(obj)
+    if not corners:
+        return locations, locations.copy()
+
+    corners = np.array(corners, dtype=np.float64)
+    matrices = np.array(matrices, dtype=np.float64)
+    world_corners = np.einsum("nij,nkj->nki", matrices[:, :3, :3], corners) + matrices[:, np.newaxis, :3, 3]
+
+    bbmin = np.full((num_objs, 3), np.inf)
+    bbmax = np.full((num_objs, 3), -np.inf)
+    np.minimum.at(bbmin, owners, world_corners.min(axis=1))
+    np.maximum.at(bbmax, owners, world_corners.max(axis=1))
+
+    no_meshes = np.isinf(bbmin[:, 0])
+    bbmin[no_meshes] = locations[no_meshes]
+    bbmax[no_meshes] = locations[no_meshes]
+
+    return bbmin, bbmax
+
+
+class ArchetypeBounds(NamedTuple):
+    # Bounding sphere in archetype space
+    center: Vector
+    radius: float
+    lod_dist: float
+
+
+def get_asset_archetype_bounds(asset: bpy.types.Object, lod_dist: float = 0.0) -> ArchetypeBounds:
+    bbmin, bbmax = archetype_bounds_cache.get_bounds(asset)
+    return ArchetypeBounds(get_bound_center_from_bounds(bbmin, bbmax), get_sphere_radius(bbmin, bbmax), lod_dist)
+
+
+def get_archetypes_bounds(archetype_names: set[str]) -> dict[str, ArchetypeBounds]:
+    """
+    Get the bounds of the archetypes with the given lowercase names. Archetypes defined in the scene YTYPs are used
+    first, otherwise the object with the archetype name, which the entities are duplicated or instanced from. Names
+    without any of them are not included.
+    """
+    bounds = {}
+    for ytyp in bpy.context.scene.ytyps:
+        for archetype in ytyp.archetypes:
+            name = archetype.name.lower()
+            if name not in archetype_names or name in bounds:
+                continue
+
+            if archetype.asset:
+                bounds[name] = get_asset_archetype_bounds(archetype.asset, archetype.lod_dist)
+            else:
+                bounds[name] = ArchetypeBounds(Vector(archetype.bs_center), archetype.bs_radius, archetype.lod_dist)
+
+    missing_names = archetype_names - bounds.keys()
+    if missing_names:
+        objs_index = build_archetype_objects_index(bpy.data.objects)
+        for name in missing_names:
+            asset = find_archetype_object(objs_index, name)
+            if asset is not None and asset.instance_type != "COLLECTION":
+                bounds[name] = get_asset_archetype_bounds(asset)
+
+    return bounds
+
+
+def get_entities_world_bounds(
+    entity_objs: list[bpy.types.Object]
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Get the world-space bounding box and the LOD distance of each entity. The bounding box encloses the bounding sphere
+    of the entity archetype. Entities with unknown archetype use the bounding box of their own meshes instead. The LOD
+    distance is the entity LOD distance, or the archetype LOD distance if the entity one is not set.
+
+    :return bbmin: Minimum corner of each entity, shape (num_entities, 3)
+    :return bbmax: Maximum corner of each entity, shape (num_entities, 3)
+    :return lod_dists: LOD distance of each entity, shape (num_entities,)
+    """
+    num_entities = len(entity_objs)
+    archetype_names = [get_entity_archetype_name(obj) for obj in entity_objs]
+    archetypes_bounds = get_archetypes_bounds(set(archetype_names))
+
+    matrices = np.empty((num_entities, 4, 4), dtype=np.float64)
+    lod_dists = np.empty(num_entities, dtype=np.float64)
+    centers = np.zeros((num_entities, 3), dtype=np.float64)
+    radii = np.zeros(num_entities, dtype=np.float64)
+    archetype_lod_dists = np.zeros(num_entities, dtype=np.float64)
+    has_archetype = np.zeros(num_entities, dtype=bool)
+    for i, (obj, archetype_name) in enumerate(zip(entity_objs, archetype_names)):
+        matrices[i] = obj.matrix_world
+        lod_dists[i] = obj.entity_properties.lod_dist
+
+        archetype_bounds = archetypes_bounds.get(archetype_name, None)
+        if archetype_bounds is not None:
+            centers[i], radii[i], archetype_lod_dists[i] = archetype_bounds
+            has_archetype[i] = True
+
+    rotation_scale = matrices[:, :3, :3]
+    world_centers = np.einsum("nij,nj->ni", rotation_scale, centers) + matrices[:, :3, 3]
+    # The sphere radius grows with the largest scale axis
+    world_radii = radii * np.linalg.norm(rotation_scale, axis=1).max(axis=1)
+
+    bbmin = world_centers - world_radii[:, np.newaxis]
+    bbmax = world_centers + world_radii[:, np.newaxis]
+
+    no_archetype = ~has_archetype
+    if no_archetype.any():
+        no_archetype_objs = [obj for obj, has in zip(entity_objs, has_archetype) if not has]
+        bbmin[no_archetype], bbmax[no_archetype] = get_objects_world_bounds(no_archetype_objs)
+
+    lod_dists = np.where(lod_dists > 0, lod_dists, archetype_lod_dists)
+
+    return bbmin, bbmax, lod_dists
+
+
+def calculate_extents(ymap, entity_objs: list[bpy.types.Object], occluder_objs: list[bpy.types.Object]):
+    """
+    Calculate the entities and streaming extents of the ymap. The streaming extents of an entity are its bounding box
+    expanded by its LOD distance.
+    """
+    if not entity_objs and not occluder_objs:
+        ymap.entities_extents_min = Vector()
+        ymap.entities_extents_max = Vector()
+        ymap.streaming_extents_min = Vector()
+        ymap.streaming_extents_max = Vector()
+        return
+
+    entities_bbmin, entities_bbmax, lod_dists = get_entities_world_bounds(entity_objs)
+    occluders_bbmin, occluders_bbmax = get_objects_world_bounds(occluder_objs)
+
+    bbmin = np.concatenate((entities_bbmin, occluders_bbmin))
+    bbmax = np.concatenate((entities_bbmax, occluders_bbmax))
+    lod_dists = np.concatenate((lod_dists, np.zeros(len(occluder_objs))))[:, np.newaxis]
 
-    ymap.entities_extents_min = get_min_vector(
-        ymap.entities_extents_min, bbmin)
-    ymap.entities_extents_max = get_max_vector(
-        ymap.entities_extents_max, bbmax)
-    ymap.streaming_extents_min = get_min_vector(
-        ymap.streaming_extents_min, bbmin)
-    ymap.streaming_extents_max = get_max_vector(
-        ymap.streaming_extents_max, bbmax)
+    ymap.entities_extents_min = Vector(bbmin.min(axis=0))
+    ymap.entities_extents_max = Vector(bbmax.max(axis=0))
+    ymap.streaming_extents_min = Vector((bbmin - lod_dists).min(axis=0))
+    ymap.streaming_extents_max = Vector((bbmax + lod_dists).max(axis=0))
 
 
 def cargen_from_obj(obj):
@@ -153,11 +321,8 @@ def calculate_cargen_orient(obj):
 
 def ymap_from_object(obj):
     ymap = CMapData()
-    max_int = (2**31) - 1
-    ymap.entities_extents_min = Vector((max_int, max_int, max_int))
-    ymap.entities_extents_max = Vector((0, 0, 0))
-    ymap.streaming_extents_min = Vector((max_int, max_int, max_int))
-    ymap.streaming_extents_max = Vector((0, 0, 0))
+    entity_objs = []
+    occluder_objs = []
 
     export_settings = get_export_settings()
 
@@ -167,6 +332,7 @@ def ymap_from_object(obj):
             for entity_obj in child.children:
                 if entity_obj.sollum_type == SollumType.DRAWABLE:
                     ymap.entities.append(entity_from_obj(entity_obj))
+                    entity_objs.append(entity_obj)
                 else:
                     logger.warning(
                         f"Object {entity_obj.name} will be skipped because it is not a {SOLLUMZ_UI_NAMES[SollumType.DRAWABLE]} type.")
@@ -184,7 +350,7 @@ def ymap_from_object(obj):
 
                 if box_obj.sollum_type == SollumType.YMAP_BOX_OCCLUDER:
                     ymap.box_occluders.append(box_from_obj(box_obj))
-                    calculate_extents(ymap, box_obj)
+                    occluder_objs.append(box_obj)
                 else:
                     logger.warning(
                         f"Object {box_obj.name} will be skipped because it is not a {SOLLUMZ_UI_NAMES[SollumType.YMAP_BOX_OCCLUDER]} type.")
@@ -195,14 +361,12 @@ def ymap_from_object(obj):
 
             for model_obj in child.children:
                 if model_obj.sollum_type == SollumType.YMAP_MODEL_OCCLUDER:
-                    if len(model_obj.data.vertices) > 256:
-                        logger.warning(
-                            f"Object {model_obj.name} has too many vertices and will be skipped. It can not have more than 256 vertices.")
+                    model = model_from_obj(model_obj)
+                    if model is None:
                         continue
 
-                    ymap.occlude_models.append(
-                        model_from_obj(model_obj))
-                    calculate_extents(ymap, model_obj)
+                    ymap.occlude_models.append(model)
+                    occluder_objs.append(model_obj)
                 else:
                     logger.warning(
                         f"Object {model_obj.name} will be skipped because it is not a {SOLLUMZ_UI_NAMES[SollumType.YMAP_MODEL_OCCLUDER]} type.")
@@ -234,7 +398,7 @@ def ymap_from_object(obj):
     ymap.flags = obj.ymap_properties.flags
     ymap.content_flags = obj.ymap_properties.content_flags
 
-    # TODO: Calc extents
+    calculate_extents(ymap, entity_objs, occluder_objs)
 
     ymap.block.version = obj.ymap_properties.block.version
     ymap.block.versiflagson = obj.ymap_properties.block.flags
@@ -1,38 +1,43 @@
-import binascii
-import struct
 import math
 import bpy
+import numpy as np
+from numpy.typing import NDArray
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Optional
 from mathutils import Vector, Euler
-from ..sollumz_helper import duplicate_object_with_children, set_object_collection
-from ..tools.ymaphelper import add_occluder_material, get_cargen_mesh
+from ..sollumz_helper import duplicate_object_with_children, instance_object_with_children, set_object_collection
+from ..tools.ymaphelper import add_occluder_material, get_box_occluder_mesh, get_cargen_mesh
 from ..sollumz_properties import SollumType
 from ..sollumz_preferences import get_import_settings
 from ..cwxml.ymap import CMapData, OccludeModel, YMAP
 from .. import logger
 
-# TODO: Make better?
+def get_occlude_models_mesh_data(models: list[OccludeModel]) -> list[tuple[NDArray[np.float32], NDArray[np.uint8]]]:
+    """Decodes the vertices and triangles of multiple occluder models at once. Returns a tuple per model with the
+    vertex positions, shape (num_verts, 3), and the vertex indices of each triangle, shape (num_tris, 3).
+    """
+    data = np.frombuffer(bytes.fromhex("".join(model.verts for model in models)), dtype=np.uint8)
 
+    result = []
+    offset = 0
+    for model in models:
+        num_verts_bytes = int(model.num_verts_in_bytes)
+        num_tris = int(model.num_tris) - 32768
+        verts_end = offset + num_verts_bytes
+        verts = data[offset:verts_end].view("<f4").reshape((-1, 3))
+        tris = data[verts_end:verts_end + num_tris * 3].reshape((-1, 3))
+        result.append((verts, tris))
 
-def get_mesh_data(model: OccludeModel):
-    result = ([], [])
-    for i in range(int(model.num_verts_in_bytes / 12)):
-        pos_data: str = model.verts[i * 24:(i * 24) + 24]
-        x = struct.unpack('<f', binascii.a2b_hex(pos_data[:8]))[0]
-        y = struct.unpack('<f', binascii.a2b_hex(pos_data[8:16]))[0]
-        z = struct.unpack('<f', binascii.a2b_hex(pos_data[16:24]))[0]
-        result[0].append((x, y, z))
-
-    indicies: str = model.verts[int(model.num_verts_in_bytes * 2):]
-    for i in range(int(model.num_tris - 32768)):
-        j = i * 6
-        i0 = int.from_bytes(binascii.a2b_hex(indicies[j:j + 2]), 'little')
-        i1 = int.from_bytes(binascii.a2b_hex(indicies[j + 2:j + 4]), 'little')
-        i2 = int.from_bytes(binascii.a2b_hex(indicies[j + 4:j + 6]), 'little')
-        result[1].append((i0, i1, i2))
+        offset += len(model.verts) // 2
 
     return result
 
 
+def get_mesh_data(model: OccludeModel) -> tuple[NDArray[np.float32], NDArray[np.uint8]]:
+    return get_occlude_models_mesh_data([model])[0]
+
+
 def apply_entity_properties(obj, entity):
     obj.entity_properties.archetype_name = entity.archetype_name
     obj.entity_properties.flags = entity.flags
@@ -54,6 +59,31 @@ def apply_entity_properties(obj, entity):
     obj.scale = Vector((entity.scale_xy, entity.scale_xy, entity.scale_z))
 
 
+def build_archetype_objects_index(objs: Iterable[bpy.types.Object]) -> dict[str, list[bpy.types.Object]]:
+    """Maps lowercase names to the objects with that name, to look up the objects of entities by archetype name."""
+    index = defaultdict(list)
+    for obj in objs:
+        index[obj.name.lower()].append(obj)
+    return index
+
+
+def find_archetype_object(
+    archetype_objs: dict[str, list[bpy.types.Object]], archetype_name: str
+) -> Optional[bpy.types.Object]:
+    """Finds the object of an archetype in an index built by ``build_archetype_objects_index``. Archetype names are
+    case-insensitive, but an object whose name matches exactly is preferred.
+    """
+    candidates = archetype_objs.get(archetype_name.lower(), None)
+    if not candidates:
+        return None
+
+    for obj in candidates:
+        if obj.name == archetype_name:
+            return obj
+
+    return candidates[0]
+
+
 def entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
     group_obj = bpy.data.objects.new("Entities", None)
     group_obj.sollum_type = SollumType.YMAP_ENTITY_GROUP
@@ -66,11 +96,15 @@ def entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
 
     found = False
     if ymap.entities:
-        for obj in bpy.context.collection.all_objects:
-            for entity in ymap.entities:
-                if entity.archetype_name == obj.name and obj.name in bpy.context.view_layer.objects:
-                    found = True
-                    apply_entity_properties(obj, entity)
+        view_layer_objects = bpy.context.view_layer.objects
+        archetype_objs = build_archetype_objects_index(
+            obj for obj in bpy.context.collection.all_objects if obj.name in view_layer_objects
+        )
+        for entity in ymap.entities:
+            obj = find_archetype_object(archetype_objs, entity.archetype_name)
+            if obj is not None:
+                found = True
+                apply_entity_properties(obj, entity)
         if found:
             logger.info(f"Succesfully imported: {ymap.name}.ymap")
             return True
@@ -96,6 +130,7 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
     if ymap.entities:
         entities_amount = len(ymap.entities)
         count = 0
+        use_collection_instances = get_import_settings().instance_entities_as_collections
 
         for entity in ymap.entities:
             obj = bpy.data.objects.get(entity.archetype_name, None)
@@ -106,7 +141,10 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
             # TODO: requiring ymap entities to be drawable or fragment in blender seems like an unnecessary limitation
             # Need to special case assets because their type when imported by sollumz is drawable model
             if obj.sollum_type == SollumType.DRAWABLE or obj.sollum_type == SollumType.FRAGMENT or obj.asset_data is not None:
-                new_obj = duplicate_object_with_children(obj)
+                if use_collection_instances:
+                    new_obj = instance_object_with_children(obj)
+                else:
+                    new_obj = duplicate_object_with_children(obj)
                 apply_entity_properties(new_obj, entity)
                 new_obj.parent = group_obj
                 count += 1
@@ -153,13 +191,12 @@ def box_to_obj(obj, ymap: CMapData):
 
     obj.ymap_properties.content_flags_toggle.has_occl = True
 
+    # All boxes share the same unit cube mesh, the size of each box is set through its scale
+    mesh = get_box_occluder_mesh()
     for box in ymap.box_occluders:
-        bpy.ops.mesh.primitive_cube_add(size=1)
-        box_obj = bpy.context.view_layer.objects.active
+        box_obj = bpy.data.objects.new("Box", mesh)
         box_obj.sollum_type = SollumType.YMAP_BOX_OCCLUDER
-        box_obj.name = "Box"
-        box_obj.active_material = add_occluder_material(
-            SollumType.YMAP_BOX_OCCLUDER)
+        bpy.context.collection.objects.link(box_obj)
         box_obj.location = Vector(
             [box.center_x, box.center_y, box.center_z]) / 4
         box_obj.rotation_euler[2] = math.atan2(box.cos_z, box.sin_z)
@@ -181,18 +218,17 @@ def model_to_obj(obj: bpy.types.Object, ymap: CMapData):
 
     obj.ymap_properties.content_flags_toggle.has_occl = True
 
-    for model in ymap.occlude_models:
-        verts, faces = get_mesh_data(model)
+    material = add_occluder_material(SollumType.YMAP_MODEL_OCCLUDER)
+    models = ymap.occlude_models
+    for model, (verts, faces) in zip(models, get_occlude_models_mesh_data(models)):
 
         mesh = bpy.data.meshes.new("Model Occluders")
+        mesh.from_pydata(verts, [], faces)
+        mesh.materials.append(material)
         model_obj = bpy.data.objects.new("Model", mesh)
         model_obj.sollum_type = SollumType.YMAP_MODEL_OCCLUDER
         model_obj.ymap_properties.flags = model.flags
-        model_obj.active_material = add_occluder_material(
-            SollumType.YMAP_MODEL_OCCLUDER)
         bpy.context.collection.objects.link(model_obj)
-        bpy.context.view_layer.objects.active = model_obj
-        mesh.from_pydata(verts, [], faces)
         model_obj.parent = group_obj
         model_obj.lock_location = (True, True, True)
         model_obj.lock_rotation = (True, True, True)
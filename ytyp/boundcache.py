@@ -0,0 +1,96 @@
+"""
+Cache of archetype asset bounds, to skip walking the asset hierarchy again when it didn't change between exports.
+"""
+import bpy
+from bpy.app.handlers import persistent
+from mathutils import Matrix, Vector
+
+from ..tools.meshhelper import get_combined_bound_box
+
+
+class ArchetypeBoundsCache:
+    """In-memory cache of the bounds of archetype asset objects, keyed by the asset object. Entries are invalidated by
+    a depsgraph update handler when the geometry or transforms of any object in the asset hierarchy change.
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple[int, bool], tuple[Vector, Vector]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_bounds(self, asset: bpy.types.Object, apply_transforms: bool = False) -> tuple[Vector, Vector]:
+        """Gets the bounds of ``asset`` and all of its child meshes, relative to ``asset``. If ``apply_transforms``
+        is set, only the translation of ``asset`` is unapplied. Returns bbmin, bbmax.
+        """
+        key = (asset.as_pointer(), apply_transforms)
+        bounds = self._entries.get(key, None)
+        if bounds is None:
+            if apply_transforms:
+                # Unapply only translation
+                matrix = Matrix.Translation(asset.matrix_world.translation).inverted()
+            else:
+                # Unapply all transforms
+                matrix = asset.matrix_world.inverted()
+
+            bounds = get_combined_bound_box(asset, use_world=True, matrix=matrix)
+            self._entries[key] = bounds
+
+        bbmin, bbmax = bounds
+        return bbmin.copy(), bbmax.copy()
+
+    def invalidate(self, obj: bpy.types.Object):
+        """Discards the bounds of ``obj`` and of all its parents, since they include the bounds of ``obj``."""
+        while obj is not None:
+            pointer = obj.as_pointer()
+            self._entries.pop((pointer, False), None)
+            self._entries.pop((pointer, True), None)
+            obj = obj.parent
+
+    def clear(self):
+        self._entries.clear()
+
+
+archetype_bounds_cache = ArchetypeBoundsCache()
+
+
+@persistent
+def on_depsgraph_update_post(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph):
+    if len(archetype_bounds_cache) == 0:
+        return
+
+    for update in depsgraph.updates:
+        data_block = update.id
+        if isinstance(data_block, bpy.types.Object):
+            if update.is_updated_geometry or update.is_updated_transform:
+                archetype_bounds_cache.invalidate(data_block.original)
+        elif isinstance(data_block, bpy.types.Collection):
+            # Objects were added or removed, their hierarchies may have changed
+            archetype_bounds_cache.clear()
+            return
+
+
+@persistent
+def on_blend_file_loaded(_):
+    archetype_bounds_cache.clear()
+
+
+@persistent
+def on_undo_redo(*_):
+    # Undo/redo reloads the data-blocks, the cached bounds and object pointers may no longer be valid
+    archetype_bounds_cache.clear()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update_post)
+    bpy.app.handlers.load_post.append(on_blend_file_loaded)
+    bpy.app.handlers.undo_post.append(on_undo_redo)
+    bpy.app.handlers.redo_post.append(on_undo_redo)
+
+
+def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update_post)
+    bpy.app.handlers.load_post.remove(on_blend_file_loaded)
+    bpy.app.handlers.undo_post.remove(on_undo_redo)
+    bpy.app.handlers.redo_post.remove(on_undo_redo)
+    archetype_bounds_cache.clear()
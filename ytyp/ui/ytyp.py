@@ -65,6 +65,9 @@ class SOLLUMZ_PT_import_ytyp(bpy.types.Panel, SollumzFileSettingsPanel):
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
         layout.use_property_split = False
         layout.prop(settings, "ytyp_mlo_instance_entities")
+        row = layout.row()
+        row.active = settings.ytyp_mlo_instance_entities
+        row.prop(settings, "instance_entities_as_collections")
 
 
 class SOLLUMZ_PT_export_ytyp(bpy.types.Panel, SollumzFileSettingsPanel):
@@ -1,39 +1,49 @@
+from collections import Counter, defaultdict
 from typing import Iterable
 import bpy
-from mathutils import Euler, Vector, Quaternion, Matrix
+from mathutils import Euler, Vector, Quaternion
 
 from ..cwxml import ytyp as ytypxml, ymap as ymapxml
 from ..sollumz_properties import ArchetypeType, AssetType, EntityLodLevel, EntityPriorityLevel
 from ..tools import jenkhash
-from ..tools.meshhelper import get_combined_bound_box, get_bound_center_from_bounds, get_sphere_radius
+from ..tools.meshhelper import get_bound_center_from_bounds, get_sphere_radius
 from .properties.ytyp import ArchetypeProperties, SpecialAttribute, TimecycleModifierProperties, RoomProperties, PortalProperties, MloEntityProperties, EntitySetProperties
 from .properties.extensions import ExtensionProperties, ExtensionType
 from ..ydr.light_flashiness import Flashiness
+from .boundcache import archetype_bounds_cache
 
 
-def set_room_attached_objects(room_xml: ytypxml.Room, room_index: int, entities: Iterable[MloEntityProperties]):
-    """Set attached objects of room from the mlo archetype entities collection provided."""
-    for i, entity in enumerate(entities):
-        if entity.room_index == room_index:
-            room_xml.attached_objects.append(i)
-
+def get_attached_objects_indices(
+    entities: Iterable[MloEntityProperties],
+    rooms: Iterable[RoomProperties],
+    portals: Iterable[PortalProperties]
+) -> tuple[dict[int, list[int]], dict[int, list[int]]]:
+    """Get the indices of the entities attached to each room and to each portal, keyed by room and portal index."""
+    room_index_by_id = {str(room.id): index for index, room in enumerate(rooms)}
+    portal_index_by_id = {str(portal.id): index for index, portal in enumerate(portals)}
 
-def set_portal_attached_objects(portal_xml: ytypxml.Portal, portal_index: int, entities: Iterable[MloEntityProperties]):
-    """Set attached objects of portal from the mlo archetype entities collection provided."""
+    room_attached_objects = defaultdict(list)
+    portal_attached_objects = defaultdict(list)
     for i, entity in enumerate(entities):
-        if entity.portal_index == portal_index:
-            portal_xml.attached_objects.append(i)
+        room_index = room_index_by_id.get(entity.attached_room_id, None)
+        if room_index is not None:
+            room_attached_objects[room_index].append(i)
+
+        portal_index = portal_index_by_id.get(entity.attached_portal_id, None)
+        if portal_index is not None:
+            portal_attached_objects[portal_index].append(i)
 
+    return room_attached_objects, portal_attached_objects
 
-def get_portal_count(room: RoomProperties, portals: Iterable[PortalProperties]) -> int:
-    """Get number of portals in room."""
 
-    count = 0
+def get_portal_counts(portals: Iterable[PortalProperties]) -> Counter[str]:
+    """Get number of portals in each room, keyed by room ID."""
+    counts = Counter()
     for portal in portals:
-        if portal.room_from_id == str(room.id) or portal.room_to_id == str(room.id):
-            count += 1
+        # A portal with the same room on both sides only counts once
+        counts.update({portal.room_from_id, portal.room_to_id})
 
-    return count
+    return counts
 
 
 def set_entity_xml_transforms_from_object(entity_obj: bpy.types.Object, entity_xml: ymapxml.Entity):
@@ -118,7 +128,7 @@ def create_entity_xml(entity: MloEntityProperties) -> ymapxml.Entity:
     return entity_xml
 
 
-def create_room_xml(room: RoomProperties, room_index: int, archetype: ArchetypeProperties) -> ytypxml.Room:
+def create_room_xml(room: RoomProperties, portal_count: int, attached_objects: Iterable[int]) -> ytypxml.Room:
     """Create xml room from a room data-block."""
 
     room_xml = ytypxml.Room()
@@ -131,16 +141,13 @@ def create_room_xml(room: RoomProperties, room_index: int, archetype: ArchetypeP
     room_xml.flags = room.flags.total
     room_xml.floor_id = room.floor_id
     room_xml.exterior_visibility_depth = room.exterior_visibility_depth
-    room_xml.portal_count = get_portal_count(
-        room, archetype.portals)
-
-    set_room_attached_objects(room_xml, room_index,
-                              archetype.non_entity_set_entities)
+    room_xml.portal_count = portal_count
+    room_xml.attached_objects.extend(attached_objects)
 
     return room_xml
 
 
-def create_portal_xml(portal: PortalProperties, portal_index: int, archetype: ArchetypeProperties) -> ytypxml.Portal:
+def create_portal_xml(portal: PortalProperties, attached_objects: Iterable[int]) -> ytypxml.Portal:
     """Create xml portal from a portal data-block."""
 
     portal_xml = ytypxml.Portal()
@@ -154,9 +161,7 @@ def create_portal_xml(portal: PortalProperties, portal_index: int, archetype: Ar
     portal_xml.opacity = portal.opacity
     portal_xml.audio_occlusion = int(
         portal.audio_occlusion)
-
-    set_portal_attached_objects(
-        portal_xml, portal_index, archetype.non_entity_set_entities)
+    portal_xml.attached_objects.extend(attached_objects)
 
     return portal_xml
 
@@ -246,16 +251,7 @@ def create_extension_xml(extension: ExtensionProperties):
 def set_archetype_xml_bounds_from_asset(archetype: ArchetypeProperties, archetype_xml: ytypxml.BaseArchetype, apply_transforms: bool = False):
     """Calculate bounds from the archetype asset."""
 
-    if apply_transforms:
-        # Unapply only translation
-        matrix = Matrix.Translation(
-            archetype.asset.matrix_world.translation).inverted()
-    else:
-        # Unapply all transforms
-        matrix = archetype.asset.matrix_world.inverted()
-
-    bbmin, bbmax = get_combined_bound_box(
-        archetype.asset, use_world=True, matrix=matrix)
+    bbmin, bbmax = archetype_bounds_cache.get_bounds(archetype.asset, apply_transforms)
     archetype_xml.bb_min = bbmin
     archetype_xml.bb_max = bbmax
     archetype_xml.bs_center = get_bound_center_from_bounds(bbmin, bbmax)
@@ -293,18 +289,21 @@ def get_xml_asset_type(asset_type: AssetType) -> str:
 
 def create_mlo_archetype_children_xml(archetype: ArchetypeProperties, archetype_xml: ytypxml.MloArchetype):
     """Create all mlo children from an archetype data-block for the provided archetype xml."""
-    for entity in archetype.entities:
-        if entity.attached_entity_set_id != "-1":
-            continue
+    entities = archetype.non_entity_set_entities
+    for entity in entities:
         archetype_xml.entities.append(create_entity_xml(entity))
 
+    room_attached_objects, portal_attached_objects = get_attached_objects_indices(
+        entities, archetype.rooms, archetype.portals)
+    portal_counts = get_portal_counts(archetype.portals)
+
     for room_index, room in enumerate(archetype.rooms):
         archetype_xml.rooms.append(
-            create_room_xml(room, room_index, archetype))
+            create_room_xml(room, portal_counts[str(room.id)], room_attached_objects[room_index]))
 
     for portal_index, portal in enumerate(archetype.portals):
         archetype_xml.portals.append(
-            create_portal_xml(portal, portal_index, archetype))
+            create_portal_xml(portal, portal_attached_objects[portal_index]))
 
     for tcm in archetype.timecycle_modifiers:
         archetype_xml.timecycle_modifiers.append(create_tcm_xml(tcm))
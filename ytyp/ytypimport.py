@@ -1,10 +1,11 @@
 import bpy
-from typing import Union
+from collections import defaultdict
+from typing import Iterable, Union
 from mathutils import Vector, Quaternion
 from ..cwxml import ytyp as ytypxml, ymap as ymapxml
 from ..sollumz_properties import ArchetypeType, AssetType, EntityLodLevel, EntityPriorityLevel
 from ..sollumz_preferences import get_import_settings
-from ..sollumz_helper import duplicate_object_with_children
+from ..sollumz_helper import duplicate_object_with_children, instance_object_with_children, is_instance_collection
 from .properties.ytyp import CMapTypesProperties, ArchetypeProperties, SpecialAttribute, TimecycleModifierProperties, RoomProperties, PortalProperties, MloEntityProperties, EntitySetProperties
 from .properties.extensions import ExtensionProperties, ExtensionType, ExtensionsContainer
 from ..ydr.light_flashiness import Flashiness
@@ -110,10 +111,13 @@ def find_and_link_entity_object(entity_xml: ymapxml.Entity, entity: MloEntityPro
     """Attempt to find an existing entity object in the scene and link it to the entity data-block.
 
     If the import setting ``SollumzImportSettings.ytyp_mlo_instance_entities`` is set, a copy of the found object is
-    linked instead of the object itself.
+    linked instead of the object itself. With ``SollumzImportSettings.instance_entities_as_collections`` the copy is an
+    empty instancing a collection shared by all the entities of the same archetype.
     """
 
-    should_instance = get_import_settings().ytyp_mlo_instance_entities
+    import_settings = get_import_settings()
+    should_instance = import_settings.ytyp_mlo_instance_entities
+    use_collection_instances = should_instance and import_settings.instance_entities_as_collections
 
     # Lookup in the whole .blend (i.e. current scene, other scenes, asset browser)
     obj = bpy.data.objects.get(entity_xml.archetype_name, None)
@@ -124,7 +128,7 @@ def find_and_link_entity_object(entity_xml: ymapxml.Entity, entity: MloEntityPro
     if obj.name not in bpy.context.scene.objects:
         # Since it isn't in the current scene, we have to duplicate the object always
         should_instance = True
-    elif should_instance:
+    elif should_instance and not use_collection_instances:
         # If found in the scene and user wants to instance entities, only instance it if it is no longer at the origin,
         # meaning it was already placed elsewhere in the MLO or the user moved it away.
         # This is to support the workflow of importing all models and then importing the MLO ytyp with instancing
@@ -132,7 +136,10 @@ def find_and_link_entity_object(entity_xml: ymapxml.Entity, entity: MloEntityPro
         origin = Vector((0.0, 0.0, 0.0))
         should_instance = obj.location != origin
 
-    if should_instance:
+    if use_collection_instances:
+        # Always instance, the object itself is part of the instance collection and must stay where it is
+        obj = instance_object_with_children(obj)
+    elif should_instance:
         obj = duplicate_object_with_children(obj)
 
     entity.linked_object = obj
@@ -272,6 +279,25 @@ def create_mlo_archetype_children(archetype_xml: ytypxml.MloArchetype, archetype
         organize_mlo_entities_in_collections(archetype)
 
 
+def build_children_map(objs: Iterable[bpy.types.Object]) -> dict[bpy.types.Object, list[bpy.types.Object]]:
+    """Get the direct children of each object, in a single pass over ``objs``."""
+    children_map = defaultdict(list)
+    for obj in objs:
+        if obj.parent is not None:
+            children_map[obj.parent].append(obj)
+
+    return children_map
+
+
+def iter_object_tree(obj: bpy.types.Object, children_map: dict[bpy.types.Object, list[bpy.types.Object]]):
+    """Iterate ``obj`` and all of its children recursively."""
+    pending = [obj]
+    while pending:
+        obj = pending.pop()
+        yield obj
+        pending.extend(children_map.get(obj, ()))
+
+
 def organize_mlo_entities_in_collections(archetype: ArchetypeProperties):
     """Places all entities linked objects in collections. One collection per room."""
 
@@ -280,15 +306,9 @@ def organize_mlo_entities_in_collections(archetype: ArchetypeProperties):
     bpy.context.collection.children.link(base_collection)
     mlo_collections = {base_collection_name: base_collection}
 
-    def _link_to_collection(obj, coll):
-        for c in obj.users_collection:
-            c.objects.unlink(obj)
-        coll.objects.link(obj)
-
-    def _link_to_collection_recursive(obj, coll):
-        _link_to_collection(obj, coll)
-        for child_obj in obj.children_recursive: # could be slow with lots of entities, O(len(bpy.data.objects)) time
-            _link_to_collection(child_obj, coll)
+    room_names = {str(room.id): room.name for room in archetype.rooms}
+    children_map = build_children_map(bpy.data.objects)
+    objs_collection = {}
 
     light_effect_objs = []
     for entity in archetype.entities:
@@ -302,7 +322,7 @@ def organize_mlo_entities_in_collections(archetype: ArchetypeProperties):
         if obj is None:
             continue
 
-        room_name = entity.get_room_name()
+        room_name = room_names.get(entity.attached_room_id, None)
         if room_name:
             entity_collection_name = f"{archetype.asset_name}.{room_name}"
         else:
@@ -314,7 +334,8 @@ def organize_mlo_entities_in_collections(archetype: ArchetypeProperties):
             base_collection.children.link(entity_collection)
             mlo_collections[entity_collection_name] = entity_collection
 
-        _link_to_collection_recursive(obj, entity_collection)
+        for tree_obj in iter_object_tree(obj, children_map):
+            objs_collection[tree_obj] = entity_collection
 
     if light_effect_objs:
         # Place all light effect objects in their own collection
@@ -322,7 +343,16 @@ def organize_mlo_entities_in_collections(archetype: ArchetypeProperties):
         light_effect_collection = bpy.data.collections.new(light_effect_collection_name)
         bpy.context.collection.children.link(light_effect_collection)
         for lights_parent_obj in light_effect_objs:
-            _link_to_collection_recursive(lights_parent_obj, light_effect_collection)
+            for tree_obj in iter_object_tree(lights_parent_obj, children_map):
+                objs_collection[tree_obj] = light_effect_collection
+
+    for obj, collection in objs_collection.items():
+        for c in obj.users_collection:
+            # Objects used by collection instances must stay in their instance collection
+            if c != collection and not is_instance_collection(c):
+                c.objects.unlink(obj)
+        if collection not in obj.users_collection:
+            collection.objects.link(obj)
 
 
 def find_and_set_archetype_asset(archetype: ArchetypeProperties):